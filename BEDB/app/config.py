@@ -1,7 +1,7 @@
 """Application configuration settings."""
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -10,6 +10,13 @@ class Settings(BaseSettings):
     # Database
     mongodb_url: str = "mongodb://localhost:27017"
     database_name: str = "ai_learning_app"
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_max_idle_time_ms: int = 60000
+    mongodb_server_selection_timeout_ms: int = 5000
+    mongodb_connect_timeout_ms: int = 10000
+    mongodb_socket_timeout_ms: int = 30000  # 0 disables the socket timeout
+    mongodb_compressors: str = "zlib"  # comma separated, e.g. "zstd,snappy,zlib"
     
     # JWT
     secret_key: str = "your-secret-key-here"
@@ -18,6 +25,38 @@ class Settings(BaseSettings):
     
     # Google GenAI
     google_api_key: str = ""
+    genai_timeout_seconds: float = 60.0
+    genai_default_concurrency: int = 4
+    # Long documents are split into segments of about this many tokens (map-reduce)
+    genai_segment_tokens: int = 8000
+    genai_chars_per_token: float = 4.0  # token estimate used for splitting
+    # Concurrent Gemini calls per GenAIService method, e.g. GENAI_CONCURRENCY_LIMITS='{"chat": 32}'
+    genai_concurrency_limits: Dict[str, int] = {
+        "chat": 16,
+        "outline": 4,
+        "extract": 4,
+        "quiz": 4,
+        "flashcards": 4,
+        "summary": 4
+    }
+    
+    # LLM response cache
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: float = 3600
+    response_cache_max_entries: int = 1000
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.95  # cosine similarity between questions
+    semantic_cache_ttl_seconds: float = 600
+    semantic_cache_max_entries_per_scope: int = 200
+    
+    # Embeddings
+    embedding_provider: str = "genai"  # "genai" or "local" (offline hashing embedder)
+    embedding_model: str = "models/text-embedding-004"
+    embedding_dimension: int = 768
+    embedding_batch_window_ms: float = 5.0  # how long concurrent queries wait to share a call
+    embedding_max_batch_size: int = 100
+    embedding_cache_memory_mb: int = 64
+    embedding_cache_collection: str = "embedding_cache"  # empty disables the MongoDB tier
     
     # Application
     debug: bool = True
@@ -27,6 +66,39 @@ class Settings(BaseSettings):
     # File Upload
     max_file_size: int = 10485760  # 10MB
     upload_dir: str = "uploads"
+    upload_chunk_size: int = 1048576  # bytes read and written at a time
+    resumable_max_file_size: int = 2147483648  # 2GB
+    resumable_part_size: int = 8388608  # 8MB
+    resumable_upload_ttl_hours: float = 24  # unfinished uploads and their parts are removed after this
+    resumable_cleanup_interval_seconds: float = 3600
+    extraction_workers: int = 2  # processes for PDF/DOCX text extraction
+    extraction_timeout_seconds: float = 120  # per file
+    extraction_memory_limit_mb: int = 1024  # per worker process, 0 disables
+    extraction_pdf_pages_per_task: int = 25
+    
+    # Background jobs
+    job_worker_in_process: bool = True  # run a worker inside the API process
+    job_worker_concurrency: int = 2
+    job_poll_interval_seconds: float = 1.0
+    job_lease_seconds: float = 300  # a job is retried if its worker stops renewing the lease
+    job_max_attempts: int = 5
+    job_retry_base_seconds: float = 10
+    job_retry_max_seconds: float = 600
+    
+    # Vector search
+    vector_index_backend: str = "exact"  # "exact" or "ivf"
+    vector_index_snapshot_path: str = "vector_index/embeddings.npz"  # empty disables snapshots
+    vector_index_snapshot_interval: int = 1000  # index changes between snapshots
+    vector_index_refresh_seconds: float = 5  # how often searches pick up chunks written by other processes
+    vector_tombstone_ttl_hours: float = 24  # deleted chunk ids kept for other processes to catch up
+    vector_ivf_nlist: int = 256
+    vector_ivf_nprobe: int = 16
+    vector_chunk_size: int = 1000  # characters per chunk
+    vector_chunk_overlap: int = 200
+    
+    # Leaderboard
+    leaderboard_cache_ttl_seconds: float = 30
+    leaderboard_cache_max_entries: int = 1000  # one per (course, limit)
     
     # CORS
     allowed_origins: List[str] = ["http://localhost:3000", "http://localhost:3001"]
@@ -1,7 +1,8 @@
 """Database connection and initialization."""
 
+from typing import Optional
 from beanie import init_beanie
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from app.config import settings
 from app.models import (
     User, Course, Upload, Quiz, QuizQuestion, Chapter,
@@ -9,13 +10,36 @@ from app.models import (
 )
 from app.models.enrollment import CourseEnrollment, ChapterProgress
 
+# Application-wide client; its connection pool is shared by Beanie and the services
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    """Get the shared MongoDB client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(
+            settings.mongodb_url,
+            maxPoolSize=settings.mongodb_max_pool_size,
+            minPoolSize=settings.mongodb_min_pool_size,
+            maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+            serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+            connectTimeoutMS=settings.mongodb_connect_timeout_ms,
+            socketTimeoutMS=settings.mongodb_socket_timeout_ms or None,
+            compressors=settings.mongodb_compressors or None
+        )
+    return _client
+
+
+def get_database() -> AsyncIOMotorDatabase:
+    """Get the application database on the shared client."""
+    return get_client()[settings.database_name]
+
 
 async def init_db():
     """Initialize database connection and Beanie ODM."""
-    client = AsyncIOMotorClient(settings.mongodb_url)
-    
     await init_beanie(
-        database=client[settings.database_name],
+        database=get_database(),
         document_models=[
             User, Course, Upload, Quiz, QuizQuestion, Chapter,
             QuizHistory, DashboardProgress, ChatSession, ChatMessage,
@@ -26,5 +50,7 @@ async def init_db():
 
 async def close_db():
     """Close database connection."""
-    # Beanie handles connection cleanup automatically
-    pass
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,87 @@
+"""Request-scoped batched loading of documents by id."""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Set, Type
+
+from beanie import Document
+
+
+class DocumentLoader:
+    """Loads documents of one model by id, batching and memoising lookups.
+
+    Ids requested within the same event-loop tick are resolved with a
+    single ``{_id: {$in: [...]}}`` query, and each id is fetched at most
+    once for the lifetime of the loader. Missing documents resolve to None.
+    """
+
+    def __init__(self, model: Type[Document]):
+        """Initialize loader."""
+        self.model = model
+        self._futures: Dict[Any, asyncio.Future] = {}
+        self._pending: List[Any] = []
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, document_id: Any) -> "asyncio.Future[Optional[Document]]":
+        """Get a document by id; await the result."""
+        future = self._futures.get(document_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[document_id] = future
+            if not self._pending:
+                loop.call_soon(self._schedule_dispatch)
+            self._pending.append(document_id)
+        return future
+
+    async def load_many(self, document_ids: Iterable[Any]) -> List[Optional[Document]]:
+        """Get several documents by id, in the order of ``document_ids``."""
+        return list(await asyncio.gather(*(self.load(document_id) for document_id in document_ids)))
+
+    def _schedule_dispatch(self):
+        """Start fetching the ids collected during this tick."""
+        task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self):
+        """Resolve the pending ids with one query."""
+        document_ids, self._pending = self._pending, []
+        try:
+            documents = await self._fetch(document_ids)
+        except Exception as e:
+            # Failures are not memoised; a later load retries
+            for document_id in document_ids:
+                self._futures.pop(document_id).set_exception(e)
+            return
+
+        by_id = {document.id: document for document in documents}
+        for document_id in document_ids:
+            self._futures[document_id].set_result(by_id.get(document_id))
+
+    async def _fetch(self, document_ids: List[Any]) -> List[Document]:
+        """Query the documents with the given ids."""
+        return await self.model.find({"_id": {"$in": document_ids}}).to_list()
+
+
+class Loaders:
+    """One ``DocumentLoader`` per model, created on first use."""
+
+    def __init__(self):
+        """Initialize loaders."""
+        self._loaders: Dict[Type[Document], DocumentLoader] = {}
+
+    def __getitem__(self, model: Type[Document]) -> DocumentLoader:
+        """Get the loader of a model."""
+        loader = self._loaders.get(model)
+        if loader is None:
+            loader = self._loaders[model] = DocumentLoader(model)
+        return loader
+
+
+def get_loaders() -> Loaders:
+    """Dependency giving each request its own loaders.
+
+    FastAPI resolves a dependency once per request, so every route and
+    dependency of a request shares the same memoised documents.
+    """
+    return Loaders()
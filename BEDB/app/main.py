@@ -4,10 +4,13 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 
 from app.config import settings
 from app.database import init_db, close_db
+from app.pagination import NEXT_CURSOR_HEADER
+from app.responses import ORJSONResponse
 from app.routers import (
     auth_router, courses_router, uploads_router, 
     quiz_router, chat_router, dashboard_router
@@ -18,6 +21,12 @@ from app.routers.admin import router as admin_router
 from app.routers.leaderboard import router as leaderboard_router
 from app.routers.student import router as student_router
 from app.routers.instructor import router as instructor_router
+from app.services.embedding_service import embedding_service
+from app.services.extraction_cache import extraction_cache
+from app.services.genai_service import genai_service
+from app.services.file_service import file_service
+from app.services.job_queue import JobWorker, job_queue
+from app.services.vector_service import vector_service
 
 
 @asynccontextmanager
@@ -25,8 +34,25 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     await init_db()
+    await embedding_service.cache.purge_stale(embedding_service.model_key)
+    await extraction_cache.purge_stale_cleaned(genai_service.extract_version)
+    worker = None
+    worker_task = None
+    if settings.job_worker_in_process:
+        worker = JobWorker(
+            job_queue,
+            concurrency=settings.job_worker_concurrency,
+            poll_interval=settings.job_poll_interval_seconds
+        )
+        worker_task = asyncio.create_task(worker.run())
     yield
     # Shutdown
+    if worker:
+        # Running jobs finish; unfinished ones are picked up again after their lease
+        worker.stop()
+        await worker_task
+    file_service.shutdown()
+    await vector_service.save_snapshot()
     await close_db()
 
 
@@ -35,6 +61,7 @@ app = FastAPI(
     title="AI Learning Application",
     description="A comprehensive AI-powered learning platform with course management, quizzes, and intelligent tutoring",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -45,6 +72,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers with API versioning
@@ -40,7 +40,8 @@ class ChatSession(BaseDocument):
             "course_id",
             "upload_id",
             "status",
-            "created_at"
+            "created_at",
+            [("user_id", 1), ("created_at", -1), ("_id", -1)]  # Keyset pagination of a user's sessions
         ]
     
     def __str__(self) -> str:
@@ -62,7 +63,8 @@ class ChatMessage(BaseDocument):
         indexes = [
             "session_id",
             "sender",
-            "created_at"
+            "created_at",
+            [("session_id", 1), ("created_at", 1), ("_id", 1)]  # Keyset pagination of a session's messages
         ]
     
     def __str__(self) -> str:
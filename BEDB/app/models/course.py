@@ -45,7 +45,8 @@ class Course(BaseDocument):
             "tags",
             "visibility",
             "is_approved",
-            "created_at"
+            "created_at",
+            [("owner_id", 1), ("created_at", 1), ("_id", 1)]  # Keyset pagination of a user's courses
         ]
     
     def __str__(self) -> str:
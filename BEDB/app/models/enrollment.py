@@ -31,6 +31,7 @@ class CourseEnrollment(BaseDocument):
             "student_id",
             "course_id",
             [("student_id", 1), ("course_id", 1)],  # Compound index for unique constraint
+            [("student_id", 1), ("enrolled_at", -1), ("_id", -1)],  # Keyset pagination of a student's courses
             "enrolled_at",
             "status"
         ]
@@ -65,7 +65,8 @@ class QuizHistory(BaseDocument):
         indexes = [
             "quiz_id",
             "user_id",
-            "taken_at"
+            "taken_at",
+            [("user_id", 1), ("taken_at", -1)]  # Recent quizzes per user
         ]
     
     def __str__(self) -> str:
@@ -1,8 +1,8 @@
 """Upload model."""
 
 from beanie import Document
-from pydantic import Field
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
 from datetime import datetime
 from enum import Enum
 from app.models.base import BaseDocument, PyObjectId
@@ -10,6 +10,8 @@ from app.models.base import BaseDocument, PyObjectId
 
 class UploadStatus(str, Enum):
     """Upload processing status."""
+    UPLOADING = "uploading"  # resumable upload waiting for parts
+    ASSEMBLING = "assembling"  # resumable upload being joined into its final file
     PENDING = "pending"
     PROCESSING = "processing"
     COMPLETED = "completed"
@@ -25,6 +27,13 @@ class FileType(str, Enum):
     IMAGE = "image"
 
 
+class UploadPart(BaseModel):
+    """A received part of a resumable upload."""
+    size: int
+    sha256: str
+    received_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class Upload(BaseDocument):
     """Upload document model."""
     
@@ -33,9 +42,14 @@ class Upload(BaseDocument):
     file_type: FileType
     file_path: str
     file_size: int
+    content_hash: Optional[str] = None  # sha256 of the file
     status: UploadStatus = UploadStatus.PENDING
     extracted_text: Optional[str] = None
     metadata: Optional[dict] = None
+    # Resumable uploads: parts received so far, keyed by part number
+    part_size: Optional[int] = None
+    parts: Optional[Dict[str, UploadPart]] = None
+    expires_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
@@ -44,7 +58,9 @@ class Upload(BaseDocument):
             "user_id",
             "file_type",
             "status",
-            "created_at"
+            "created_at",
+            "expires_at",
+            [("user_id", 1), ("created_at", -1), ("_id", -1)]  # Keyset pagination of a user's uploads
         ]
     
     def __str__(self) -> str:
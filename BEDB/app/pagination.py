@@ -0,0 +1,95 @@
+"""Keyset (cursor) pagination helpers."""
+
+import base64
+from typing import Any, Dict, List, Optional, Sequence
+
+from beanie.odm.queries.find import FindMany
+from bson import json_util
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row as an opaque token."""
+    return base64.urlsafe_b64encode(json_util.dumps(list(values)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a token from ``encode_cursor``; a malformed token is a 400."""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        values = None
+    if not isinstance(values, list) or len(values) != 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
+
+
+def keyset_filter(field: str, cursor: Optional[str], descending: bool = True) -> Dict[str, Any]:
+    """Filter for the rows after ``cursor`` in (``field``, ``_id``) order.
+
+    ``_id`` breaks ties between rows with the same ``field`` value, so no
+    row is skipped or repeated across pages. Returns {} for the first page.
+    """
+    if not cursor:
+        return {}
+    value, last_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {"$or": [{field: {op: value}}, {field: value, "_id": {op: last_id}}]}
+
+
+def keyset_sort(field: str, descending: bool = True) -> Dict[str, int]:
+    """Sort matching ``keyset_filter``."""
+    direction = -1 if descending else 1
+    return {field: direction, "_id": direction}
+
+
+def _row_value(row: Any, field: str) -> Any:
+    """Read a field from a raw document or a model instance."""
+    if isinstance(row, dict):
+        return row[field]
+    return getattr(row, "id" if field == "_id" else field)
+
+
+def next_cursor(rows: Sequence[Any], field: str, limit: int) -> Optional[str]:
+    """Cursor of the page after ``rows``, or None if this was the last page."""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor([_row_value(last, field), _row_value(last, "_id")])
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]):
+    """Expose the next page's cursor in the ``X-Next-Cursor`` header."""
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+
+async def paginate(
+    query: FindMany,
+    response: Response,
+    field: str,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 10,
+    descending: bool = True
+) -> List[Any]:
+    """Fetch one page of a Beanie query ordered by (``field``, ``_id``).
+
+    With a cursor the page starts right after it, which costs the same at
+    any depth. Without one, ``skip`` is applied as before. Either way the
+    next page's cursor is set in the ``X-Next-Cursor`` header.
+    """
+    keyset = keyset_filter(field, cursor, descending)
+    if keyset:
+        query = query.find(keyset)
+    elif skip:
+        query = query.skip(skip)
+
+    rows = await query.sort(list(keyset_sort(field, descending).items())).limit(limit).to_list()
+    set_next_cursor(response, next_cursor(rows, field, limit))
+    return rows
@@ -0,0 +1,73 @@
+"""orjson responses and the trusted-output fast path."""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Type
+
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+from pydantic import BaseModel
+
+
+def orjson_default(obj: Any) -> Any:
+    """Serialize the types orjson does not handle natively."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(_ORJSONResponse):
+    """ORJSONResponse that also serializes ObjectIds and pydantic models."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+_schema_fields: Dict[Type[BaseModel], FrozenSet[str]] = {}
+
+
+def schema_fields(schema: Type[BaseModel]) -> FrozenSet[str]:
+    """Field names of a response schema (cached)."""
+    fields = _schema_fields.get(schema)
+    if fields is None:
+        fields = _schema_fields[schema] = frozenset(schema.model_fields)
+    return fields
+
+
+def dump(row: BaseModel, schema: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
+    """Dump a document as the fields of ``schema`` without validating it again.
+
+    Documents were already validated when Beanie loaded them, and
+    ``PyObjectId`` fields dump as strings, so the result matches the schema.
+    """
+    if schema is None:
+        return row.model_dump()
+    return row.model_dump(include=schema_fields(schema))
+
+
+def trusted_response(
+    rows: Iterable[BaseModel],
+    schema: Optional[Type[BaseModel]] = None,
+    response: Optional[Response] = None
+) -> ORJSONResponse:
+    """Render ODM output directly, skipping FastAPI's response_model pass.
+
+    Returning a model from an endpoint makes FastAPI dump it, validate the
+    dump against ``response_model`` and run ``jsonable_encoder`` over it;
+    for trusted database output that is pure overhead. The declared
+    ``response_model`` is still used for the OpenAPI schema.
+
+    Headers set on the injected ``response`` (e.g. ``X-Next-Cursor``) are
+    copied, since FastAPI ignores them when a Response is returned.
+    """
+    content: List[Dict[str, Any]] = [dump(row, schema) for row in rows]
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return ORJSONResponse(content, headers=headers)
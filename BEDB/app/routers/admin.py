@@ -1,13 +1,15 @@
 """Admin endpoints."""
 
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from typing import List, Optional
 from app.schemas.auth import UserResponse
-from app.schemas.course import CourseCreate, CourseResponse
+from app.schemas.course import CourseCreate, CourseResponse, CourseSummary
 from app.models.user import User, UserRole
 from app.models.course import Course
 from app.models.quiz import QuizHistory
 from app.auth import get_current_active_user
+from app.pagination import paginate
+from app.responses import trusted_response
 from bson import ObjectId
 from pydantic import BaseModel
 
@@ -39,12 +41,14 @@ async def get_admin_user(current_user: User = Depends(get_current_active_user))
 
 @router.get("/users", response_model=List[UserResponse])
 async def get_users(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     admin_user: User = Depends(get_admin_user)
 ):
     """Get list of all users (admin only)."""
-    users = await User.find().skip(skip).limit(limit).to_list()
+    users = await paginate(User.find(), response, "created_at", cursor, skip, limit, descending=False)
     return [UserResponse.model_validate(user) for user in users]
 
 
@@ -96,6 +100,18 @@ async def get_admin_stats(admin_user: User = Depends(get_admin_user)):
         )
 
 
+@router.get("/cache-stats")
+async def get_cache_stats(admin_user: User = Depends(get_admin_user)):
+    """Get cache hit/miss counters (admin only)."""
+    from app.services.embedding_service import embedding_service
+    from app.services.genai_service import genai_service
+    return {
+        "embedding_model": embedding_service.model_key,
+        "embeddings": embedding_service.cache.stats(),
+        "responses": genai_service.cache.stats()
+    }
+
+
 @router.post("/courses", response_model=CourseResponse)
 async def create_sample_course(
     course_data: CourseCreate,
@@ -116,15 +132,15 @@ async def create_sample_course(
     return CourseResponse.model_validate(course)
 
 
-@router.get("/courses", response_model=List[CourseResponse])
+@router.get("/courses", response_model=List[CourseSummary])
 async def get_all_courses(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     admin_user: User = Depends(get_admin_user)
 ):
     """Get all courses (admin only)."""
-    courses = await Course.find().skip(skip).limit(limit).to_list()
-    return [CourseResponse.model_validate(course) for course in courses]
+    courses = await Course.find().project(CourseSummary).skip(skip).limit(limit).to_list()
+    return trusted_response(courses)
 
 
 @router.delete("/courses/{course_id}")
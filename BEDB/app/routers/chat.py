@@ -1,6 +1,7 @@
 """Chat endpoints."""
 
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from app.schemas.chat import (
     ChatSessionCreate, ChatSessionResponse, ChatMessageCreate, 
@@ -11,8 +12,11 @@ from app.models.course import Course
 from app.models.upload import Upload
 from app.models.user import User
 from app.auth import get_current_active_user
+from app.pagination import paginate
+from app.responses import trusted_response
 from app.services.genai_service import genai_service
 from app.services.vector_service import vector_service
+from app.utils import cancel_on_disconnect, format_sse
 from bson import ObjectId
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -63,16 +67,19 @@ async def create_chat_session(
 
 @router.get("/sessions", response_model=List[ChatSessionResponse])
 async def get_chat_sessions(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user's chat sessions."""
-    sessions = await ChatSession.find(
-        ChatSession.user_id == current_user.id
-    ).skip(skip).limit(limit).sort("-created_at").to_list()
+    sessions = await paginate(
+        ChatSession.find(ChatSession.user_id == current_user.id),
+        response, "created_at", cursor, skip, limit
+    )
     
-    return [ChatSessionResponse.model_validate(session) for session in sessions]
+    return trusted_response(sessions, ChatSessionResponse, response)
 
 
 @router.get("/sessions/{session_id}", response_model=ChatSessionResponse)
@@ -106,6 +113,8 @@ async def get_chat_session(
 @router.get("/sessions/{session_id}/messages", response_model=List[ChatMessageResponse])
 async def get_chat_messages(
     session_id: str,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_active_user)
@@ -125,11 +134,14 @@ async def get_chat_messages(
                 detail="Not authorized to access this chat session"
             )
         
-        messages = await ChatMessage.find(
-            ChatMessage.session_id == session.id
-        ).skip(skip).limit(limit).sort("created_at").to_list()
+        messages = await paginate(
+            ChatMessage.find(ChatMessage.session_id == session.id),
+            response, "created_at", cursor, skip, limit, descending=False
+        )
         
-        return [ChatMessageResponse.model_validate(message) for message in messages]
+        return trusted_response(messages, ChatMessageResponse, response)
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -137,10 +149,37 @@ async def get_chat_messages(
         )
 
 
+async def _session_context(session: ChatSession, message: str) -> Optional[str]:
+    """Get relevant context for a message from the session's course or upload."""
+    if session.mode == ChatMode.STRICT or session.mode == ChatMode.HYBRID:
+        if session.course_id:
+            return await vector_service.get_relevant_context(
+                query=message,
+                course_id=str(session.course_id)
+            )
+        elif session.upload_id:
+            return await vector_service.get_relevant_context(
+                query=message,
+                upload_id=str(session.upload_id),
+                user_id=str(session.user_id)
+            )
+    return None
+
+
+def _cache_scope(session: ChatSession) -> Optional[str]:
+    """Scope in which answers to similar questions may be reused."""
+    if session.course_id:
+        return f"course:{session.course_id}"
+    if session.upload_id:
+        return f"upload:{session.upload_id}"
+    return None
+
+
 @router.post("/sessions/{session_id}/messages", response_model=ChatResponse)
 async def send_message(
     session_id: str,
     message_data: ChatMessageCreate,
+    request: Request,
     current_user: User = Depends(get_current_active_user)
 ):
     """Send a message in a chat session."""
@@ -167,26 +206,18 @@ async def send_message(
         await user_message.insert()
         
         # Get context based on session mode and associated content
-        context = None
-        if session.mode == ChatMode.STRICT or session.mode == ChatMode.HYBRID:
-            if session.course_id:
-                context = await vector_service.get_relevant_context(
-                    query=message_data.message,
-                    course_id=str(session.course_id)
-                )
-            elif session.upload_id:
-                context = await vector_service.get_relevant_context(
-                    query=message_data.message,
-                    upload_id=str(session.upload_id)
-                )
+        context = await _session_context(session, message_data.message)
         
         # Generate AI response
         try:
-            ai_response = await genai_service.chat_with_context(
+            ai_response = await cancel_on_disconnect(request, genai_service.chat_with_context(
                 message=message_data.message,
                 context=context,
-                mode=session.mode
-            )
+                mode=session.mode,
+                cache_scope=_cache_scope(session)
+            ))
+        except HTTPException:
+            raise
         except Exception as e:
             ai_response = f"Sorry, I encountered an error while processing your request: {str(e)}"
         
@@ -210,9 +241,83 @@ async def send_message(
         )
 
 
+@router.post("/sessions/{session_id}/messages/stream")
+async def stream_message(
+    session_id: str,
+    message_data: ChatMessageCreate,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Send a message in a chat session and stream the answer as Server-Sent Events.
+    
+    Emits ``token`` events while the answer is generated and a final ``done``
+    event once the AI message has been saved. If the client disconnects the
+    upstream call is cancelled and no AI message is saved.
+    """
+    try:
+        session = await ChatSession.get(ObjectId(session_id))
+    except Exception:
+        session = None
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat session not found"
+        )
+    
+    if session.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to send messages in this chat session"
+        )
+    
+    # Save user message
+    user_message = ChatMessage(
+        session_id=session.id,
+        sender="user",
+        message=message_data.message
+    )
+    await user_message.insert()
+    
+    context = await _session_context(session, message_data.message)
+    
+    async def event_stream():
+        parts = []
+        tokens = genai_service.stream_chat_with_context(
+            message=message_data.message,
+            context=context,
+            mode=session.mode,
+            cache_scope=_cache_scope(session)
+        )
+        try:
+            async for token in tokens:
+                parts.append(token)
+                yield format_sse({"token": token}, event="token")
+        except Exception as e:
+            yield format_sse({"detail": str(e)}, event="error")
+            return
+        finally:
+            await tokens.aclose()
+        
+        # Save AI response once the stream has completed
+        ai_message = ChatMessage(
+            session_id=session.id,
+            sender="ai",
+            message=message_data.message,
+            answer="".join(parts)
+        )
+        await ai_message.insert()
+        yield format_sse({"message_id": str(ai_message.id)}, event="done")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/", response_model=ChatResponse)
 async def freestyle_chat(
     message: str,
+    request: Request,
     mode: ChatMode = ChatMode.HYBRID,
     session_id: Optional[str] = None,
     current_user: User = Depends(get_current_active_user)
@@ -220,11 +325,11 @@ async def freestyle_chat(
     """Freestyle chat without a session."""
     try:
         # Generate AI response
-        ai_response = await genai_service.chat_with_context(
+        ai_response = await cancel_on_disconnect(request, genai_service.chat_with_context(
             message=message,
             context=None,
             mode=mode
-        )
+        ))
         
         return ChatResponse(
             message=message,
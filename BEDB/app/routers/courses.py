@@ -1,17 +1,20 @@
 """Course management endpoints."""
 
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from app.schemas.course import (
-    CourseCreate, CourseUpdate, CourseResponse, 
-    ChapterCreate, ChapterUpdate, ChapterResponse
+    CourseCreate, CourseUpdate, CourseResponse, CourseSummary,
+    ChapterCreate, ChapterUpdate, ChapterResponse, ChapterSummary
 )
 from app.models.course import Course, Chapter
 from app.models.user import User
 from app.auth import get_current_active_user
+from app.pagination import paginate
+from app.responses import trusted_response
 from app.services.genai_service import genai_service
 from app.services.vector_service import vector_service
-from app.utils import validate_object_id, safe_object_id_conversion
+from app.utils import validate_object_id, safe_object_id_conversion, cancel_on_disconnect, format_sse
 from bson import ObjectId
 
 router = APIRouter(prefix="/courses", tags=["courses"])
@@ -129,32 +132,33 @@ async def create_course_from_upload(
         )
 
 
-@router.get("/", response_model=List[CourseResponse])
+@router.get("/", response_model=List[CourseSummary])
 async def get_courses(
+    response: Response,
     owner: str = Query("user", description="Filter by owner: 'user' or 'system'"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get courses based on owner filter."""
     if owner == "user":
-        courses = await Course.find(
-            Course.owner_id == current_user.id
-        ).skip(skip).limit(limit).to_list()
+        query = Course.find(Course.owner_id == current_user.id)
     elif owner == "system":
         # Get system/sample courses (you can define criteria for system courses)
-        courses = await Course.find(
-            Course.owner_id != current_user.id
-        ).skip(skip).limit(limit).to_list()
+        query = Course.find(Course.owner_id != current_user.id)
     else:
         # Get all courses user has access to
-        courses = await Course.find().skip(skip).limit(limit).to_list()
+        query = Course.find()
     
-    return [CourseResponse.model_validate(course) for course in courses]
+    courses = await paginate(query.project(CourseSummary), response, "created_at", cursor, skip, limit, descending=False)
+    return trusted_response(courses, response=response)
 
 
-@router.get("/public", response_model=List[CourseResponse])
+@router.get("/public", response_model=List[CourseSummary])
 async def get_public_courses(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     level: Optional[str] = None,
@@ -167,8 +171,10 @@ async def get_public_courses(
     if tags:
         query["tags"] = {"$in": tags}
     
-    courses = await Course.find(query).skip(skip).limit(limit).to_list()
-    return [CourseResponse.model_validate(course) for course in courses]
+    courses = await paginate(
+        Course.find(query).project(CourseSummary), response, "created_at", cursor, skip, limit, descending=False
+    )
+    return trusted_response(courses, response=response)
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
@@ -264,6 +270,9 @@ async def delete_course(
         # Delete associated chapters
         await Chapter.find(Chapter.course_id == course.id).delete()
         
+        # Delete course and chapter embeddings
+        await vector_service.delete_course_embeddings(course_id)
+        
         # Delete course
         await course.delete()
         
@@ -307,7 +316,7 @@ async def create_chapter(
         await chapter.insert()
         
         # Index chapter content
-        await vector_service.index_course_content(str(course.id))
+        await vector_service.index_chapter_content(chapter)
         
         return ChapterResponse.model_validate(chapter)
     except Exception:
@@ -317,25 +326,25 @@ async def create_chapter(
         )
 
 
-@router.get("/{course_id}/chapters", response_model=List[ChapterResponse])
+@router.get("/{course_id}/chapters", response_model=List[ChapterSummary])
 async def get_chapters(
     course_id: str,
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get chapters for a course."""
+    """Get chapters for a course; chapter content is only returned by get_chapter."""
     try:
-        course = await Course.get(ObjectId(course_id))
-        if not course:
+        obj_id = ObjectId(course_id)
+        if not await Course.find(Course.id == obj_id).count():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Course not found"
             )
         
         chapters = await Chapter.find(
-            Chapter.course_id == course.id
-        ).sort("order").to_list()
+            Chapter.course_id == obj_id
+        ).sort("order").project(ChapterSummary).to_list()
         
-        return [ChapterResponse.model_validate(chapter) for chapter in chapters]
+        return trusted_response(chapters)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -397,8 +406,8 @@ async def update_chapter(
         
         await chapter.save()
         
-        # Re-index course content
-        await vector_service.index_course_content(str(course.id))
+        # Re-index only the chunks of this chapter that changed
+        await vector_service.index_chapter_content(chapter)
         
         return ChapterResponse.model_validate(chapter)
     except Exception:
@@ -433,8 +442,8 @@ async def delete_chapter(
         
         await chapter.delete()
         
-        # Re-index course content
-        await vector_service.index_course_content(str(course.id))
+        # Remove chapter chunks from the vector index
+        await vector_service.delete_document_embeddings(chapter_id)
         
         return {"message": "Chapter deleted successfully"}
     except Exception:
@@ -448,6 +457,7 @@ async def delete_chapter(
 async def generate_course_outline(
     course_id: str,
     prompt: str,
+    request: Request,
     current_user: User = Depends(get_current_active_user)
 ):
     """Generate course outline using AI."""
@@ -466,9 +476,11 @@ async def generate_course_outline(
             )
         
         # Generate outline using AI
-        outline = await genai_service.generate_course_outline(prompt, course.level)
+        outline = await cancel_on_disconnect(request, genai_service.generate_course_outline(prompt, course.level))
         
         return {"outline": outline}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -480,6 +492,7 @@ async def generate_course_outline(
 async def chat_with_course(
     course_id: str,
     message: str,
+    request: Request,
     mode: str = "hybrid",
     current_user: User = Depends(get_current_active_user)
 ):
@@ -492,14 +505,7 @@ async def chat_with_course(
                 detail="Course not found"
             )
         
-        # Get course content for context
-        chapters = await Chapter.find(Chapter.course_id == course.id).to_list()
-        content = course.description + "\n\n"
-        
-        for chapter in chapters:
-            content += f"Chapter {chapter.order}: {chapter.title}\n{chapter.content}\n\n"
-        
-        # Get relevant context using vector search
+        # Get relevant chunks using vector search
         context = await vector_service.get_relevant_context(
             query=message,
             course_id=course_id
@@ -509,16 +515,19 @@ async def chat_with_course(
         from app.models.chat import ChatMode
         chat_mode = ChatMode.STRICT if mode == "strict" else ChatMode.HYBRID
         
-        answer = await genai_service.chat_with_context(
+        answer = await cancel_on_disconnect(request, genai_service.chat_with_context(
             message=message,
-            context=context or content,
-            mode=chat_mode
-        )
+            context=context or course.description,
+            mode=chat_mode,
+            cache_scope=f"course:{course_id}"
+        ))
         
         return {
             "answer": answer,
             "source_context": context[:500] if context else None  # Truncate for response
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -526,10 +535,63 @@ async def chat_with_course(
         )
 
 
+@router.post("/{course_id}/chat/stream")
+async def stream_chat_with_course(
+    course_id: str,
+    message: str,
+    mode: str = "hybrid",
+    current_user: User = Depends(get_current_active_user)
+):
+    """Chat with AI in course context, streaming the answer as Server-Sent Events."""
+    try:
+        course = await Course.get(ObjectId(course_id))
+    except Exception:
+        course = None
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    # Get relevant chunks using vector search
+    context = await vector_service.get_relevant_context(
+        query=message,
+        course_id=course_id
+    )
+    
+    from app.models.chat import ChatMode
+    chat_mode = ChatMode.STRICT if mode == "strict" else ChatMode.HYBRID
+    
+    async def event_stream():
+        yield format_sse({"source_context": context[:500] if context else None}, event="context")
+        tokens = genai_service.stream_chat_with_context(
+            message=message,
+            context=context or course.description,
+            mode=chat_mode,
+            cache_scope=f"course:{course_id}"
+        )
+        try:
+            async for token in tokens:
+                yield format_sse({"token": token}, event="token")
+        except Exception as e:
+            yield format_sse({"detail": str(e)}, event="error")
+            return
+        finally:
+            await tokens.aclose()
+        yield format_sse({}, event="done")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/{course_id}/summarize")
 async def summarize_chapter(
     course_id: str,
     chapter_id: str,
+    request: Request,
     current_user: User = Depends(get_current_active_user)
 ):
     """Generate summary for a chapter."""
@@ -542,9 +604,11 @@ async def summarize_chapter(
             )
         
         # Generate summary using AI
-        summary = await genai_service.generate_summary(chapter.content)
+        summary = await cancel_on_disconnect(request, genai_service.generate_summary(chapter.content))
         
         return {"summary": summary}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -556,6 +620,7 @@ async def summarize_chapter(
 async def generate_flashcards(
     course_id: str,
     chapter_id: str,
+    request: Request,
     num_cards: int = 10,
     current_user: User = Depends(get_current_active_user)
 ):
@@ -569,9 +634,11 @@ async def generate_flashcards(
             )
         
         # Generate flashcards using AI
-        flashcards = await genai_service.generate_flashcards(chapter.content, num_cards)
+        flashcards = await cancel_on_disconnect(request, genai_service.generate_flashcards(chapter.content, num_cards))
         
         return flashcards
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -8,6 +8,8 @@ from app.models.course import Course, Chapter
 from app.models.quiz import QuizHistory
 from app.models.user import User
 from app.auth import get_current_active_user
+from app.loaders import Loaders, get_loaders
+from app.services.user_stats import user_stats_service, completed_course_count, completion_delta
 from bson import ObjectId
 from datetime import datetime, timedelta
 
@@ -20,25 +22,16 @@ async def get_dashboard_overview(
 ):
     """Get dashboard overview statistics."""
     try:
-        # Get user's courses
-        user_courses = await Course.find(Course.owner_id == current_user.id).to_list()
-        total_courses = len(user_courses)
+        # Count user's courses
+        total_courses = await Course.find(Course.owner_id == current_user.id).count()
         
-        # Get completed courses
-        completed_progress = await DashboardProgress.find(
-            DashboardProgress.user_id == current_user.id,
-            DashboardProgress.status == ProgressStatus.COMPLETED
-        ).to_list()
-        completed_courses = len(set(p.course_id for p in completed_progress))
-        
-        # Get quiz statistics
-        quiz_history = await QuizHistory.find(
-            QuizHistory.user_id == current_user.id
-        ).to_list()
-        total_quizzes = len(quiz_history)
+        # Completed courses, quizzes and time spent come from the materialised stats
+        stats = await user_stats_service.get(current_user.id)
+        completed_courses = completed_course_count(stats)
+        total_quizzes = stats["quiz_count"]
         
         # Calculate total time spent (in hours)
-        total_time_spent = sum(p.time_spent for p in completed_progress) / 60  # Convert to hours
+        total_time_spent = stats["time_spent"] / 60  # Convert to hours
         
         # Calculate completion rate
         completion_rate = (completed_courses / total_courses * 100) if total_courses > 0 else 0
@@ -61,92 +54,8 @@ async def get_dashboard_stats(
 ):
     """Get dashboard statistics for the current user."""
     try:
-        # Get user's courses
-        user_courses = await Course.find(Course.owner_id == current_user.id).to_list()
-        total_courses = len(user_courses)
-        
-        # Get completed courses
-        completed_progress = await DashboardProgress.find(
-            DashboardProgress.user_id == current_user.id,
-            DashboardProgress.status == ProgressStatus.COMPLETED
-        ).to_list()
-        completed_courses = len(set(p.course_id for p in completed_progress))
-        
-        # Get quiz statistics
-        quiz_history = await QuizHistory.find(
-            QuizHistory.user_id == current_user.id
-        ).to_list()
-        total_quizzes = len(quiz_history)
-        
-        # Calculate average score
-        average_score = 0
-        if quiz_history:
-            total_score = sum(qh.score for qh in quiz_history)
-            average_score = total_score / len(quiz_history)
-        
-        # Calculate total time spent
-        total_time_spent = sum(p.time_spent for p in completed_progress)
-        
-        # Get recent activity (last 7 days)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_quiz_history = await QuizHistory.find(
-            QuizHistory.user_id == current_user.id,
-            QuizHistory.taken_at >= week_ago
-        ).sort("-taken_at").limit(10).to_list()
-        
-        recent_activity = []
-        for qh in recent_quiz_history:
-            recent_activity.append({
-                "type": "quiz",
-                "title": f"Quiz completed",
-                "score": qh.score,
-                "date": qh.taken_at
-            })
-        
-        # Get progress by course
-        progress_by_course = []
-        for course in user_courses:
-            course_progress = await DashboardProgress.find(
-                DashboardProgress.user_id == current_user.id,
-                DashboardProgress.course_id == course.id
-            ).to_list()
-            
-            if course_progress:
-                avg_progress = sum(p.progress for p in course_progress) / len(course_progress)
-                progress_by_course.append({
-                    "course_id": str(course.id),
-                    "course_title": course.title,
-                    "progress": avg_progress
-                })
-        
-        # Get weekly progress (last 4 weeks)
-        weekly_progress = []
-        for i in range(4):
-            week_start = datetime.utcnow() - timedelta(weeks=i+1)
-            week_end = datetime.utcnow() - timedelta(weeks=i)
-            
-            week_quiz_history = await QuizHistory.find(
-                QuizHistory.user_id == current_user.id,
-                QuizHistory.taken_at >= week_start,
-                QuizHistory.taken_at < week_end
-            ).to_list()
-            
-            weekly_progress.append({
-                "week": f"Week {4-i}",
-                "quizzes_taken": len(week_quiz_history),
-                "average_score": sum(qh.score for qh in week_quiz_history) / len(week_quiz_history) if week_quiz_history else 0
-            })
-        
-        return DashboardStats(
-            total_courses=total_courses,
-            completed_courses=completed_courses,
-            total_quizzes=total_quizzes,
-            total_time_spent=total_time_spent,
-            average_score=average_score,
-            recent_activity=recent_activity,
-            progress_by_course=progress_by_course,
-            weekly_progress=weekly_progress
-        )
+        # Stats document, courses, progress and recent quizzes in one aggregation
+        return DashboardStats(**await user_stats_service.get_dashboard(current_user.id))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -154,11 +63,21 @@ async def get_dashboard_stats(
         )
 
 
+async def _count_by_course(model, match: dict) -> dict:
+    """Count a model's documents per course_id with one aggregation."""
+    rows = await model.get_pymongo_collection().aggregate([
+        {"$match": match},
+        {"$group": {"_id": "$course_id", "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+    return {row["_id"]: row["count"] for row in rows}
+
+
 @router.get("/progress", response_model=List[CourseProgress])
 async def get_course_progress(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """Get course progress for the current user."""
     try:
@@ -167,23 +86,22 @@ async def get_course_progress(
             DashboardProgress.user_id == current_user.id
         ).skip(skip).limit(limit).sort("-last_accessed").to_list()
         
+        # Get course details, chapter counts and completed chapters for all records at once
+        course_ids = list({progress.course_id for progress in progress_records})
+        courses = dict(zip(course_ids, await loaders[Course].load_many(course_ids)))
+        total_chapters = await _count_by_course(Chapter, {"course_id": {"$in": course_ids}})
+        completed_chapters = await _count_by_course(DashboardProgress, {
+            "user_id": current_user.id,
+            "course_id": {"$in": course_ids},
+            "status": ProgressStatus.COMPLETED.value
+        })
+        
         course_progress = []
         for progress in progress_records:
-            # Get course details
-            course = await Course.get(progress.course_id)
+            course = courses.get(progress.course_id)
             if not course:
                 continue
             
-            # Get chapter count
-            total_chapters = await Chapter.find(Chapter.course_id == course.id).count()
-            
-            # Get completed chapters
-            completed_chapters = await DashboardProgress.find(
-                DashboardProgress.user_id == current_user.id,
-                DashboardProgress.course_id == course.id,
-                DashboardProgress.status == ProgressStatus.COMPLETED
-            ).count()
-            
             course_progress.append(CourseProgress(
                 course_id=str(course.id),
                 course_title=course.title,
@@ -191,8 +109,8 @@ async def get_course_progress(
                 status=progress.status,
                 time_spent=progress.time_spent,
                 last_accessed=progress.last_accessed,
-                chapters_completed=completed_chapters,
-                total_chapters=total_chapters
+                chapters_completed=completed_chapters.get(course.id, 0),
+                total_chapters=total_chapters.get(course.id, 0)
             ))
         
         return course_progress
@@ -234,7 +152,10 @@ async def update_progress(
             DashboardProgress.chapter_id == ObjectId(progress_data.chapter_id) if progress_data.chapter_id else None
         )
         
+        is_completed = progress_data.status == ProgressStatus.COMPLETED
         if existing_progress:
+            was_completed = existing_progress.status == ProgressStatus.COMPLETED
+            
             # Update existing progress
             existing_progress.status = progress_data.status
             existing_progress.progress = progress_data.progress
@@ -242,6 +163,8 @@ async def update_progress(
             existing_progress.last_accessed = datetime.utcnow()
             await existing_progress.save()
         else:
+            was_completed = False
+            
             # Create new progress record
             new_progress = DashboardProgress(
                 user_id=current_user.id,
@@ -253,6 +176,13 @@ async def update_progress(
             )
             await new_progress.insert()
         
+        await user_stats_service.record_progress(
+            current_user.id,
+            progress_data.course_id,
+            time_spent=progress_data.time_spent,
+            completed=completion_delta(was_completed, is_completed)
+        )
+        
         return {"message": "Progress updated successfully"}
     except Exception:
         raise HTTPException(
@@ -312,7 +242,8 @@ async def get_course_progress_detail(
 
 @router.get("/recommendations", response_model=List[dict])
 async def get_learning_recommendations(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """Get personalized learning recommendations."""
     try:
@@ -324,17 +255,20 @@ async def get_learning_recommendations(
         ).to_list()
         
         # Find courses that need attention
-        for progress in progress_records:
-            if progress.status == ProgressStatus.IN_PROGRESS and progress.progress < 50:
-                course = await Course.get(progress.course_id)
-                if course:
-                    recommendations.append({
-                        "type": "continue_course",
-                        "title": f"Continue learning: {course.title}",
-                        "description": f"You're {progress.progress:.1f}% through this course",
-                        "course_id": str(course.id),
-                        "priority": "high"
-                    })
+        needs_attention = [
+            progress for progress in progress_records
+            if progress.status == ProgressStatus.IN_PROGRESS and progress.progress < 50
+        ]
+        courses = await loaders[Course].load_many(p.course_id for p in needs_attention)
+        for progress, course in zip(needs_attention, courses):
+            if course:
+                recommendations.append({
+                    "type": "continue_course",
+                    "title": f"Continue learning: {course.title}",
+                    "description": f"You're {progress.progress:.1f}% through this course",
+                    "course_id": str(course.id),
+                    "priority": "high"
+                })
         
         # Find courses that haven't been started recently
         recent_progress = await DashboardProgress.find(
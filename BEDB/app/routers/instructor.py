@@ -14,6 +14,7 @@ from app.models.enrollment import CourseEnrollment, EnrollmentStatus, ChapterPro
 from app.models.course import Course
 from app.models.user import User, UserRole
 from app.auth import get_current_active_user
+from app.loaders import Loaders, get_loaders
 
 router = APIRouter(prefix="/instructor", tags=["instructor"])
 
@@ -54,7 +55,8 @@ async def get_instructor_courses(
 async def get_course_students(
     course_id: str,
     status_filter: Optional[str] = Query(None, pattern="^(active|completed|dropped)$"),
-    instructor: User = Depends(get_instructor_user)
+    instructor: User = Depends(get_instructor_user),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """Get all students enrolled in a specific course."""
     try:
@@ -80,10 +82,11 @@ async def get_course_students(
         # Get enrollments
         enrollments = await CourseEnrollment.find(query).to_list()
         
-        # Get student details
+        # Get student details in one query
+        students = await loaders[User].load_many(e.student_id for e in enrollments)
+        
         students_info = []
-        for enrollment in enrollments:
-            student = await User.get(enrollment.student_id)
+        for enrollment, student in zip(enrollments, students):
             if student:
                 students_info.append(
                     StudentEnrollmentInfo(
@@ -269,7 +272,8 @@ async def get_instructor_dashboard(
 async def get_all_instructor_students(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-    instructor: User = Depends(get_instructor_user)
+    instructor: User = Depends(get_instructor_user),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """Get all students across all instructor's courses."""
     try:
@@ -286,21 +290,21 @@ async def get_all_instructor_students(
             CourseEnrollment.status == EnrollmentStatus.ACTIVE
         ).skip(skip).limit(limit).to_list()
         
-        # Get unique students
+        # Get unique students in one query
+        students = await loaders[User].load_many(e.student_id for e in enrollments)
+        
         student_dict = {}
-        for enrollment in enrollments:
-            if enrollment.student_id not in student_dict:
-                student = await User.get(enrollment.student_id)
-                if student:
-                    student_dict[enrollment.student_id] = StudentEnrollmentInfo(
-                        student_id=str(student.id),
-                        student_name=student.name,
-                        student_email=student.email,
-                        enrolled_at=enrollment.enrolled_at,
-                        progress=enrollment.progress,
-                        status=enrollment.status,
-                        last_accessed=enrollment.last_accessed
-                    )
+        for enrollment, student in zip(enrollments, students):
+            if student and enrollment.student_id not in student_dict:
+                student_dict[enrollment.student_id] = StudentEnrollmentInfo(
+                    student_id=str(student.id),
+                    student_name=student.name,
+                    student_email=student.email,
+                    enrolled_at=enrollment.enrolled_at,
+                    progress=enrollment.progress,
+                    status=enrollment.status,
+                    last_accessed=enrollment.last_accessed
+                )
         
         return list(student_dict.values())
         
@@ -3,9 +3,8 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import List
 from app.models.user import User
-from app.models.quiz import QuizHistory
-from app.models.dashboard import DashboardProgress, ProgressStatus
 from app.auth import get_current_active_user
+from app.services.leaderboard import leaderboard_service
 from bson import ObjectId
 from pydantic import BaseModel
 
@@ -28,38 +27,33 @@ async def get_leaderboard(
 ):
     """Get leaderboard rankings."""
     try:
-        # Get all users with their quiz performance
-        users = await User.find(User.is_active == True).to_list()
-        leaderboard = []
-        
-        for user in users:
-            # Get user's quiz history
-            quiz_history = await QuizHistory.find(
-                QuizHistory.user_id == user.id
-            ).to_list()
-            
-            # Get user's completed courses
-            completed_progress = await DashboardProgress.find(
-                DashboardProgress.user_id == user.id,
-                DashboardProgress.status == ProgressStatus.COMPLETED
-            ).to_list()
-            
-            if quiz_history:  # Only include users who have taken quizzes
-                average_score = sum(qh.score for qh in quiz_history) / len(quiz_history)
-                leaderboard.append(LeaderboardEntry(
-                    user_id=str(user.id),
-                    user_name=user.name,
-                    score=round(average_score, 1),
-                    quizzes_taken=len(quiz_history),
-                    courses_completed=len(set(p.course_id for p in completed_progress))
-                ))
-        
-        # Sort by average score (descending)
-        leaderboard.sort(key=lambda x: x.score, reverse=True)
-        
-        return leaderboard[:limit]
+        entries = await leaderboard_service.get_leaderboard(limit)
+        return [LeaderboardEntry(**entry) for entry in entries]
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get leaderboard: {str(e)}"
         )
+
+
+@router.get("/courses/{course_id}", response_model=List[LeaderboardEntry])
+async def get_course_leaderboard(
+    course_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get leaderboard rankings for one course's quizzes."""
+    if not ObjectId.is_valid(course_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    try:
+        entries = await leaderboard_service.get_course_leaderboard(ObjectId(course_id), limit)
+        return [LeaderboardEntry(**entry) for entry in entries]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get course leaderboard: {str(e)}"
+        )
@@ -1,6 +1,6 @@
 """Quiz endpoints."""
 
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
 from typing import List, Optional
 from app.schemas.quiz import (
     QuizCreate, QuizResponse, QuizQuestionResponse, 
@@ -11,7 +11,11 @@ from app.models.course import Course, Chapter
 from app.models.upload import Upload
 from app.models.user import User
 from app.auth import get_current_active_user
+from app.pagination import paginate
+from app.responses import trusted_response
 from app.services.genai_service import genai_service
+from app.services.user_stats import user_stats_service
+from app.utils import cancel_on_disconnect
 from bson import ObjectId
 
 router = APIRouter(prefix="/quiz", tags=["quiz"])
@@ -19,6 +23,7 @@ router = APIRouter(prefix="/quiz", tags=["quiz"])
 
 @router.post("/generate", response_model=dict)
 async def generate_quiz(
+    request: Request,
     course_id: Optional[str] = None,
     chapter_id: Optional[str] = None,
     prompt: Optional[str] = None,
@@ -71,7 +76,7 @@ async def generate_quiz(
             )
         
         # Generate quiz questions using AI
-        questions_data = await genai_service.generate_quiz_questions(content, num_questions)
+        questions_data = await cancel_on_disconnect(request, genai_service.generate_quiz_questions(content, num_questions))
         
         # Create quiz
         quiz = Quiz(
@@ -100,6 +105,8 @@ async def generate_quiz(
             "quiz_id": str(quiz.id),
             "questions": questions
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -195,6 +202,7 @@ async def create_quiz(
 async def create_quiz_from_course(
     course_id: str,
     title: str,
+    request: Request,
     num_questions: int = 5,
     current_user: User = Depends(get_current_active_user)
 ):
@@ -216,7 +224,7 @@ async def create_quiz_from_course(
             content += f"Chapter {chapter.order}: {chapter.title}\n{chapter.content}\n\n"
         
         # Generate quiz questions using AI
-        questions_data = await genai_service.generate_quiz_questions(content, num_questions)
+        questions_data = await cancel_on_disconnect(request, genai_service.generate_quiz_questions(content, num_questions))
         
         # Create quiz
         quiz = Quiz(
@@ -239,6 +247,8 @@ async def create_quiz_from_course(
             await question.insert()
         
         return QuizResponse.model_validate(quiz)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -250,6 +260,7 @@ async def create_quiz_from_course(
 async def create_quiz_from_upload(
     upload_id: str,
     title: str,
+    request: Request,
     num_questions: int = 5,
     current_user: User = Depends(get_current_active_user)
 ):
@@ -276,9 +287,9 @@ async def create_quiz_from_upload(
             )
         
         # Generate quiz questions using AI
-        questions_data = await genai_service.generate_quiz_questions(
+        questions_data = await cancel_on_disconnect(request, genai_service.generate_quiz_questions(
             upload.extracted_text, num_questions
-        )
+        ))
         
         # Create quiz
         quiz = Quiz(
@@ -301,6 +312,8 @@ async def create_quiz_from_upload(
             await question.insert()
         
         return QuizResponse.model_validate(quiz)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -310,6 +323,8 @@ async def create_quiz_from_upload(
 
 @router.get("/", response_model=List[QuizResponse])
 async def get_quizzes(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     course_id: Optional[str] = None,
@@ -320,8 +335,8 @@ async def get_quizzes(
     if course_id:
         query["course_id"] = ObjectId(course_id)
     
-    quizzes = await Quiz.find(query).skip(skip).limit(limit).sort("-created_at").to_list()
-    return [QuizResponse.model_validate(quiz) for quiz in quizzes]
+    quizzes = await paginate(Quiz.find(query), response, "created_at", cursor, skip, limit)
+    return trusted_response(quizzes, QuizResponse, response)
 
 
 @router.get("/{quiz_id}", response_model=QuizResponse)
@@ -435,6 +450,7 @@ async def submit_quiz(
             answers=answers
         )
         await quiz_history.insert()
+        await user_stats_service.record_quiz(current_user.id, score, quiz_history.taken_at)
         
         return QuizResult(
             quiz_id=str(quiz.id),
@@ -454,16 +470,19 @@ async def submit_quiz(
 
 @router.get("/history", response_model=List[QuizHistoryResponse])
 async def get_quiz_history(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user's quiz history."""
-    history = await QuizHistory.find(
-        QuizHistory.user_id == current_user.id
-    ).skip(skip).limit(limit).sort("-taken_at").to_list()
+    history = await paginate(
+        QuizHistory.find(QuizHistory.user_id == current_user.id),
+        response, "taken_at", cursor, skip, limit
+    )
     
-    return [QuizHistoryResponse.model_validate(record) for record in history]
+    return trusted_response(history, QuizHistoryResponse, response)
 
 
 @router.get("/history/{history_id}", response_model=QuizResult)
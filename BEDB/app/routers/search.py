@@ -30,12 +30,19 @@ async def search_documents(
     request: SearchRequest,
     current_user: User = Depends(get_current_active_user)
 ):
-    """Search documents using vector similarity."""
+    """Search course material and the user's own uploads using vector similarity."""
     try:
+        # Uploads are private to their owner; course material is shared and
+        # narrowed to one course when course_id is given
+        scopes = [
+            {"document_type": "upload", "owner_id": str(current_user.id)},
+            {"document_type": "course", "owner_id": request.course_id},
+            {"document_type": "chapter", "owner_id": request.course_id}
+        ]
         results = await vector_service.search_similar_documents(
             query=request.query,
-            document_type=None,
-            limit=request.top_k
+            limit=request.top_k,
+            scopes=scopes
         )
         
         search_results = []
@@ -47,7 +54,8 @@ async def search_documents(
                 source={
                     "file_id": result["metadata"].get("filename"),
                     "chapter_id": result["document_id"] if result["document_type"] == "chapter" else None,
-                    "offset": 0  # Placeholder
+                    "chunk_index": result["chunk_index"],
+                    "offset": result["start_pos"]
                 }
             ))
         
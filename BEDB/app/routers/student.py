@@ -1,6 +1,6 @@
 """Course enrollment endpoints."""
 
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
@@ -14,6 +14,9 @@ from app.models.enrollment import CourseEnrollment, EnrollmentStatus
 from app.models.course import Course, CourseVisibility
 from app.models.user import User, UserRole
 from app.auth import get_current_active_user
+from app.loaders import Loaders, get_loaders
+from app.pagination import keyset_filter, keyset_sort, next_cursor, set_next_cursor
+from app.services.user_stats import user_stats_service
 
 router = APIRouter(prefix="/student", tags=["student"])
 
@@ -150,14 +153,50 @@ async def unenroll_from_course(
         )
 
 
+def _enrolled_courses_pipeline(
+    student_id: ObjectId,
+    status_filter: Optional[str],
+    cursor: Optional[str],
+    skip: int,
+    limit: int
+) -> List[dict]:
+    """Page of a student's enrollments, newest first, joined to course summaries."""
+    match = {"student_id": student_id, **keyset_filter("enrolled_at", cursor)}
+    if status_filter:
+        match["status"] = status_filter
+    
+    pipeline = [{"$match": match}, {"$sort": keyset_sort("enrolled_at")}]
+    if skip and not cursor:
+        pipeline.append({"$skip": skip})
+    pipeline += [
+        {"$limit": limit},
+        {"$lookup": {
+            "from": "courses",
+            "localField": "course_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"title": 1, "description": 1, "level": 1}}],
+            "as": "course"
+        }},
+        # Keep enrollments of deleted courses so the cursor still advances past them
+        {"$unwind": {"path": "$course", "preserveNullAndEmptyArrays": True}}
+    ]
+    return pipeline
+
+
 @router.get("/enrolled-courses", response_model=List[EnrolledCourseInfo])
 async def get_enrolled_courses(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    skip: int = Query(0, ge=0, description="Offset, used only without a cursor"),
     limit: int = Query(20, ge=1, le=100),
-    status: Optional[str] = Query(None, pattern="^(active|completed|dropped)$"),
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(active|completed|dropped)$"),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all courses enrolled by the current student."""
+    """Get all courses enrolled by the current student.
+    
+    Pages are ordered by enrollment date, newest first. Pass the
+    ``X-Next-Cursor`` response header as ``cursor`` to get the next page.
+    """
     if current_user.role != UserRole.STUDENT:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -165,35 +204,25 @@ async def get_enrolled_courses(
         )
     
     try:
-        # Build query
-        query = {CourseEnrollment.student_id: current_user.id}
-        if status:
-            query[CourseEnrollment.status] = status
-        
-        # Get enrollments
-        enrollments = await CourseEnrollment.find(
-            query
-        ).skip(skip).limit(limit).to_list()
+        # Enrollments and the few course fields shown, in one aggregation
+        rows = await CourseEnrollment.get_pymongo_collection().aggregate(
+            _enrolled_courses_pipeline(current_user.id, status_filter, cursor, skip, limit)
+        ).to_list(length=None)
+        set_next_cursor(response, next_cursor(rows, "enrolled_at", limit))
         
-        # Get course details for each enrollment
-        enrolled_courses = []
-        for enrollment in enrollments:
-            course = await Course.get(enrollment.course_id)
-            if course:
-                enrolled_courses.append(
-                    EnrolledCourseInfo(
-                        course_id=str(course.id),
-                        title=course.title,
-                        description=course.description,
-                        level=course.level,
-                        enrollment_status=enrollment.status,
-                        progress=enrollment.progress,
-                        enrolled_at=enrollment.enrolled_at,
-                        last_accessed=enrollment.last_accessed
-                    )
-                )
-        
-        return enrolled_courses
+        return [
+            EnrolledCourseInfo(
+                course_id=str(row["course"]["_id"]),
+                title=row["course"]["title"],
+                description=row["course"]["description"],
+                level=row["course"]["level"],
+                enrollment_status=row["status"],
+                progress=row["progress"],
+                enrolled_at=row["enrolled_at"],
+                last_accessed=row.get("last_accessed")
+            )
+            for row in rows if row.get("course")
+        ]
         
     except HTTPException:
         raise
@@ -206,7 +235,8 @@ async def get_enrolled_courses(
 
 @router.get("/dashboard", response_model=StudentDashboardResponse)
 async def get_student_dashboard(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """Get student dashboard with statistics."""
     if current_user.role != UserRole.STUDENT:
@@ -225,19 +255,14 @@ async def get_student_dashboard(
         completed = len([e for e in all_enrollments if e.status == EnrollmentStatus.COMPLETED])
         in_progress = total_enrolled - completed
         
-        # Calculate average progress and total time spent
+        # Calculate average progress
         avg_progress = 0.0
-        total_time = 0
-        
         if all_enrollments:
             avg_progress = sum(e.progress for e in all_enrollments) / len(all_enrollments)
-            
-            # Get chapter progress for time calculation
-            from app.models.enrollment import ChapterProgress
-            all_chapter_progress = await ChapterProgress.find(
-                ChapterProgress.user_id == current_user.id
-            ).to_list()
-            total_time = sum(cp.time_spent for cp in all_chapter_progress)
+        
+        # Total time spent comes from the materialised stats
+        stats = await user_stats_service.get(current_user.id)
+        total_time = stats["time_spent"]
         
         # Get recent courses (last 5)
         recent_enrollments = await CourseEnrollment.find(
@@ -245,9 +270,10 @@ async def get_student_dashboard(
             CourseEnrollment.status == EnrollmentStatus.ACTIVE
         ).sort(-CourseEnrollment.enrolled_at).limit(5).to_list()
         
+        courses = await loaders[Course].load_many(e.course_id for e in recent_enrollments)
+        
         recent_courses = []
-        for enrollment in recent_enrollments:
-            course = await Course.get(enrollment.course_id)
+        for enrollment, course in zip(recent_enrollments, courses):
             if course:
                 recent_courses.append(
                     EnrolledCourseInfo(
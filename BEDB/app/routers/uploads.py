@@ -1,13 +1,22 @@
 """File upload endpoints."""
 
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
-from typing import List
-from app.schemas.upload import UploadResponse, UploadCreate
-from app.models.upload import Upload, UploadStatus
+import os
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response, UploadFile, File
+from typing import List, Optional
+from datetime import datetime, timedelta
+from app.config import settings
+from app.schemas.upload import (
+    UploadResponse, UploadCreate, ResumableUploadCreate, ResumableUploadStatus, UploadPartResponse
+)
+from app.models.upload import Upload, UploadPart, UploadStatus
 from app.models.user import User
 from app.auth import get_current_active_user
+from app.pagination import paginate
+from app.responses import trusted_response
+from app.services.extraction_cache import extraction_cache
 from app.services.file_service import file_service
-from app.services.genai_service import genai_service
+from app.services.job_queue import job_queue
+from app.services.upload_pipeline import PROCESS_UPLOAD, enqueue_upload
 from app.services.vector_service import vector_service
 from bson import ObjectId
 
@@ -20,6 +29,8 @@ async def upload_file(
     current_user: User = Depends(get_current_active_user)
 ):
     """Upload a file."""
+    file_info = None
+    upload = None
     try:
         # Save file
         file_info = await file_service.save_upload_file(file, str(current_user.id))
@@ -31,53 +42,228 @@ async def upload_file(
             file_type=file_info["file_type"],
             file_path=file_info["file_path"],
             file_size=file_info["file_size"],
+            content_hash=file_info["content_hash"],
             status=UploadStatus.PENDING
         )
         
         await upload.insert()
         
-        # Process file in background (extract text)
-        try:
-            extracted_text = await file_service.extract_text_from_file(
-                file_info["file_path"], file_info["file_type"]
-            )
-            
-            # Clean and process text using AI
-            cleaned_text = await genai_service.extract_text_from_content(extracted_text)
-            
-            # Update upload record
-            upload.extracted_text = cleaned_text
-            upload.status = UploadStatus.COMPLETED
-            await upload.save()
-            
-            # Index content for vector search
-            await vector_service.index_upload_content(str(upload.id))
-            
-        except Exception as e:
-            upload.status = UploadStatus.FAILED
-            upload.metadata = {"error": str(e)}
-            await upload.save()
+        # Extract and index the text in the background
+        await enqueue_upload(upload)
         
         return UploadResponse.model_validate(upload)
+    except HTTPException:
+        raise
     except Exception as e:
+        # Drop the record and the blob reference taken for it
+        try:
+            if upload is not None and upload.id is not None:
+                await upload.delete()
+            if file_info:
+                await file_service.remove_upload_file(file_info["file_path"], file_info["content_hash"])
+        except Exception as cleanup_error:
+            print(f"Cleanup after failed upload failed: {cleanup_error}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}"
         )
 
 
+async def _get_resumable_upload(upload_id: str, current_user: User) -> Upload:
+    """Get an unfinished resumable upload owned by the current user."""
+    try:
+        upload = await Upload.get(ObjectId(upload_id))
+    except Exception:
+        upload = None
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    
+    if upload.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this upload"
+        )
+    
+    if upload.status != UploadStatus.UPLOADING:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is already complete"
+        )
+    
+    return upload
+
+
+def _resumable_status(upload: Upload) -> ResumableUploadStatus:
+    """Describe the progress of a resumable upload."""
+    return ResumableUploadStatus(
+        id=str(upload.id),
+        filename=upload.filename,
+        file_size=upload.file_size,
+        part_size=upload.part_size,
+        part_count=file_service.part_count(upload.file_size, upload.part_size),
+        received_parts=sorted(int(number) for number in (upload.parts or {})),
+        expires_at=upload.expires_at
+    )
+
+
+@router.post("/resumable", response_model=ResumableUploadStatus)
+async def create_resumable_upload(
+    upload_data: ResumableUploadCreate,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start a resumable upload.
+    
+    Send parts numbered from 1 with ``PUT /uploads/resumable/{id}/parts/{n}``,
+    in any order and in parallel, then call ``complete``.
+    """
+    plan = file_service.plan_resumable_upload(upload_data.filename, upload_data.file_size)
+    
+    upload = Upload(
+        user_id=current_user.id,
+        filename=upload_data.filename,
+        file_type=plan["file_type"],
+        file_path="",
+        file_size=upload_data.file_size,
+        status=UploadStatus.UPLOADING,
+        part_size=plan["part_size"],
+        parts={},
+        expires_at=datetime.utcnow() + timedelta(hours=settings.resumable_upload_ttl_hours)
+    )
+    await upload.insert()
+    
+    return _resumable_status(upload)
+
+
+@router.get("/resumable/{upload_id}", response_model=ResumableUploadStatus)
+async def get_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the parts received so far, e.g. to resume an interrupted upload."""
+    upload = await _get_resumable_upload(upload_id, current_user)
+    return _resumable_status(upload)
+
+
+@router.put("/resumable/{upload_id}/parts/{part_number}", response_model=UploadPartResponse)
+async def upload_part(
+    upload_id: str,
+    part_number: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Upload one part as the raw request body; retrying a part replaces it."""
+    upload = await _get_resumable_upload(upload_id, current_user)
+    part_count = file_service.part_count(upload.file_size, upload.part_size)
+    if not 1 <= part_number <= part_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Part number must be between 1 and {part_count}"
+        )
+    
+    expected_size = file_service.expected_part_size(upload.file_size, upload.part_size, part_number)
+    size, sha256 = await file_service.save_upload_part(upload_id, part_number, request.stream(), expected_size)
+    
+    # Parts arrive in parallel, so record each one with its own atomic update
+    part = UploadPart(size=size, sha256=sha256)
+    result = await Upload.get_pymongo_collection().update_one(
+        {"_id": ObjectId(upload_id), "status": UploadStatus.UPLOADING.value},
+        {"$set": {f"parts.{part_number}": part.model_dump(), "updated_at": datetime.utcnow()}}
+    )
+    if not result.matched_count:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is already complete"
+        )
+    
+    return UploadPartResponse(part_number=part_number, size=size, sha256=sha256)
+
+
+@router.post("/resumable/{upload_id}/complete", response_model=UploadResponse)
+async def complete_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Assemble the parts into the final file and queue it for processing."""
+    upload = await _get_resumable_upload(upload_id, current_user)
+    part_count = file_service.part_count(upload.file_size, upload.part_size)
+    missing = [number for number in range(1, part_count + 1) if str(number) not in (upload.parts or {})]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing parts: {missing}"
+        )
+    
+    # Claim the upload first so a concurrent or retried complete cannot
+    # assemble (and add a blob reference) a second time
+    collection = Upload.get_pymongo_collection()
+    claimed = await collection.update_one(
+        {"_id": ObjectId(upload_id), "status": UploadStatus.UPLOADING.value},
+        {"$set": {"status": UploadStatus.ASSEMBLING.value, "updated_at": datetime.utcnow()}}
+    )
+    if not claimed.modified_count:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is already being completed"
+        )
+    
+    try:
+        file_info = await file_service.assemble_upload_parts(upload_id, part_count, upload.filename)
+    except Exception as e:
+        # Release the claim so the client can retry
+        await collection.update_one(
+            {"_id": ObjectId(upload_id), "status": UploadStatus.ASSEMBLING.value},
+            {"$set": {"status": UploadStatus.UPLOADING.value, "updated_at": datetime.utcnow()}}
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    result = await collection.update_one(
+        {"_id": ObjectId(upload_id), "status": UploadStatus.ASSEMBLING.value},
+        {
+            "$set": {
+                "file_path": file_info["file_path"],
+                "file_size": file_info["file_size"],
+                "content_hash": file_info["content_hash"],
+                "status": UploadStatus.PENDING.value,
+                "updated_at": datetime.utcnow()
+            },
+            "$unset": {"parts": "", "expires_at": ""}
+        }
+    )
+    if not result.matched_count:
+        # Deleted while assembling; release the blob reference taken for it
+        await file_service.remove_upload_file(file_info["file_path"], file_info["content_hash"])
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is already complete"
+        )
+    
+    upload = await Upload.get(ObjectId(upload_id))
+    await enqueue_upload(upload)
+    
+    return UploadResponse.model_validate(upload)
+
+
 @router.get("/", response_model=List[UploadResponse])
 async def get_uploads(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     skip: int = 0,
     limit: int = 10,
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user's uploaded files."""
-    uploads = await Upload.find(
-        Upload.user_id == current_user.id
-    ).skip(skip).limit(limit).sort("-created_at").to_list()
+    uploads = await paginate(
+        Upload.find(Upload.user_id == current_user.id),
+        response, "created_at", cursor, skip, limit
+    )
     
-    return [UploadResponse.model_validate(upload) for upload in uploads]
+    return trusted_response(uploads, UploadResponse, response)
 
 
 @router.get("/{upload_id}", response_model=UploadResponse)
@@ -128,8 +314,13 @@ async def delete_upload(
                 detail="Not authorized to delete this upload"
             )
         
-        # Delete file from filesystem
-        await file_service.delete_file(upload.file_path)
+        # Release the file (kept while other uploads share it) and any unfinished parts
+        if await file_service.remove_upload_file(upload.file_path, upload.content_hash) and upload.content_hash:
+            await extraction_cache.delete_pages(upload.content_hash)
+        file_service.remove_upload_parts(upload_id)
+        
+        # Delete upload chunks from the vector index
+        await vector_service.delete_document_embeddings(upload_id)
         
         # Delete upload record
         await upload.delete()
@@ -162,11 +353,24 @@ async def get_upload_status(
                 detail="Not authorized to access this upload"
             )
         
+        job = await job_queue.get_latest(PROCESS_UPLOAD, str(upload.id))
+        
         return {
             "id": str(upload.id),
             "status": upload.status,
-            "processed_chunks": 1 if upload.extracted_text else 0
+            "processed_chunks": await vector_service.count_document_chunks(str(upload.id)),
+            "error": (upload.metadata or {}).get("error"),
+            "job": {
+                "id": str(job["_id"]),
+                "status": job["status"],
+                "attempts": job["attempts"],
+                "max_attempts": job["max_attempts"],
+                "next_run_at": job["run_at"] if job["status"] == "queued" else None,
+                "last_error": job["last_error"]
+            } if job else None
         }
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -194,37 +398,36 @@ async def reprocess_upload(
                 detail="Not authorized to reprocess this upload"
             )
         
-        # Reset status
-        upload.status = UploadStatus.PROCESSING
-        await upload.save()
-        
-        try:
-            # Extract text again
-            extracted_text = await file_service.extract_text_from_file(
-                upload.file_path, upload.file_type
+        # Only finished uploads with a stored file can be processed again
+        if not upload.file_path or not os.path.exists(upload.file_path):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload has no stored file to reprocess"
             )
-            
-            # Clean and process text using AI
-            cleaned_text = await genai_service.extract_text_from_content(extracted_text)
-            
-            # Update upload record
-            upload.extracted_text = cleaned_text
-            upload.status = UploadStatus.COMPLETED
-            upload.metadata = None  # Clear any previous errors
-            await upload.save()
-            
-            # Re-index content for vector search
-            await vector_service.index_upload_content(str(upload.id))
-            
-            return {"message": "Upload reprocessed successfully"}
-        except Exception as e:
-            upload.status = UploadStatus.FAILED
-            upload.metadata = {"error": str(e)}
-            await upload.save()
+        
+        # Reset status atomically; the worker moves it on to processing
+        result = await Upload.get_pymongo_collection().update_one(
+            {
+                "_id": upload.id,
+                "status": {"$in": [UploadStatus.COMPLETED.value, UploadStatus.FAILED.value]}
+            },
+            {"$set": {"status": UploadStatus.PENDING.value, "updated_at": datetime.utcnow()}}
+        )
+        if not result.matched_count:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to reprocess upload: {str(e)}"
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Only completed or failed uploads can be reprocessed"
             )
+        
+        job = await enqueue_upload(upload, reuse_text=False)
+        
+        return {
+            "message": "Upload queued for reprocessing",
+            "job_id": str(job["_id"]),
+            "status": UploadStatus.PENDING
+        }
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,7 +1,7 @@
 """Pydantic schemas for API requests and responses."""
 
 from .auth import UserCreate, UserLogin, UserResponse, Token
-from .course import CourseCreate, CourseUpdate, CourseResponse, ChapterCreate, ChapterResponse
+from .course import CourseCreate, CourseUpdate, CourseResponse, CourseSummary, ChapterCreate, ChapterResponse, ChapterSummary
 from .upload import UploadResponse, UploadCreate
 from .quiz import QuizCreate, QuizResponse, QuizQuestionResponse, QuizSubmission, QuizResult
 from .chat import ChatSessionCreate, ChatSessionResponse, ChatMessageCreate, ChatMessageResponse
@@ -9,7 +9,7 @@ from .dashboard import DashboardStats, ProgressUpdate
 
 __all__ = [
     "UserCreate", "UserLogin", "UserResponse", "Token",
-    "CourseCreate", "CourseUpdate", "CourseResponse", "ChapterCreate", "ChapterResponse",
+    "CourseCreate", "CourseUpdate", "CourseResponse", "CourseSummary", "ChapterCreate", "ChapterResponse", "ChapterSummary",
     "UploadResponse", "UploadCreate",
     "QuizCreate", "QuizResponse", "QuizQuestionResponse", "QuizSubmission", "QuizResult",
     "ChatSessionCreate", "ChatSessionResponse", "ChatMessageCreate", "ChatMessageResponse",
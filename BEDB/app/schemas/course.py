@@ -1,8 +1,9 @@
 """Course related schemas."""
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from app.models.base import PyObjectId
 from app.models.course import CourseLevel
 
 
@@ -46,6 +47,20 @@ class CourseResponse(BaseModel):
         }
 
 
+class CourseSummary(BaseModel):
+    """Course list item schema, loaded with a projection."""
+    id: PyObjectId = Field(..., validation_alias=AliasChoices("_id", "id"))
+    title: str
+    level: CourseLevel
+    tags: List[str] = Field(default_factory=list)
+    enrollment_count: int = 0
+    # Only read to build the next-page cursor
+    created_at: datetime = Field(..., exclude=True)
+    
+    class Settings:
+        projection = {"_id": 1, "title": 1, "level": 1, "tags": 1, "enrollment_count": 1, "created_at": 1}
+
+
 class ChapterCreate(BaseModel):
     """Chapter creation schema."""
     title: str = Field(..., min_length=1, max_length=200)
@@ -75,3 +90,13 @@ class ChapterResponse(BaseModel):
         json_encoders = {
             "ObjectId": str
         }
+
+
+class ChapterSummary(BaseModel):
+    """Chapter list item schema, loaded with a projection."""
+    id: PyObjectId = Field(..., validation_alias=AliasChoices("_id", "id"))
+    title: str
+    order: int
+    
+    class Settings:
+        projection = {"_id": 1, "title": 1, "order": 1}
@@ -1,7 +1,7 @@
 """Upload related schemas."""
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from app.models.upload import FileType, UploadStatus
 
@@ -21,6 +21,7 @@ class UploadResponse(BaseModel):
     file_type: FileType
     file_path: str
     file_size: int
+    content_hash: Optional[str] = None
     status: UploadStatus
     extracted_text: Optional[str] = None
     metadata: Optional[dict] = None
@@ -37,3 +38,27 @@ class UploadUpdate(BaseModel):
     """Upload update schema."""
     extracted_text: Optional[str] = None
     metadata: Optional[dict] = None
+
+
+class ResumableUploadCreate(BaseModel):
+    """Resumable upload initialization schema."""
+    filename: str
+    file_size: int = Field(..., gt=0)
+
+
+class ResumableUploadStatus(BaseModel):
+    """Resumable upload progress schema."""
+    id: str
+    filename: str
+    file_size: int
+    part_size: int
+    part_count: int
+    received_parts: List[int]
+    expires_at: datetime
+
+
+class UploadPartResponse(BaseModel):
+    """Received upload part schema."""
+    part_number: int
+    size: int
+    sha256: str
@@ -3,5 +3,6 @@
 from .genai_service import GenAIService
 from .file_service import FileService
 from .vector_service import VectorService
+from .embedding_service import EmbeddingService
 
-__all__ = ["GenAIService", "FileService", "VectorService"]
+__all__ = ["GenAIService", "FileService", "VectorService", "EmbeddingService"]
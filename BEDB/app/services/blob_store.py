@@ -0,0 +1,141 @@
+"""Content-addressed storage for uploaded files."""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.database import get_database
+
+
+class BlobStore:
+    """Reference-counted file storage keyed by sha256.
+
+    Identical uploads share one file under ``root`` and one record in the
+    ``blobs`` collection, which counts the uploads referring to it and
+    holds the cleaned text extracted from it with the cleanup version that
+    produced it. The file is deleted when the
+    last reference is released.
+    """
+
+    # A release that claimed a blob for deletion and then died leaves the
+    # record behind; after this long it no longer blocks new references
+    stale_delete_after = timedelta(seconds=60)
+
+    def __init__(self, root: str, collection_name: str = "blobs"):
+        """Initialize blob store."""
+        self.root = root
+        self.collection_name = collection_name
+
+    def _get_collection(self):
+        """Get the blob collection on the shared client."""
+        return get_database()[self.collection_name]
+
+    def path_for(self, content_hash: str) -> str:
+        """Path of the blob with the given sha256."""
+        return os.path.join(self.root, content_hash[:2], content_hash)
+
+    def owns(self, file_path: str) -> bool:
+        """Whether a path points into the blob store."""
+        return os.path.abspath(file_path).startswith(os.path.abspath(self.root) + os.sep)
+
+    async def add(self, temp_path: str, content_hash: str, size: int) -> str:
+        """Take a reference to the blob with ``temp_path``'s content.
+
+        The file at ``temp_path`` becomes the blob if it is new and is
+        deleted otherwise. Returns the blob path.
+        """
+        # Count the reference first. A release that already claimed the
+        # blob makes _acquire wait until its file is gone, so the checks
+        # below never see a file that is about to be deleted.
+        await self._acquire(content_hash, size)
+
+        path = self.path_for(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, path)
+        return path
+
+    async def release(self, content_hash: str) -> bool:
+        """Drop a reference; returns True if it was the last and the blob was deleted."""
+        if not await self._release(content_hash):
+            return False
+
+        # The record stays marked as deleting until the file is gone, so
+        # nobody can take a new reference to it in between
+        try:
+            os.remove(self.path_for(content_hash))
+        except FileNotFoundError:
+            pass
+        await self._forget(content_hash)
+        return True
+
+    async def _acquire(self, content_hash: str, size: int):
+        """Increment the reference count, creating the record if needed.
+
+        Waits while a release is deleting the blob's file.
+        """
+        collection = self._get_collection()
+        while True:
+            now = datetime.utcnow()
+            try:
+                await collection.update_one(
+                    {"_id": content_hash, "deleting": {"$ne": True}},
+                    {
+                        "$inc": {"ref_count": 1},
+                        "$setOnInsert": {"size": size, "created_at": now},
+                        "$set": {"updated_at": now}
+                    },
+                    upsert=True
+                )
+                return
+            except DuplicateKeyError:
+                # The record exists and is being deleted
+                await collection.delete_one({
+                    "_id": content_hash,
+                    "deleting": True,
+                    "updated_at": {"$lt": now - self.stale_delete_after}
+                })
+                await asyncio.sleep(0.05)
+
+    async def _release(self, content_hash: str) -> bool:
+        """Decrement the reference count; True once the blob is claimed for deletion."""
+        collection = self._get_collection()
+        doc = await collection.find_one_and_update(
+            {"_id": content_hash},
+            {"$inc": {"ref_count": -1}, "$set": {"updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is None or doc["ref_count"] > 0:
+            return False
+
+        # Only claim it if nobody took a new reference in between
+        result = await collection.update_one(
+            {"_id": content_hash, "ref_count": {"$lte": 0}, "deleting": {"$ne": True}},
+            {"$set": {"deleting": True, "updated_at": datetime.utcnow()}}
+        )
+        return result.modified_count == 1
+
+    async def _forget(self, content_hash: str):
+        """Delete the record of a blob claimed by ``_release``."""
+        await self._get_collection().delete_one({"_id": content_hash, "deleting": True})
+
+    async def get_text(self, content_hash: str, version: str) -> Optional[str]:
+        """Get the cleaned text extracted from a blob by cleanup ``version``, if any."""
+        doc = await self._get_collection().find_one(
+            {"_id": content_hash, "extract_version": version},
+            projection={"extracted_text": 1}
+        )
+        return doc.get("extracted_text") if doc else None
+
+    async def set_text(self, content_hash: str, version: str, text: str):
+        """Store the cleaned text extracted from a blob by cleanup ``version``."""
+        await self._get_collection().update_one(
+            {"_id": content_hash},
+            {"$set": {"extracted_text": text, "extract_version": version, "updated_at": datetime.utcnow()}}
+        )
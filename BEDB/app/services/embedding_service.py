@@ -0,0 +1,368 @@
+"""Text embedding providers with batching and request coalescing."""
+
+import asyncio
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+import numpy as np
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import get_database
+
+
+class Embedder(ABC):
+    """Base class for embedding providers."""
+
+    name = "base"
+
+    def __init__(self, dimension: int):
+        """Initialize embedder."""
+        self.dimension = dimension
+
+    @property
+    def model_name(self) -> str:
+        """Identify the model that produced a vector."""
+        return self.name
+
+    @abstractmethod
+    async def embed_batch(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        """Embed several texts with one provider call."""
+
+
+class GenAIEmbedder(Embedder):
+    """Gemini embedding model."""
+
+    name = "genai"
+
+    def __init__(self, model: str, dimension: int):
+        """Initialize Gemini embedder."""
+        super().__init__(dimension)
+        genai.configure(api_key=settings.google_api_key)
+        self.model = model
+
+    @property
+    def model_name(self) -> str:
+        """Identify the model that produced a vector."""
+        return self.model
+
+    async def embed_batch(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        """Embed several texts with one Gemini call."""
+        try:
+            result = await genai.embed_content_async(
+                model=self.model,
+                content=texts,
+                task_type=task_type,
+                output_dimensionality=self.dimension
+            )
+            return result["embedding"]
+        except Exception as e:
+            raise Exception(f"Failed to generate embeddings: {str(e)}")
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic offline embedder based on feature hashing.
+
+    Word unigrams and bigrams are hashed into signed buckets, so texts that
+    share words are similar. Useful for tests and local development without
+    an API key.
+    """
+
+    name = "local-hashing"
+
+    @property
+    def model_name(self) -> str:
+        """Identify the model that produced a vector."""
+        return f"{self.name}-v1"
+
+    def embed_text(self, text: str) -> List[float]:
+        """Embed a single text."""
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        tokens = re.findall(r"\w+", text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimension] += 1.0 if value >> 63 else -1.0
+
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    async def embed_batch(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        """Embed several texts."""
+        return [self.embed_text(text) for text in texts]
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent single-text requests into batched provider calls.
+
+    Requests arriving within ``window`` seconds of the first pending one are
+    sent together; a full batch is sent immediately.
+    """
+
+    def __init__(self, embedder: Embedder, window: float = 0.005, max_batch_size: int = 100, task_type: str = "retrieval_query"):
+        """Initialize batcher."""
+        self.embedder = embedder
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.task_type = task_type
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.batches_sent = 0
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text, sharing a provider call with concurrent callers."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        """Send the pending requests as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Embed a batch and resolve the waiting callers."""
+        texts = list(dict.fromkeys(text for text, future in batch if not future.done()))
+        if not texts:
+            return
+
+        self.batches_sent += 1
+        try:
+            vectors = dict(zip(texts, await self.embedder.embed_batch(texts, task_type=self.task_type)))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, future in batch:
+            if not future.done():
+                future.set_result(vectors[text])
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: in-process LRU backed by a MongoDB collection.
+
+    Keys combine the model, dimension and task type with the sha256 of the
+    text, so switching models simply stops matching old entries and
+    ``purge_stale`` deletes them without touching current ones.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, collection_name: Optional[str] = "embedding_cache"):
+        """Initialize cache."""
+        self.max_bytes = max_bytes
+        self.collection_name = collection_name
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._collection_indexes_ready = False
+        self.memory_hits = 0
+        self.memory_misses = 0
+        self.store_hits = 0
+        self.store_misses = 0
+
+    @staticmethod
+    def key(model_key: str, task_type: str, text: str) -> str:
+        """Build the cache key of a text."""
+        return f"{model_key}:{task_type}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def _remember(self, key: str, embedding: List[float]):
+        """Add an entry to the LRU and evict down to the byte budget."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        size = vector.nbytes + len(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = vector
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, old_vector = self._entries.popitem(last=False)
+            self._bytes -= old_vector.nbytes + len(old_key)
+
+    def _get_collection(self):
+        """Get the persistent cache collection, if enabled."""
+        if not self.collection_name:
+            return None
+        return get_database()[self.collection_name]
+
+    async def _ensure_collection_indexes(self, collection):
+        """Index entries by model so stale ones can be purged cheaply."""
+        if self._collection_indexes_ready:
+            return
+        await collection.create_index("model_key")
+        self._collection_indexes_ready = True
+
+    async def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Look up keys in memory first, then in the persistent store."""
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            vector = self._entries.get(key)
+            if vector is None:
+                missing.append(key)
+                continue
+            self._entries.move_to_end(key)
+            found[key] = vector.tolist()
+        self.memory_hits += len(found)
+        self.memory_misses += len(missing)
+
+        collection = self._get_collection()
+        if missing and collection is not None:
+            try:
+                async for doc in collection.find({"_id": {"$in": missing}}, projection={"embedding": 1}):
+                    found[doc["_id"]] = doc["embedding"]
+                    self._remember(doc["_id"], doc["embedding"])
+                    self.store_hits += 1
+            except Exception as e:
+                print(f"Embedding cache lookup failed: {e}")
+            self.store_misses += len(missing) - sum(1 for key in missing if key in found)
+        return found
+
+    async def put_many(self, model_key: str, entries: Dict[str, List[float]]):
+        """Store new embeddings in both tiers."""
+        for key, embedding in entries.items():
+            self._remember(key, embedding)
+
+        collection = self._get_collection()
+        if not entries or collection is None:
+            return
+        try:
+            await self._ensure_collection_indexes(collection)
+            now = datetime.utcnow()
+            await collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": key},
+                        {"$setOnInsert": {"model_key": model_key, "embedding": embedding, "created_at": now}},
+                        upsert=True
+                    )
+                    for key, embedding in entries.items()
+                ],
+                ordered=False
+            )
+        except Exception as e:
+            print(f"Embedding cache write failed: {e}")
+
+    async def purge_stale(self, model_key: str) -> int:
+        """Delete persistent entries produced by any other model."""
+        stale = [key for key in self._entries if not key.startswith(f"{model_key}:")]
+        for key in stale:
+            vector = self._entries.pop(key)
+            self._bytes -= vector.nbytes + len(key)
+
+        collection = self._get_collection()
+        if collection is None:
+            return len(stale)
+        try:
+            result = await collection.delete_many({"model_key": {"$ne": model_key}})
+            return result.deleted_count
+        except Exception as e:
+            print(f"Embedding cache purge failed: {e}")
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of both tiers."""
+        return {
+            "memory_entries": len(self._entries),
+            "memory_bytes": self._bytes,
+            "memory_hits": self.memory_hits,
+            "memory_misses": self.memory_misses,
+            "store_hits": self.store_hits,
+            "store_misses": self.store_misses
+        }
+
+
+class EmbeddingService:
+    """Service for creating text embeddings."""
+
+    def __init__(self, embedder: Optional[Embedder] = None, cache: Optional[EmbeddingCache] = None):
+        """Initialize embedding service."""
+        self.embedder = embedder or self._create_embedder()
+        self.cache = cache or EmbeddingCache(
+            max_bytes=settings.embedding_cache_memory_mb * 1024 * 1024,
+            collection_name=settings.embedding_cache_collection or None
+        )
+        self.max_batch_size = settings.embedding_max_batch_size
+        self.query_batcher = EmbeddingBatcher(
+            self.embedder,
+            window=settings.embedding_batch_window_ms / 1000,
+            max_batch_size=self.max_batch_size
+        )
+
+    @staticmethod
+    def _create_embedder() -> Embedder:
+        """Create the embedding provider selected in settings."""
+        if settings.embedding_provider == "local":
+            return HashingEmbedder(settings.embedding_dimension)
+        return GenAIEmbedder(settings.embedding_model, settings.embedding_dimension)
+
+    @property
+    def model_name(self) -> str:
+        """Name of the model behind the current embeddings."""
+        return self.embedder.model_name
+
+    @property
+    def dimension(self) -> int:
+        """Dimension of the current embeddings."""
+        return self.embedder.dimension
+
+    @property
+    def model_key(self) -> str:
+        """Model and dimension; vectors with different keys are not comparable."""
+        return f"{self.model_name}:{self.dimension}"
+
+    async def embed_query(self, text: str) -> List[float]:
+        """Embed a search query, coalescing concurrent callers."""
+        key = self.cache.key(self.model_key, self.query_batcher.task_type, text)
+        cached = await self.cache.get_many([key])
+        if key in cached:
+            return cached[key]
+
+        embedding = await self.query_batcher.embed(text)
+        await self.cache.put_many(self.model_key, {key: embedding})
+        return embedding
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed document chunks in as few provider calls as possible."""
+        keys = [self.cache.key(self.model_key, "retrieval_document", text) for text in texts]
+        found = await self.cache.get_many(keys)
+
+        missing = list(dict.fromkeys(text for key, text in zip(keys, texts) if key not in found))
+        computed = {}
+        for start in range(0, len(missing), self.max_batch_size):
+            batch = missing[start:start + self.max_batch_size]
+            for text, embedding in zip(batch, await self.embedder.embed_batch(batch)):
+                computed[self.cache.key(self.model_key, "retrieval_document", text)] = embedding
+        await self.cache.put_many(self.model_key, computed)
+
+        found.update(computed)
+        return [found[key] for key in keys]
+
+
+# Global instance
+embedding_service = EmbeddingService()
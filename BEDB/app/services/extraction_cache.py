@@ -0,0 +1,125 @@
+"""Persistent per-page cache of extracted and cleaned document text."""
+
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+from app.database import get_database
+
+
+def page_hash(text: str) -> str:
+    """Hash of a page's raw text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """Raw page text per (file hash, extractor version) and cleaned page text.
+
+    Raw pages let reprocessing skip PDF extraction entirely. Cleaned text is
+    stored per group of pages, keyed by the hash of the group's raw text and
+    the cleanup prompt version, so only groups whose raw text changed are
+    sent to the LLM again.
+    """
+
+    def __init__(self, pages_collection: str = "extracted_pages", cleaned_collection: str = "cleaned_pages"):
+        """Initialize cache."""
+        self.pages_collection = pages_collection
+        self.cleaned_collection = cleaned_collection
+        self._collection_indexes_ready = False
+
+    async def _ensure_collection_indexes(self):
+        """Index raw pages by document for ordered reads and cleaned text by version."""
+        if self._collection_indexes_ready:
+            return
+        await get_database()[self.pages_collection].create_index(
+            [("content_hash", ASCENDING), ("extractor", ASCENDING), ("page", ASCENDING)]
+        )
+        await get_database()[self.cleaned_collection].create_index("version")
+        self._collection_indexes_ready = True
+
+    async def get_pages(self, content_hash: str, extractor: str) -> Optional[List[str]]:
+        """Get the raw pages of a file, or None unless all of them are cached."""
+        await self._ensure_collection_indexes()
+        docs = await get_database()[self.pages_collection].find(
+            {"content_hash": content_hash, "extractor": extractor},
+            projection={"page": 1, "page_count": 1, "text": 1}
+        ).sort("page", ASCENDING).to_list(length=None)
+
+        if not docs or len(docs) != docs[0]["page_count"]:
+            return None
+        return [doc["text"] for doc in docs]
+
+    async def put_pages(self, content_hash: str, extractor: str, pages: List[str]):
+        """Store the raw pages of a file."""
+        if not pages:
+            return
+        await self._ensure_collection_indexes()
+        now = datetime.utcnow()
+        await get_database()[self.pages_collection].bulk_write(
+            [
+                UpdateOne(
+                    {"_id": f"{content_hash}:{extractor}:{number}"},
+                    {"$set": {
+                        "content_hash": content_hash,
+                        "extractor": extractor,
+                        "page": number,
+                        "page_count": len(pages),
+                        "text": text,
+                        "created_at": now
+                    }},
+                    upsert=True
+                )
+                for number, text in enumerate(pages)
+            ],
+            ordered=False
+        )
+
+    async def delete_pages(self, content_hash: str):
+        """Drop the raw pages of a file, e.g. when its blob is deleted."""
+        await get_database()[self.pages_collection].delete_many({"content_hash": content_hash})
+
+    async def get_cleaned(self, version: str, raw_hashes: List[str]) -> Dict[str, str]:
+        """Look up cleaned texts by raw text hash."""
+        if not raw_hashes:
+            return {}
+        keys = {f"{version}:{raw_hash}": raw_hash for raw_hash in raw_hashes}
+        found = {}
+        async for doc in get_database()[self.cleaned_collection].find(
+            {"_id": {"$in": list(keys)}}, projection={"text": 1}
+        ):
+            found[keys[doc["_id"]]] = doc["text"]
+        return found
+
+    async def put_cleaned(self, version: str, cleaned: Dict[str, str]):
+        """Store cleaned texts by raw text hash."""
+        if not cleaned:
+            return
+        await self._ensure_collection_indexes()
+        now = datetime.utcnow()
+        await get_database()[self.cleaned_collection].bulk_write(
+            [
+                UpdateOne(
+                    {"_id": f"{version}:{raw_hash}"},
+                    {"$set": {"text": text, "version": version, "created_at": now}},
+                    upsert=True
+                )
+                for raw_hash, text in cleaned.items()
+            ],
+            ordered=False
+        )
+
+    async def purge_stale_cleaned(self, version: str) -> int:
+        """Delete cleaned text produced by any other cleanup prompt or model."""
+        try:
+            await self._ensure_collection_indexes()
+            result = await get_database()[self.cleaned_collection].delete_many({"version": {"$ne": version}})
+            return result.deleted_count
+        except Exception as e:
+            print(f"Cleaned text purge failed: {e}")
+            return 0
+
+
+# Global instance
+extraction_cache = ExtractionCache()
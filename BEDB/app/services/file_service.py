@@ -1,15 +1,23 @@
 """File processing service."""
 
+import asyncio
+import hashlib
+import math
+import multiprocessing
 import os
+import shutil
+import time
+import uuid
 import aiofiles
 import magic
-from typing import Optional, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable, Callable, List, Tuple
 from fastapi import UploadFile, HTTPException
 from app.config import settings
 from app.models.upload import FileType, UploadStatus
-import PyPDF2
-import docx
-from io import BytesIO
+from app.services import text_extraction
+from app.services.blob_store import BlobStore
 
 
 class FileService:
@@ -19,6 +27,14 @@ class FileService:
         """Initialize file service."""
         self.upload_dir = settings.upload_dir
         self.max_file_size = settings.max_file_size
+        self.chunk_size = settings.upload_chunk_size
+        self.resumable_max_file_size = settings.resumable_max_file_size
+        self.part_size = settings.resumable_part_size
+        self.extraction_workers = settings.extraction_workers
+        self.extraction_timeout = settings.extraction_timeout_seconds
+        self.pdf_pages_per_task = settings.extraction_pdf_pages_per_task
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.blobs = BlobStore(os.path.join(self.upload_dir, "blobs"))
         self._ensure_upload_dir()
     
     def _ensure_upload_dir(self):
@@ -27,7 +43,7 @@ class FileService:
     
     async def save_upload_file(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
         """Save uploaded file and return file info."""
-        # Validate file size
+        # Reject early when the client declares the size
         if file.size and file.size > self.max_file_size:
             raise HTTPException(
                 status_code=413,
@@ -43,31 +59,229 @@ class FileService:
             )
         
         # Generate unique filename
-        import uuid
         file_id = str(uuid.uuid4())
         file_extension = os.path.splitext(file.filename)[1]
         filename = f"{file_id}{file_extension}"
         file_path = os.path.join(self.upload_dir, filename)
         
-        # Save file
+        # Stream the file to disk, enforcing the size limit as bytes arrive
+        file_size, content_hash = await self._write_stream(
+            self._read_chunks(file), file_path, self.max_file_size
+        )
+        
+        # Identical files share one stored copy
+        file_path = await self._store_blob(file_path, content_hash, file_size)
+        
+        return {
+            "filename": file.filename,
+            "file_type": file_type,
+            "file_path": file_path,
+            "file_size": file_size,
+            "content_hash": content_hash,
+            "file_id": file_id
+        }
+    
+    async def _read_chunks(self, file: UploadFile) -> AsyncIterator[bytes]:
+        """Read an upload in fixed-size chunks."""
+        while True:
+            chunk = await file.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    
+    async def _write_stream(self, chunks: AsyncIterator[bytes], file_path: str, max_size: int) -> Tuple[int, str]:
+        """Write a stream of chunks to ``file_path``.
+        
+        Memory use is bounded by the chunk size. The data goes to a
+        temporary file that only replaces ``file_path`` once the whole
+        stream is within ``max_size``. Returns the size and sha256.
+        """
+        temp_path = f"{file_path}.{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        file_size = 0
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                async for chunk in chunks:
+                    file_size += len(chunk)
+                    if file_size > max_size:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File too large. Maximum size is {max_size} bytes"
+                        )
+                    digest.update(chunk)
+                    await f.write(chunk)
+            os.replace(temp_path, file_path)
+        except HTTPException:
+            self._remove_quietly(temp_path)
+            raise
+        except Exception as e:
+            self._remove_quietly(temp_path)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to save file: {str(e)}"
+            )
+        
+        return file_size, digest.hexdigest()
+    
+    async def _store_blob(self, temp_path: str, content_hash: str, file_size: int) -> str:
+        """Move a saved file into the blob store and return its path."""
         try:
-            async with aiofiles.open(file_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
+            return await self.blobs.add(temp_path, content_hash, file_size)
         except Exception as e:
+            self._remove_quietly(temp_path)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to save file: {str(e)}"
             )
+    
+    async def remove_upload_file(self, file_path: str, content_hash: Optional[str]) -> bool:
+        """Release an upload's file; shared blobs are deleted with their last reference."""
+        if content_hash and self.blobs.owns(file_path):
+            return await self.blobs.release(content_hash)
+        return await self.delete_file(file_path)
+    
+    @staticmethod
+    def _remove_quietly(path: str):
+        """Remove a file if it exists."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def plan_resumable_upload(self, filename: str, file_size: int) -> Dict[str, Any]:
+        """Validate a resumable upload and split it into parts."""
+        if file_size <= 0:
+            raise HTTPException(status_code=400, detail="File is empty")
+        if file_size > self.resumable_max_file_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {self.resumable_max_file_size} bytes"
+            )
+        
+        file_type = self._get_file_type(filename)
+        if not file_type:
+            raise HTTPException(
+                status_code=400,
+                detail="Unsupported file type"
+            )
         
         return {
-            "filename": file.filename,
             "file_type": file_type,
+            "part_size": self.part_size,
+            "part_count": self.part_count(file_size, self.part_size)
+        }
+    
+    def _parts_dir(self, upload_id: str) -> str:
+        """Directory holding the received parts of an upload."""
+        return os.path.join(self.upload_dir, "parts", upload_id)
+    
+    @staticmethod
+    def part_count(file_size: int, part_size: int) -> int:
+        """Number of parts a file of ``file_size`` bytes is split into."""
+        return math.ceil(file_size / part_size)
+    
+    @staticmethod
+    def expected_part_size(file_size: int, part_size: int, part_number: int) -> int:
+        """Size of part ``part_number`` (1-based); only the last part may be shorter."""
+        return min(part_size, file_size - (part_number - 1) * part_size)
+    
+    async def save_upload_part(
+        self,
+        upload_id: str,
+        part_number: int,
+        chunks: AsyncIterator[bytes],
+        expected_size: int
+    ) -> Tuple[int, str]:
+        """Store one part of a resumable upload; re-sending a part replaces it."""
+        parts_dir = self._parts_dir(upload_id)
+        os.makedirs(parts_dir, exist_ok=True)
+        part_path = os.path.join(parts_dir, str(part_number))
+        
+        size, sha256 = await self._write_stream(chunks, part_path, expected_size)
+        if size != expected_size:
+            self._remove_quietly(part_path)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Part {part_number} must be {expected_size} bytes, got {size}"
+            )
+        return size, sha256
+    
+    async def assemble_upload_parts(self, upload_id: str, part_count: int, filename: str) -> Dict[str, Any]:
+        """Concatenate the parts of an upload into its final file."""
+        parts_dir = self._parts_dir(upload_id)
+        sources = [os.path.join(parts_dir, str(number)) for number in range(1, part_count + 1)]
+        temp_path = os.path.join(self.upload_dir, f"{upload_id}.{uuid.uuid4().hex}{os.path.splitext(filename)[1]}.part")
+        
+        try:
+            await asyncio.to_thread(self._concatenate, sources, temp_path)
+            with open(temp_path, "rb") as f:
+                content_hash = (await asyncio.to_thread(hashlib.file_digest, f, "sha256")).hexdigest()
+            file_size = os.path.getsize(temp_path)
+            file_path = await self.blobs.add(temp_path, content_hash, file_size)
+        except Exception as e:
+            self._remove_quietly(temp_path)
+            raise Exception(f"Failed to assemble upload: {str(e)}")
+        
+        self.remove_upload_parts(upload_id)
+        return {
             "file_path": file_path,
-            "file_size": len(content),
-            "file_id": file_id
+            "file_size": file_size,
+            "content_hash": content_hash
         }
     
+    @staticmethod
+    def _concatenate(sources: List[str], destination: str):
+        """Concatenate files without copying through user space where possible.
+        
+        Uses ``copy_file_range`` (which can share extents on filesystems
+        with reflinks), then ``sendfile``, then a plain buffered copy.
+        """
+        with open(destination, "wb") as out:
+            for source in sources:
+                with open(source, "rb") as src:
+                    size = os.fstat(src.fileno()).st_size
+                    offset = 0
+                    if hasattr(os, "copy_file_range"):
+                        try:
+                            while offset < size:
+                                copied = os.copy_file_range(src.fileno(), out.fileno(), size - offset)
+                                if not copied:
+                                    break
+                                offset += copied
+                        except OSError:
+                            pass  # e.g. unsupported filesystem; fall back
+                    if offset < size and hasattr(os, "sendfile"):
+                        try:
+                            while offset < size:
+                                sent = os.sendfile(out.fileno(), src.fileno(), offset, size - offset)
+                                if not sent:
+                                    break
+                                offset += sent
+                        except OSError:
+                            pass
+                    if offset < size:
+                        src.seek(offset)
+                        out.seek(0, os.SEEK_END)
+                        shutil.copyfileobj(src, out)
+    
+    def remove_upload_parts(self, upload_id: str):
+        """Delete the received parts of an upload."""
+        shutil.rmtree(self._parts_dir(upload_id), ignore_errors=True)
+    
+    def remove_stale_parts(self, max_age_seconds: float) -> int:
+        """Delete part directories not written to for ``max_age_seconds``."""
+        root = os.path.join(self.upload_dir, "parts")
+        if not os.path.isdir(root):
+            return 0
+        
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for entry in os.scandir(root):
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        return removed
+    
     def _get_file_type(self, filename: str) -> Optional[FileType]:
         """Determine file type from filename."""
         if not filename:
@@ -102,32 +316,91 @@ class FileService:
         except Exception as e:
             raise Exception(f"Failed to extract text from file: {str(e)}")
     
-    async def _extract_pdf_text(self, file_path: str) -> str:
-        """Extract text from PDF file."""
+    async def extract_pages_from_file(self, file_path: str, file_type: FileType) -> List[str]:
+        """Extract text per page; documents without pages yield a single page."""
+        if file_type == FileType.PDF:
+            try:
+                return await self._extract_pdf_pages(file_path)
+            except Exception as e:
+                raise Exception(f"Failed to extract text from file: {str(e)}")
+        
+        text = await self.extract_text_from_file(file_path, file_type)
+        return [text] if text else []
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the extraction process pool, starting it on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.extraction_workers,
+                # Forking a process that runs an event loop and driver threads is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=text_extraction.limit_memory,
+                initargs=(settings.extraction_memory_limit_mb * 1024 * 1024,)
+            )
+        return self._executor
+    
+    def _reset_executor(self):
+        """Kill the extraction workers so a stuck or crashed one is replaced."""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # ProcessPoolExecutor cannot cancel a running call, so stop its processes
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    def shutdown(self):
+        """Stop the extraction workers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    async def _run_in_pool(self, func: Callable, *args) -> Any:
+        """Run a function in the extraction process pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), func, *args)
+    
+    async def _with_extraction_limits(self, extraction: Awaitable[str]) -> str:
+        """Await an extraction with the per-file timeout.
+        
+        A timed out or crashed extraction (e.g. one that hit the memory cap)
+        restarts the pool, failing other extractions running at that moment.
+        """
+        try:
+            return await asyncio.wait_for(extraction, timeout=self.extraction_timeout)
+        except asyncio.TimeoutError:
+            self._reset_executor()
+            raise Exception(f"Extraction timed out after {self.extraction_timeout:.0f}s")
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise Exception("Extraction worker crashed")
+    
+    async def _extract_pdf_pages(self, file_path: str) -> List[str]:
+        """Extract the text of each PDF page, spreading large files over the pool."""
+        async def extract() -> List[str]:
+            step = self.pdf_pages_per_task
+            page_count, first = await self._run_in_pool(text_extraction.extract_pdf_pages, file_path, 0, step)
+            rest = await asyncio.gather(*(
+                self._run_in_pool(text_extraction.extract_pdf_pages, file_path, start, start + step)
+                for start in range(step, page_count, step)
+            ))
+            return first + [text for _, batch in rest for text in batch]
+        
         try:
-            async with aiofiles.open(file_path, 'rb') as f:
-                content = await f.read()
-            
-            pdf_reader = PyPDF2.PdfReader(BytesIO(content))
-            text = ""
-            
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text.strip()
+            return await self._with_extraction_limits(extract())
         except Exception as e:
             raise Exception(f"Failed to extract PDF text: {str(e)}")
     
+    async def _extract_pdf_text(self, file_path: str) -> str:
+        """Extract text from PDF file."""
+        return "\n".join(await self._extract_pdf_pages(file_path)).strip()
+    
     async def _extract_docx_text(self, file_path: str) -> str:
         """Extract text from DOCX file."""
         try:
-            doc = docx.Document(file_path)
-            text = ""
-            
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            return text.strip()
+            return await self._with_extraction_limits(
+                self._run_in_pool(text_extraction.extract_docx_text, file_path)
+            )
         except Exception as e:
             raise Exception(f"Failed to extract DOCX text: {str(e)}")
     
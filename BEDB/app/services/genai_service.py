@@ -1,9 +1,16 @@
 """Google GenAI service for AI-powered features."""
 
+import asyncio
+import hashlib
+import inspect
+import json
+import math
 import google.generativeai as genai
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, Callable, List, Dict, Optional, Any, Tuple
 from app.config import settings
 from app.models.chat import ChatMode
+from app.services.response_cache import ResponseCache
+from app.services.text_chunker import TextChunker
 
 
 class GenAIService:
@@ -13,6 +20,132 @@ class GenAIService:
         """Initialize GenAI service."""
         genai.configure(api_key=settings.google_api_key)
         self.model = genai.GenerativeModel('gemini-pro')
+        self.timeout = settings.genai_timeout_seconds
+        self._limits = {
+            method: asyncio.Semaphore(limit)
+            for method, limit in settings.genai_concurrency_limits.items()
+        }
+        self._default_limit = asyncio.Semaphore(settings.genai_default_concurrency)
+        self.cache = ResponseCache(
+            ttl=settings.response_cache_ttl_seconds,
+            max_entries=settings.response_cache_max_entries,
+            semantic_ttl=settings.semantic_cache_ttl_seconds,
+            semantic_threshold=settings.semantic_cache_threshold,
+            semantic_max_entries=settings.semantic_cache_max_entries_per_scope
+        )
+        self.segment_tokens = settings.genai_segment_tokens
+        self.chars_per_token = settings.genai_chars_per_token
+    
+    async def _generate(self, method: str, prompt: str):
+        """Call Gemini without blocking the event loop.
+        
+        Calls use the SDK's async client, wait for a free slot of the
+        method's concurrency limit and are cancelled after the timeout or
+        when the awaiting request is cancelled.
+        """
+        async with self._limits.get(method, self._default_limit):
+            try:
+                return await asyncio.wait_for(
+                    self.model.generate_content_async(
+                        prompt,
+                        request_options={"timeout": self.timeout}
+                    ),
+                    timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                raise Exception(f"Gemini request timed out after {self.timeout:.0f}s")
+    
+    async def _generate_cached(
+        self,
+        method: str,
+        prompt: str,
+        params: Optional[Dict[str, Any]] = None,
+        parse: Optional[Callable[[str], Any]] = None
+    ) -> Any:
+        """Generate text, reusing the response to an identical earlier call.
+        
+        With ``parse`` the parsed value is returned and a response is only
+        cached once it parses.
+        """
+        key = None
+        if settings.response_cache_enabled:
+            key = self.cache.key(method, self.model.model_name, prompt, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return parse(cached) if parse else cached
+        
+        response = await self._generate(method, prompt)
+        text = response.text
+        result = parse(text) if parse else text
+        if key:
+            self.cache.set(key, text)
+        return result
+    
+    def estimate_tokens(self, text: str) -> int:
+        """Estimate the token count of a text without calling the API."""
+        return math.ceil(len(text) / self.chars_per_token)
+    
+    def split_segments(self, text: str) -> List[str]:
+        """Split text on sentence boundaries into segments that fit one call."""
+        if self.estimate_tokens(text) <= self.segment_tokens:
+            return [text]
+        chunker = TextChunker(chunk_size=int(self.segment_tokens * self.chars_per_token), overlap=0)
+        return [chunk["text"] for chunk in chunker.chunk_text(text)]
+    
+    async def _map_reduce(
+        self,
+        method: str,
+        content: str,
+        prompt: Callable[[str, Optional[int]], str],
+        reduce: Callable[[List[Any]], Any],  # may be async
+        count: Optional[int] = None,
+        parse: Optional[Callable[[str], Any]] = None
+    ) -> Any:
+        """Run a prompt over a long document segment by segment.
+        
+        ``prompt(segment, n)`` builds each call. With ``count`` that many
+        items (e.g. questions) are spread over the segments, and segments
+        that get none are skipped; without it every segment is used.
+        Calls run concurrently under the method's concurrency limit and
+        ``reduce`` combines the partial results. Each partial result is
+        cached, so after a failure only the failed segments are called
+        again.
+        """
+        segments = self.split_segments(content)
+        if count is None:
+            work = [(segment, None) for segment in segments]
+        else:
+            n = len(segments)
+            shares = [(i + 1) * count // n - i * count // n for i in range(n)]
+            work = [(segment, share) for segment, share in zip(segments, shares) if share]
+        
+        results = await asyncio.gather(
+            *(
+                self._generate_cached(method, prompt(segment, share), {"count": share} if share else None, parse)
+                for segment, share in work
+            ),
+            return_exceptions=True
+        )
+        # Let every segment finish (and be cached) before reporting a failure
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        if len(results) == 1:
+            return results[0]
+        
+        combined = reduce(results)
+        return await combined if inspect.isawaitable(combined) else combined
+    
+    async def _similar_answer(self, message: str, scope: Optional[str]) -> Tuple[Optional[List[float]], Optional[str]]:
+        """Look up a cached answer to a similar question asked in the same scope."""
+        if not scope or not settings.semantic_cache_enabled:
+            return None, None
+        try:
+            from app.services.embedding_service import embedding_service
+            embedding = await embedding_service.embed_query(message)
+        except Exception:
+            return None, None
+        return embedding, self.cache.get_similar(scope, embedding)
     
     async def generate_course_outline(self, topic: str, level: str = "beginner") -> str:
         """Generate a course outline from a topic."""
@@ -31,14 +164,14 @@ class GenAIService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return await self._generate_cached("outline", prompt, {"level": level})
         except Exception as e:
             raise Exception(f"Failed to generate course outline: {str(e)}")
     
-    async def extract_text_from_content(self, content: str) -> str:
-        """Extract and clean text from uploaded content."""
-        prompt = f"""
+    @staticmethod
+    def _extract_prompt(content: str) -> str:
+        """Build the prompt that cleans extracted text."""
+        return f"""
         Extract and clean the main text content from the following material.
         Remove any formatting artifacts, headers, footers, or irrelevant information.
         Focus on the educational content and structure it clearly.
@@ -46,21 +179,33 @@ class GenAIService:
         Content:
         {content}
         """
-        
+    
+    @property
+    def extract_version(self) -> str:
+        """Identify the cleanup prompt and model; changes when either does."""
+        template = self._extract_prompt("{content}")
+        return hashlib.sha256(f"{self.model.model_name}:{template}".encode("utf-8")).hexdigest()[:16]
+    
+    async def extract_text_from_content(self, content: str) -> str:
+        """Extract and clean text from uploaded content."""
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return await self._map_reduce(
+                "extract", content,
+                lambda segment, _: self._extract_prompt(segment),
+                lambda parts: "\n\n".join(parts)
+            )
         except Exception as e:
             raise Exception(f"Failed to extract text: {str(e)}")
     
     async def generate_quiz_questions(self, content: str, num_questions: int = 5) -> List[Dict[str, Any]]:
-        """Generate quiz questions from content."""
-        prompt = f"""
-        Generate {num_questions} multiple choice questions based on the following content.
+        """Generate quiz questions from content; long content is split and questions spread over it."""
+        def prompt(segment: str, count: int) -> str:
+            return f"""
+        Generate {count} multiple choice questions based on the following content.
         Each question should have 4 options (A, B, C, D) with only one correct answer.
         
         Content:
-        {content}
+        {segment}
         
         Return the questions in JSON format:
         [
@@ -74,22 +219,23 @@ class GenAIService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
             # Parse the JSON response
-            import json
-            questions = json.loads(response.text)
+            questions = await self._map_reduce(
+                "quiz", content, prompt, self._concat_lists, count=num_questions, parse=json.loads
+            )
             return questions
         except Exception as e:
             raise Exception(f"Failed to generate quiz questions: {str(e)}")
     
     async def generate_flashcards(self, content: str, num_cards: int = 10) -> List[Dict[str, str]]:
-        """Generate flashcards from content."""
-        prompt = f"""
-        Generate {num_cards} flashcards based on the following content.
+        """Generate flashcards from content; long content is split and cards spread over it."""
+        def prompt(segment: str, count: int) -> str:
+            return f"""
+        Generate {count} flashcards based on the following content.
         Each flashcard should have a clear question and a concise answer.
         
         Content:
-        {content}
+        {segment}
         
         Return the flashcards in JSON format:
         [
@@ -101,42 +247,84 @@ class GenAIService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            import json
-            flashcards = json.loads(response.text)
+            flashcards = await self._map_reduce(
+                "flashcards", content, prompt, self._concat_lists, count=num_cards, parse=json.loads
+            )
             return flashcards
         except Exception as e:
             raise Exception(f"Failed to generate flashcards: {str(e)}")
     
+    @staticmethod
+    def _concat_lists(parts: List[List[Any]]) -> List[Any]:
+        """Combine per-segment JSON lists in document order."""
+        return [item for part in parts for item in part]
+    
     async def generate_summary(self, content: str) -> str:
-        """Generate a summary of the content."""
-        prompt = f"""
+        """Generate a summary of the content.
+        
+        Long content is summarized per segment and the segment summaries
+        are combined, recursively while they are still too long.
+        """
+        try:
+            return await self._summarize(content)
+        except Exception as e:
+            raise Exception(f"Failed to generate summary: {str(e)}")
+    
+    MAX_SUMMARY_DEPTH = 3  # reduce passes before summaries are truncated to fit
+    
+    async def _summarize(self, content: str, depth: int = 0) -> str:
+        """Summarize content with map-reduce."""
+        def prompt(segment: str, _: int) -> str:
+            return f"""
         Create a comprehensive summary of the following content.
         Include the main points, key concepts, and important details.
         Keep it concise but informative.
         
         Content:
-        {content}
+        {segment}
         """
         
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            raise Exception(f"Failed to generate summary: {str(e)}")
+        return await self._map_reduce(
+            "summary", content, prompt,
+            lambda summaries: self._combine_summaries(summaries, depth)
+        )
     
-    async def chat_with_context(
-        self, 
-        message: str, 
-        context: Optional[str] = None, 
-        mode: ChatMode = ChatMode.HYBRID
-    ) -> str:
-        """Chat with AI using optional context."""
-        if mode == ChatMode.STRICT and not context:
-            return "I can only answer questions based on the provided course material. Please upload or select a course first."
+    async def _combine_summaries(self, summaries: List[str], depth: int = 0) -> str:
+        """Reduce step: merge the summaries of consecutive segments.
+        
+        Summaries too long to combine in one call are summarized again.
+        Nothing guarantees that they shrink, so after ``MAX_SUMMARY_DEPTH``
+        passes each is truncated to its share of the segment budget instead.
+        """
+        def join(parts: List[str]) -> str:
+            return "\n\n".join(f"Section {i + 1}:\n{part}" for i, part in enumerate(parts))
+        
+        sections = join(summaries)
+        if self.estimate_tokens(sections) > self.segment_tokens:
+            if depth < self.MAX_SUMMARY_DEPTH:
+                return await self._summarize(sections, depth + 1)
+            overhead = len(f"Section {len(summaries)}:\n\n\n")
+            share = max(0, int(self.segment_tokens * self.chars_per_token) // len(summaries) - overhead)
+            sections = join([summary[:share] for summary in summaries])
+        
+        prompt = f"""
+        The following are summaries of consecutive sections of one document.
+        Combine them into a single comprehensive summary of the whole document.
+        Include the main points, key concepts, and important details.
+        Keep it concise but informative.
         
+        Summaries:
+        {sections}
+        """
+        return await self._generate_cached("summary", prompt)
+    
+    STRICT_MODE_REFUSAL = "I can only answer questions based on the provided course material. Please upload or select a course first."
+    
+    @staticmethod
+    def _chat_prompt(message: str, context: Optional[str] = None) -> str:
+        """Build the chat prompt with optional context."""
         if context:
-            prompt = f"""
+            return f"""
             Context (course material):
             {context}
             
@@ -145,26 +333,119 @@ class GenAIService:
             Please answer the user's question based on the provided context.
             If the question cannot be answered from the context, please say so clearly.
             """
-        else:
-            prompt = f"""
+        return f"""
             User question: {message}
             
             Please provide a helpful and accurate answer to this question.
             """
+    
+    async def chat_with_context(
+        self, 
+        message: str, 
+        context: Optional[str] = None, 
+        mode: ChatMode = ChatMode.HYBRID,
+        cache_scope: Optional[str] = None
+    ) -> str:
+        """Chat with AI using optional context.
+        
+        With ``cache_scope`` (e.g. ``"course:<id>"``) a recent answer to a
+        similar question in the same scope is reused.
+        """
+        if mode == ChatMode.STRICT and not context:
+            return self.STRICT_MODE_REFUSAL
+        
+        scope = f"{cache_scope}:{mode.value}" if cache_scope else None
+        embedding, cached = await self._similar_answer(message, scope)
+        if cached is not None:
+            return cached
+        
+        prompt = self._chat_prompt(message, context)
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self._generate("chat", prompt)
+            if embedding is not None:
+                self.cache.set_similar(scope, embedding, response.text)
             return response.text
         except Exception as e:
             raise Exception(f"Failed to generate chat response: {str(e)}")
     
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Text of a streamed chunk.
+        
+        ``chunk.text`` raises for chunks that were blocked or carry no
+        parts (e.g. a final chunk with only the finish reason); those
+        contribute nothing instead of ending the stream.
+        """
+        candidates = getattr(chunk, "candidates", None)
+        if not candidates:
+            return ""
+        content = getattr(candidates[0], "content", None)
+        return "".join(getattr(part, "text", "") or "" for part in getattr(content, "parts", None) or [])
+    
+    async def stream_chat_with_context(
+        self, 
+        message: str, 
+        context: Optional[str] = None, 
+        mode: ChatMode = ChatMode.HYBRID,
+        cache_scope: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Stream a chat answer as text fragments.
+        
+        The concurrency slot is held until the stream ends. Closing the
+        generator early (e.g. when the client disconnects) cancels the
+        upstream call.
+        """
+        if mode == ChatMode.STRICT and not context:
+            yield self.STRICT_MODE_REFUSAL
+            return
+        
+        scope = f"{cache_scope}:{mode.value}" if cache_scope else None
+        embedding, cached = await self._similar_answer(message, scope)
+        if cached is not None:
+            yield cached
+            return
+        
+        prompt = self._chat_prompt(message, context)
+        parts = []
+        
+        async with self._limits.get("chat", self._default_limit):
+            chunks = None
+            try:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(
+                        prompt,
+                        stream=True,
+                        request_options={"timeout": self.timeout}
+                    ),
+                    timeout=self.timeout
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    text = self._chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        yield text
+            except asyncio.TimeoutError:
+                raise Exception(f"Failed to generate chat response: Gemini stream stalled for {self.timeout:.0f}s")
+            finally:
+                # Closing the response iterator stops reading the upstream stream
+                if chunks is not None and hasattr(chunks, "aclose"):
+                    await chunks.aclose()
+        
+        # Only complete answers are cached
+        if embedding is not None:
+            self.cache.set_similar(scope, embedding, "".join(parts))
+    
     async def generate_embeddings(self, text: str) -> List[float]:
         """Generate embeddings for text using Gemini."""
         try:
-            # Note: This is a placeholder. Gemini Pro doesn't directly provide embeddings.
-            # You might need to use a different model or service for embeddings.
-            # For now, we'll return a mock embedding.
-            return [0.0] * 768  # Standard embedding dimension
+            from app.services.embedding_service import embedding_service
+            return await embedding_service.embed_query(text)
         except Exception as e:
             raise Exception(f"Failed to generate embeddings: {str(e)}")
 
@@ -0,0 +1,352 @@
+"""Durable background jobs stored in MongoDB."""
+
+import asyncio
+import os
+import random
+import socket
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.database import get_database
+
+
+class JobStatus:
+    """Job lifecycle states."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    DEAD = "dead"  # retries exhausted
+
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def retry_delay(attempts: int, base: float, maximum: float) -> float:
+    """Exponential backoff with full jitter for the given attempt count."""
+    ceiling = min(maximum, base * (2 ** max(0, attempts - 1)))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class JobQueue:
+    """MongoDB-backed job queue with leases, retries and a dead-letter state.
+
+    A worker claims a job by atomically setting a lease on it. Jobs whose
+    lease expires (e.g. the worker crashed) are claimed again by another
+    worker. Failed jobs are retried with exponential backoff until
+    ``max_attempts`` is reached and then stay in the ``dead`` state.
+    """
+
+    def __init__(self, collection_name: str = "jobs"):
+        """Initialize job queue."""
+        self.collection_name = collection_name
+        self.handlers: Dict[str, JobHandler] = {}
+        self.dead_handlers: Dict[str, JobHandler] = {}
+        self.periodic: Dict[str, Tuple[Callable[[], Awaitable[None]], float]] = {}
+        self._collection_indexes_ready = False
+
+    def register(self, job_type: str, handler: JobHandler, on_dead: Optional[JobHandler] = None):
+        """Register the handler of a job type and an optional dead-letter hook."""
+        self.handlers[job_type] = handler
+        if on_dead:
+            self.dead_handlers[job_type] = on_dead
+
+    def schedule(self, name: str, task: Callable[[], Awaitable[None]], interval: float):
+        """Run an idempotent maintenance task every ``interval`` seconds on each worker."""
+        self.periodic[name] = (task, interval)
+
+    def _get_collection(self):
+        """Get the jobs collection on the shared client."""
+        return get_database()[self.collection_name]
+
+    async def _ensure_collection_indexes(self):
+        """Create the claim and dedupe indexes once per process."""
+        if self._collection_indexes_ready:
+            return
+        await self._get_collection().create_indexes([
+            IndexModel([("status", ASCENDING), ("run_at", ASCENDING)]),
+            IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)]),
+            IndexModel([("type", ASCENDING), ("key", ASCENDING), ("created_at", ASCENDING)]),
+            # At most one queued or running job per key
+            IndexModel(
+                [("type", ASCENDING), ("key", ASCENDING)],
+                unique=True,
+                name="active_job_unique",
+                partialFilterExpression={"active": True}
+            )
+        ])
+        self._collection_indexes_ready = True
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        key: Optional[str] = None,
+        max_attempts: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Queue a job; with ``key`` an already active job for that key is returned instead."""
+        await self._ensure_collection_indexes()
+        collection = self._get_collection()
+        now = datetime.utcnow()
+        job = {
+            "type": job_type,
+            "key": key,
+            "payload": payload,
+            "status": JobStatus.QUEUED,
+            "active": True,
+            "attempts": 0,
+            "max_attempts": max_attempts or settings.job_max_attempts,
+            "run_at": now,
+            "lease_expires_at": None,
+            "worker_id": None,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        try:
+            result = await collection.insert_one(job)
+            job["_id"] = result.inserted_id
+            return job
+        except DuplicateKeyError:
+            existing = await collection.find_one({"type": job_type, "key": key, "active": True})
+            if existing:
+                return existing
+            # The active job finished in between; queue a new one
+            return await self.enqueue(job_type, payload, key, max_attempts)
+
+    async def claim(self, worker_id: str, job_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Lease the next due job, including jobs whose previous lease expired."""
+        now = datetime.utcnow()
+        search_filter = {
+            "$or": [
+                {"status": JobStatus.QUEUED, "run_at": {"$lte": now}},
+                # Jobs that used up their attempts are dead-lettered by reap_expired
+                {
+                    "status": JobStatus.RUNNING,
+                    "lease_expires_at": {"$lt": now},
+                    "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+                }
+            ]
+        }
+        if job_types:
+            search_filter["type"] = {"$in": job_types}
+
+        return await self._get_collection().find_one_and_update(
+            search_filter,
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING,
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=settings.job_lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("run_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def extend_lease(self, job: Dict[str, Any]) -> bool:
+        """Extend the lease of a running job; False if another worker took it over."""
+        now = datetime.utcnow()
+        result = await self._get_collection().update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"], "status": JobStatus.RUNNING},
+            {"$set": {
+                "lease_expires_at": now + timedelta(seconds=settings.job_lease_seconds),
+                "updated_at": now
+            }}
+        )
+        return result.modified_count == 1
+
+    async def complete(self, job: Dict[str, Any]):
+        """Mark a job as succeeded."""
+        await self._get_collection().update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"]},
+            {"$set": {
+                "status": JobStatus.SUCCEEDED,
+                "active": None,
+                "lease_expires_at": None,
+                "updated_at": datetime.utcnow()
+            }}
+        )
+
+    async def fail(self, job: Dict[str, Any], error: str) -> str:
+        """Record a failure and schedule a retry, or dead-letter the job."""
+        now = datetime.utcnow()
+        if job["attempts"] >= job["max_attempts"]:
+            update = {"status": JobStatus.DEAD, "active": None}
+        else:
+            delay = retry_delay(job["attempts"], settings.job_retry_base_seconds, settings.job_retry_max_seconds)
+            update = {"status": JobStatus.QUEUED, "run_at": now + timedelta(seconds=delay)}
+
+        update.update({"last_error": error, "lease_expires_at": None, "updated_at": now})
+        await self._get_collection().update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"]},
+            {"$set": update}
+        )
+        return update["status"]
+
+    async def reap_expired(self) -> List[Dict[str, Any]]:
+        """Dead-letter running jobs whose lease expired on their last attempt.
+
+        A job that kills or hangs its worker never reaches ``fail``; once its
+        attempts are used up it is no longer claimed and is marked dead here.
+        """
+        now = datetime.utcnow()
+        reaped = []
+        while True:
+            job = await self._get_collection().find_one_and_update(
+                {
+                    "status": JobStatus.RUNNING,
+                    "lease_expires_at": {"$lt": now},
+                    "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+                },
+                {"$set": {
+                    "status": JobStatus.DEAD,
+                    "active": None,
+                    "last_error": "lease expired",
+                    "lease_expires_at": None,
+                    "updated_at": now
+                }},
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None:
+                return reaped
+            reaped.append(job)
+
+    async def get_latest(self, job_type: str, key: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent job of a type for a key."""
+        return await self._get_collection().find_one(
+            {"type": job_type, "key": key},
+            sort=[("created_at", -1)]
+        )
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by id."""
+        return await self._get_collection().find_one({"_id": ObjectId(job_id)})
+
+
+class JobWorker:
+    """Run queued jobs with a fixed number of concurrent slots."""
+
+    def __init__(self, queue: JobQueue, concurrency: int = 2, poll_interval: float = 1.0, worker_id: Optional[str] = None):
+        """Initialize worker."""
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Ask the worker to finish its current jobs and exit."""
+        self._stopping.set()
+
+    async def run(self):
+        """Claim and run jobs, and run periodic tasks, until stopped."""
+        await asyncio.gather(
+            *(self._slot() for _ in range(self.concurrency)),
+            self._periodic("reap_expired_jobs", self.reap_expired, settings.job_lease_seconds),
+            *(self._periodic(name, task, interval) for name, (task, interval) in self.queue.periodic.items())
+        )
+
+    async def _periodic(self, name: str, task: Callable[[], Awaitable[None]], interval: float):
+        """Run a maintenance task every ``interval`` seconds."""
+        while not self._stopping.is_set():
+            try:
+                await task()
+            except Exception as e:
+                print(f"Periodic task {name} failed: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def reap_expired(self):
+        """Dead-letter jobs whose worker died on their last attempt and run their hooks."""
+        for job in await self.queue.reap_expired():
+            print(f"Job {job['_id']} ({job['type']}) lease expired after {job['attempts']} attempts")
+            await self._dead_letter(job)
+
+    async def _dead_letter(self, job: Dict[str, Any]):
+        """Run the dead-letter hook of a job, if any."""
+        hook = self.queue.dead_handlers.get(job["type"])
+        if hook is None:
+            return
+        try:
+            await hook(job)
+        except Exception as hook_error:
+            print(f"Dead-letter hook for job {job['_id']} failed: {hook_error}")
+
+    async def _slot(self):
+        """Run one job at a time."""
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.claim(self.worker_id, list(self.queue.handlers))
+            except Exception as e:
+                print(f"Job claim failed: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.run_job(job)
+
+    async def _keep_lease(self, job: Dict[str, Any]):
+        """Extend the lease while a job runs; returns once the lease is lost."""
+        while True:
+            await asyncio.sleep(settings.job_lease_seconds / 3)
+            try:
+                if not await self.queue.extend_lease(job):
+                    return
+            except Exception as e:
+                # Without a renewed lease another worker may claim the job
+                print(f"Lease renewal for job {job['_id']} failed: {e}")
+                return
+
+    async def run_job(self, job: Dict[str, Any]):
+        """Run a claimed job and record the outcome.
+
+        If the lease is lost (another worker may already be running the job)
+        the handler is cancelled and no outcome is recorded.
+        """
+        handler = self.queue.handlers[job["type"]]
+        run = asyncio.create_task(handler(job))
+        heartbeat = asyncio.create_task(self._keep_lease(job))
+        try:
+            await asyncio.wait({run, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            run.cancel()
+            raise
+        finally:
+            heartbeat.cancel()
+
+        if not run.done():
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+            print(f"Job {job['_id']} ({job['type']}) lost its lease and was cancelled")
+            return
+
+        try:
+            run.result()
+        except Exception as e:
+            print(f"Job {job['_id']} ({job['type']}) failed: {e}")
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            status = await self.queue.fail(job, error)
+            if status == JobStatus.DEAD:
+                # Pass the failure that dead-lettered the job, not the job as claimed
+                await self._dead_letter({**job, "status": status, "last_error": error})
+        else:
+            await self.queue.complete(job)
+
+
+# Global instance
+job_queue = JobQueue()
@@ -0,0 +1,144 @@
+"""Leaderboard rankings computed by MongoDB aggregations."""
+
+from typing import Any, Dict, List
+
+from app.config import settings
+from app.database import get_database
+from app.services.response_cache import ResponseCache
+
+
+def _active_users_stages(limit: int) -> List[Dict[str, Any]]:
+    """Join ranked rows to their active user and keep the first ``limit``."""
+    return [
+        {"$lookup": {
+            "from": "users",
+            "localField": "_id",
+            "foreignField": "_id",
+            "pipeline": [{"$match": {"is_active": True}}, {"$project": {"name": 1}}],
+            "as": "user"
+        }},
+        {"$unwind": "$user"},
+        {"$limit": limit}
+    ]
+
+
+def _entry_stage() -> Dict[str, Any]:
+    """Shape a ranked row like ``LeaderboardEntry``."""
+    return {"$project": {
+        "_id": 0,
+        "user_id": {"$toString": "$_id"},
+        "user_name": "$user.name",
+        "score": {"$round": ["$score", 1]},
+        "quizzes_taken": 1,
+        "courses_completed": 1
+    }}
+
+
+def leaderboard_pipeline(limit: int, inactive_users: int = 0) -> List[Dict[str, Any]]:
+    """Rank users by average quiz score over their ``user_stats`` documents.
+
+    Sorting straight into a ``$limit`` lets MongoDB keep only the top rows
+    instead of sorting every user. The limit is padded by the number of
+    inactive users, so the top ``limit`` active users are always among them.
+    """
+    return [
+        {"$match": {"quiz_count": {"$gt": 0}}},
+        {"$project": {
+            "score": {"$divide": ["$score_sum", "$quiz_count"]},
+            "quizzes_taken": "$quiz_count",
+            "courses_completed": {"$size": {"$filter": {
+                "input": {"$objectToArray": {"$ifNull": ["$courses", {}]}},
+                "cond": {"$gt": ["$$this.v.completed", 0]}
+            }}}
+        }},
+        {"$sort": {"score": -1, "_id": 1}},
+        {"$limit": limit + inactive_users},
+        *_active_users_stages(limit),
+        _entry_stage()
+    ]
+
+
+def course_leaderboard_pipeline(
+    course_id: Any,
+    quiz_ids: List[Any],
+    limit: int,
+    inactive_users: int = 0
+) -> List[Dict[str, Any]]:
+    """Rank users by average score on one course's quizzes over ``quiz_history``.
+
+    ``courses_completed`` is 1 for users who completed the course and 0
+    otherwise.
+    """
+    return [
+        {"$match": {"quiz_id": {"$in": quiz_ids}}},
+        {"$group": {"_id": "$user_id", "score": {"$avg": "$score"}, "quizzes_taken": {"$sum": 1}}},
+        {"$sort": {"score": -1, "_id": 1}},
+        {"$limit": limit + inactive_users},
+        *_active_users_stages(limit),
+        {"$lookup": {
+            "from": "user_stats",
+            "localField": "_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"completed": f"$courses.{course_id}.completed"}}],
+            "as": "stats"
+        }},
+        {"$set": {"courses_completed": {
+            "$cond": [{"$gt": [{"$ifNull": [{"$first": "$stats.completed"}, 0]}, 0]}, 1, 0]
+        }}},
+        _entry_stage()
+    ]
+
+
+class LeaderboardService:
+    """Global and per-course leaderboards, cached per limit for a short TTL.
+
+    Rankings may lag quiz submissions by up to the TTL.
+    """
+
+    def __init__(self, ttl: float = 30, max_entries: int = 1000):
+        """Initialize service."""
+        self.cache = ResponseCache(ttl=ttl, max_entries=max_entries)
+
+    async def _inactive_user_count(self) -> int:
+        """Number of inactive users, which the rankings skip."""
+        return await get_database()["users"].count_documents({"is_active": {"$ne": True}})
+
+    async def _aggregate(self, collection: str, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run a ranking pipeline."""
+        return await get_database()[collection].aggregate(pipeline).to_list(length=None)
+
+    async def get_leaderboard(self, limit: int) -> List[Dict[str, Any]]:
+        """Top ``limit`` active users by average quiz score."""
+        key = f"global:{limit}"
+        entries = self.cache.get(key)
+        if entries is None:
+            pipeline = leaderboard_pipeline(limit, await self._inactive_user_count())
+            entries = await self._aggregate("user_stats", pipeline)
+            self.cache.set(key, entries)
+        return entries
+
+    async def get_course_leaderboard(self, course_id: Any, limit: int) -> List[Dict[str, Any]]:
+        """Top ``limit`` active users by average score on a course's quizzes."""
+        key = f"course:{course_id}:{limit}"
+        entries = self.cache.get(key)
+        if entries is None:
+            quiz_ids = await get_database()["quizzes"].distinct("_id", {"course_id": course_id})
+            entries = []
+            if quiz_ids:
+                pipeline = course_leaderboard_pipeline(
+                    course_id, quiz_ids, limit, await self._inactive_user_count()
+                )
+                entries = await self._aggregate("quiz_history", pipeline)
+            self.cache.set(key, entries)
+        return entries
+
+    def clear(self):
+        """Drop cached rankings."""
+        self.cache.clear()
+
+
+# Global instance
+leaderboard_service = LeaderboardService(
+    ttl=settings.leaderboard_cache_ttl_seconds,
+    max_entries=settings.leaderboard_cache_max_entries
+)
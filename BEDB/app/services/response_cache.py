@@ -0,0 +1,131 @@
+"""In-process cache for LLM responses."""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class ResponseCache:
+    """Two-tier cache for generated text.
+
+    The exact tier maps (method, model, params, prompt hash) to a response.
+    The semantic tier keeps recent chat answers per scope (a course or an
+    upload) and returns one when a new question's embedding is close enough
+    to a cached question. Both tiers expire entries after a TTL and evict
+    the least recently used entries when full.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600,
+        max_entries: int = 1000,
+        semantic_ttl: float = 600,
+        semantic_threshold: float = 0.95,
+        semantic_max_entries: int = 200,
+        semantic_max_scopes: int = 1000
+    ):
+        """Initialize cache."""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.semantic_ttl = semantic_ttl
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_entries = semantic_max_entries
+        self.semantic_max_scopes = semantic_max_scopes
+        self._exact: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._semantic: "OrderedDict[str, List[Tuple[float, np.ndarray, str]]]" = OrderedDict()
+        self.exact_hits = 0
+        self.exact_misses = 0
+        self.semantic_hits = 0
+        self.semantic_misses = 0
+
+    @staticmethod
+    def key(method: str, model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Build the exact-match key of a call."""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{method}:{model}:{json.dumps(params or {}, sort_keys=True)}:{prompt_hash}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up an exact-match response."""
+        entry = self._exact.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._exact[key]
+            self.exact_misses += 1
+            return None
+
+        self._exact.move_to_end(key)
+        self.exact_hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: str):
+        """Store an exact-match response."""
+        self._exact[key] = (time.monotonic() + self.ttl, value)
+        self._exact.move_to_end(key)
+        while len(self._exact) > self.max_entries:
+            self._exact.popitem(last=False)
+
+    def get_similar(self, scope: str, embedding: List[float]) -> Optional[str]:
+        """Find a cached answer to a similar question in the same scope."""
+        now = time.monotonic()
+        entries = [entry for entry in self._semantic.get(scope, []) if entry[0] >= now]
+        if scope in self._semantic:
+            self._semantic[scope] = entries
+            self._semantic.move_to_end(scope)
+
+        query = self._normalize(embedding)
+        if entries and query is not None:
+            scores = np.stack([vector for _, vector, _ in entries]) @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.semantic_threshold:
+                self.semantic_hits += 1
+                return entries[best][2]
+
+        self.semantic_misses += 1
+        return None
+
+    def set_similar(self, scope: str, embedding: List[float], value: str):
+        """Store an answer for semantic lookups in a scope."""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        entries = self._semantic.setdefault(scope, [])
+        entries.append((time.monotonic() + self.semantic_ttl, vector, value))
+        del entries[:-self.semantic_max_entries]
+        self._semantic.move_to_end(scope)
+        while len(self._semantic) > self.semantic_max_scopes:
+            self._semantic.popitem(last=False)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        """Return a unit vector, or None for a zero vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        return vector / norm
+
+    def clear(self):
+        """Drop every cached response."""
+        self._exact.clear()
+        self._semantic.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts and hit rates of both tiers."""
+        def rate(hits: int, misses: int) -> float:
+            return round(hits / (hits + misses), 4) if hits + misses else 0.0
+
+        return {
+            "exact_entries": len(self._exact),
+            "exact_hits": self.exact_hits,
+            "exact_misses": self.exact_misses,
+            "exact_hit_rate": rate(self.exact_hits, self.exact_misses),
+            "semantic_entries": sum(len(entries) for entries in self._semantic.values()),
+            "semantic_hits": self.semantic_hits,
+            "semantic_misses": self.semantic_misses,
+            "semantic_hit_rate": rate(self.semantic_hits, self.semantic_misses)
+        }
@@ -0,0 +1,97 @@
+"""Sentence-aware text chunking for vector indexing."""
+
+import re
+from typing import List, Dict, Any, Optional, Tuple
+
+
+_SENTENCE_PATTERN = re.compile(r'[^.!?]+(?:[.!?]+|$)')
+
+
+class TextChunker:
+    """Split text into overlapping chunks on sentence boundaries.
+
+    Every chunk is an exact slice of the input, so ``start_pos``/``end_pos``
+    can be used as offsets into the original document.
+    """
+
+    def __init__(self, chunk_size: int = 1000, overlap: int = 200):
+        """Initialize chunker."""
+        if overlap >= chunk_size:
+            raise ValueError("Chunk overlap must be smaller than chunk size")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+    def clean_text(self, text: str) -> str:
+        """Normalise whitespace and strip unusual characters."""
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'[^\w\s\.,!?;:()\-\'""]', ' ', text)
+        return text.strip()
+
+    def split_by_sentences(self, text: str) -> List[str]:
+        """Split text into sentences."""
+        return [text[start:end] for start, end in self.sentence_spans(text)]
+
+    def sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Return ``(start, end)`` offsets of each sentence, whitespace trimmed.
+
+        Sentences longer than ``chunk_size`` are cut on whitespace so that
+        every span fits in a chunk.
+        """
+        spans = []
+        for match in _SENTENCE_PATTERN.finditer(text):
+            start, end = match.span()
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if start == end:
+                continue
+
+            while end - start > self.chunk_size:
+                cut = text.rfind(" ", start + 1, start + self.chunk_size)
+                if cut <= start:
+                    cut = start + self.chunk_size
+                spans.append((start, cut))
+                start = cut
+                while start < end and text[start].isspace():
+                    start += 1
+            if start < end:
+                spans.append((start, end))
+        return spans
+
+    def chunk_text(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Split text into chunks with offsets and metadata."""
+        if not text or not text.strip():
+            return []
+
+        spans = self.sentence_spans(text)
+        chunks = []
+        first = 0
+
+        while first < len(spans):
+            # Greedily take sentences while the chunk fits
+            last = first
+            while last + 1 < len(spans) and spans[last + 1][1] - spans[first][0] <= self.chunk_size:
+                last += 1
+
+            start_pos, end_pos = spans[first][0], spans[last][1]
+            chunk = text[start_pos:end_pos]
+            chunks.append({
+                'text': chunk,
+                'chunk_index': len(chunks),
+                'start_pos': start_pos,
+                'end_pos': end_pos,
+                'word_count': len(chunk.split()),
+                'metadata': metadata or {}
+            })
+
+            if last + 1 >= len(spans):
+                break
+
+            # Start the next chunk with the trailing sentences that fall in the overlap
+            next_first = last + 1
+            while next_first - 1 > first and end_pos - spans[next_first - 1][0] <= self.overlap:
+                next_first -= 1
+            first = next_first
+
+        return chunks
@@ -0,0 +1,51 @@
+"""CPU-bound document text extraction.
+
+These functions run in the worker processes of ``FileService``'s process
+pool, so they take file paths rather than file contents and return plain
+strings.
+"""
+
+from typing import List, Tuple
+
+import PyPDF2
+import docx
+
+# Bump when extraction output changes so cached page texts are not reused
+EXTRACTOR_VERSION = f"pypdf2-{PyPDF2.__version__}:docx:1"
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def limit_memory(max_bytes: int):
+    """Cap the address space of the current worker process.
+
+    The cap also covers the interpreter and imported modules (a few hundred
+    MB). A parse that exceeds it fails with MemoryError instead of exhausting
+    the host.
+    """
+    if resource is None or max_bytes <= 0:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        max_bytes = min(max_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, hard))
+
+
+def extract_pdf_pages(file_path: str, start: int, stop: int) -> Tuple[int, List[str]]:
+    """Extract the text of pages ``start`` to ``stop`` (exclusive) of a PDF file.
+
+    Returns the total page count along with the texts so the first batch
+    tells the caller how many more batches to schedule.
+    """
+    with open(file_path, "rb") as f:
+        pages = PyPDF2.PdfReader(f).pages
+        return len(pages), [pages[i].extract_text() or "" for i in range(start, min(stop, len(pages)))]
+
+
+def extract_docx_text(file_path: str) -> str:
+    """Extract the paragraph text of a DOCX file."""
+    document = docx.Document(file_path)
+    return "\n".join(paragraph.text for paragraph in document.paragraphs).strip()
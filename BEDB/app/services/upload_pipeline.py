@@ -0,0 +1,171 @@
+"""Background processing of uploaded files."""
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+from app.config import settings
+from app.models.upload import Upload, UploadStatus
+from app.services.extraction_cache import extraction_cache, page_hash
+from app.services.file_service import file_service
+from app.services.genai_service import genai_service
+from app.services.job_queue import job_queue
+from app.services.text_extraction import EXTRACTOR_VERSION
+from app.services.vector_service import vector_service
+
+PROCESS_UPLOAD = "process_upload"
+
+
+async def enqueue_upload(upload: Upload, reuse_text: bool = True) -> Dict[str, Any]:
+    """Queue text extraction and indexing of an upload.
+
+    With ``reuse_text`` the cleaned text of an identical file uploaded
+    before, cleaned by the current prompt and model, is used instead of extracting it again. Only one job per upload
+    is active at a time; enqueueing while one is queued or running returns
+    that job.
+    """
+    return await job_queue.enqueue(
+        PROCESS_UPLOAD,
+        {"upload_id": str(upload.id), "reuse_text": reuse_text},
+        key=str(upload.id)
+    )
+
+
+async def _update_upload(upload_id: ObjectId, statuses: List[UploadStatus], fields: Dict[str, Any]) -> bool:
+    """Set fields of an upload if it still exists in one of ``statuses``.
+
+    Unlike ``save()`` this never writes back an upload deleted meanwhile.
+    """
+    result = await Upload.get_pymongo_collection().update_one(
+        {"_id": upload_id, "status": {"$in": [status.value for status in statuses]}},
+        {"$set": {**fields, "updated_at": datetime.utcnow()}}
+    )
+    return result.matched_count == 1
+
+
+async def process_upload(job: Dict[str, Any]):
+    """Extract, clean and index the text of an upload.
+
+    The upload is marked completed only once it is indexed.
+    """
+    upload_id = ObjectId(job["payload"]["upload_id"])
+    upload = await Upload.get(upload_id)
+    running = [UploadStatus.PENDING, UploadStatus.PROCESSING]
+    if not upload or not await _update_upload(upload_id, running, {"status": UploadStatus.PROCESSING.value}):
+        # Deleted while queued
+        return
+
+    cleaned_text = None
+    if upload.content_hash and job["payload"].get("reuse_text", True):
+        cleaned_text = await file_service.blobs.get_text(upload.content_hash, genai_service.extract_version)
+
+    if cleaned_text is None:
+        pages = await extract_pages(upload)
+
+        # Clean and process text using AI
+        cleaned_text = await clean_pages(pages)
+        if upload.content_hash:
+            await file_service.blobs.set_text(upload.content_hash, genai_service.extract_version, cleaned_text)
+
+    if not await _update_upload(upload_id, [UploadStatus.PROCESSING], {"extracted_text": cleaned_text}):
+        # Deleted while extracting
+        return
+
+    # Index content for vector search; chunks of a shared file hit the embedding cache
+    await vector_service.index_upload_content(str(upload_id))
+
+    completed = await _update_upload(
+        upload_id,
+        [UploadStatus.PROCESSING],
+        {"status": UploadStatus.COMPLETED.value, "metadata": None}  # Clear any previous errors
+    )
+    if not completed:
+        # Deleted while indexing, possibly before its chunks were written
+        await vector_service.delete_document_embeddings(str(upload_id))
+
+
+async def extract_pages(upload: Upload) -> List[str]:
+    """Get the raw page texts of an upload, extracting them only if not cached."""
+    if upload.content_hash:
+        pages = await extraction_cache.get_pages(upload.content_hash, EXTRACTOR_VERSION)
+        if pages is not None:
+            return pages
+
+    pages = await file_service.extract_pages_from_file(upload.file_path, upload.file_type)
+    if upload.content_hash:
+        await extraction_cache.put_pages(upload.content_hash, EXTRACTOR_VERSION, pages)
+    return pages
+
+
+def pack_pages(pages: List[str], budget: int) -> List[str]:
+    """Join consecutive non-blank pages into groups of at most ``budget`` tokens.
+
+    A page larger than the budget forms a group of its own, which the
+    cleanup call splits further.
+    """
+    groups = []
+    current: List[str] = []
+    size = 0
+    for page in pages:
+        if not page.strip():
+            continue
+        tokens = genai_service.estimate_tokens(page)
+        if current and size + tokens > budget:
+            groups.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(page)
+        size += tokens
+    if current:
+        groups.append("\n\n".join(current))
+    return groups
+
+
+async def clean_pages(pages: List[str]) -> str:
+    """Clean pages with the LLM, packing as many pages as fit into each call.
+
+    Cleaned groups are cached by the hash of their raw text, so only groups
+    whose raw text changed are sent to the LLM again.
+    """
+    version = genai_service.extract_version
+    groups = pack_pages(pages, genai_service.segment_tokens)
+    hashes = [page_hash(group) for group in groups]
+    cleaned = await extraction_cache.get_cleaned(version, list(set(hashes)))
+
+    missing = {raw_hash: group for raw_hash, group in zip(hashes, groups) if raw_hash not in cleaned}
+    results = await asyncio.gather(*(
+        genai_service.extract_text_from_content(group) for group in missing.values()
+    ))
+    fresh = dict(zip(missing, results))
+    await extraction_cache.put_cleaned(version, fresh)
+    cleaned.update(fresh)
+
+    return "\n\n".join(cleaned[raw_hash] for raw_hash in hashes if raw_hash in cleaned).strip()
+
+
+async def mark_upload_failed(job: Dict[str, Any]):
+    """Mark an upload as failed once its job has no retries left."""
+    await _update_upload(
+        ObjectId(job["payload"]["upload_id"]),
+        [UploadStatus.PENDING, UploadStatus.PROCESSING],
+        {"status": UploadStatus.FAILED.value, "metadata": {"error": job.get("last_error") or "Processing failed"}}
+    )
+
+
+async def remove_expired_uploads():
+    """Delete resumable uploads that were not completed in time, with their parts."""
+    expired = await Upload.find(
+        Upload.status == UploadStatus.UPLOADING,
+        Upload.expires_at < datetime.utcnow()
+    ).to_list()
+    for upload in expired:
+        file_service.remove_upload_parts(str(upload.id))
+        await upload.delete()
+
+    # Parts whose upload record is already gone
+    file_service.remove_stale_parts(settings.resumable_upload_ttl_hours * 3600)
+
+
+job_queue.register(PROCESS_UPLOAD, process_upload, on_dead=mark_upload_failed)
+job_queue.schedule("remove_expired_uploads", remove_expired_uploads, settings.resumable_cleanup_interval_seconds)
@@ -0,0 +1,243 @@
+"""Materialised per-user learning statistics."""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+from app.database import get_database
+from app.models.dashboard import ProgressStatus
+
+
+def week_start(moment: datetime) -> str:
+    """Key of the week (starting Monday) that contains ``moment``."""
+    return (moment.date() - timedelta(days=moment.weekday())).isoformat()
+
+
+def completion_delta(was_completed: bool, is_completed: bool) -> int:
+    """Change in a course's completed record count when a progress record changes status."""
+    return int(is_completed) - int(was_completed)
+
+
+def quiz_increments(score: float, taken_at: datetime) -> Dict[str, Any]:
+    """``$inc`` fields for one submitted quiz."""
+    week = week_start(taken_at)
+    return {
+        "quiz_count": 1,
+        "score_sum": score,
+        f"weekly.{week}.quizzes": 1,
+        f"weekly.{week}.score_sum": score
+    }
+
+
+def progress_increments(course_id: Any, time_spent: int = 0, completed: int = 0) -> Dict[str, Any]:
+    """``$inc`` fields for a progress update; empty if nothing changed."""
+    increments = {}
+    if time_spent:
+        increments["time_spent"] = time_spent
+    if completed:
+        increments[f"courses.{course_id}.completed"] = completed
+    return increments
+
+
+def build_stats(
+    quizzes: Iterable[Tuple[float, datetime]],
+    progress: Iterable[Tuple[Any, bool, int]]
+) -> Dict[str, Any]:
+    """Compute a stats document from scratch.
+
+    ``quizzes`` holds (score, taken_at) per quiz taken and ``progress``
+    holds (course_id, completed, time_spent) per progress record.
+    """
+    stats = {"quiz_count": 0, "score_sum": 0.0, "time_spent": 0, "weekly": {}, "courses": {}}
+    for score, taken_at in quizzes:
+        week = stats["weekly"].setdefault(week_start(taken_at), {"quizzes": 0, "score_sum": 0.0})
+        week["quizzes"] += 1
+        week["score_sum"] += score
+        stats["quiz_count"] += 1
+        stats["score_sum"] += score
+
+    for course_id, completed, time_spent in progress:
+        stats["time_spent"] += time_spent
+        if completed:
+            course = stats["courses"].setdefault(str(course_id), {"completed": 0})
+            course["completed"] += 1
+    return stats
+
+
+def mean_score(stats: Optional[Dict[str, Any]]) -> float:
+    """Mean quiz score, 0 if no quiz was taken."""
+    if not stats or not stats.get("quiz_count"):
+        return 0.0
+    return stats["score_sum"] / stats["quiz_count"]
+
+
+def completed_course_count(stats: Optional[Dict[str, Any]]) -> int:
+    """Number of courses with at least one completed progress record."""
+    if not stats:
+        return 0
+    return sum(1 for course in (stats.get("courses") or {}).values() if course.get("completed", 0) > 0)
+
+
+def weekly_progress(stats: Optional[Dict[str, Any]], now: datetime, weeks: int = 4) -> List[Dict[str, Any]]:
+    """Quizzes taken and average score for the last ``weeks`` weeks, newest first."""
+    buckets = (stats or {}).get("weekly") or {}
+    result = []
+    for i in range(weeks):
+        bucket = buckets.get(week_start(now - timedelta(weeks=i)), {})
+        quizzes = bucket.get("quizzes", 0)
+        result.append({
+            "week": f"Week {weeks - i}",
+            "quizzes_taken": quizzes,
+            "average_score": bucket.get("score_sum", 0) / quizzes if quizzes else 0
+        })
+    return result
+
+
+def dashboard_pipeline(user_id: Any, since: datetime, recent_limit: int = 10) -> List[Dict[str, Any]]:
+    """Gather everything the dashboard shows in one aggregation over ``users``.
+
+    Starting from the user's own document, each ``$lookup`` pulls one part
+    of the dashboard: the stats document, owned course titles, average
+    progress per course and quizzes taken since ``since``.
+    """
+    return [
+        {"$match": {"_id": user_id}},
+        {"$project": {"_id": 1}},
+        {"$lookup": {"from": "user_stats", "localField": "_id", "foreignField": "_id", "as": "stats"}},
+        {"$lookup": {
+            "from": "courses",
+            "localField": "_id",
+            "foreignField": "owner_id",
+            "pipeline": [{"$project": {"title": 1}}],
+            "as": "courses"
+        }},
+        {"$lookup": {
+            "from": "dashboard_progress",
+            "localField": "_id",
+            "foreignField": "user_id",
+            "pipeline": [{"$group": {"_id": "$course_id", "progress": {"$avg": "$progress"}}}],
+            "as": "progress"
+        }},
+        {"$lookup": {
+            "from": "quiz_history",
+            "localField": "_id",
+            "foreignField": "user_id",
+            "pipeline": [
+                {"$match": {"taken_at": {"$gte": since}}},
+                {"$sort": {"taken_at": -1}},
+                {"$limit": recent_limit},
+                {"$project": {"score": 1, "taken_at": 1}}
+            ],
+            "as": "recent_quizzes"
+        }}
+    ]
+
+
+def summarize_dashboard(result: Optional[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+    """Turn the output of ``dashboard_pipeline`` into ``DashboardStats`` fields."""
+    result = result or {}
+    stats = (result.get("stats") or [None])[0] or build_stats([], [])
+    progress = {row["_id"]: row["progress"] for row in result.get("progress", [])}
+    courses = result.get("courses", [])
+    return {
+        "total_courses": len(courses),
+        "completed_courses": completed_course_count(stats),
+        "total_quizzes": stats["quiz_count"],
+        "total_time_spent": stats["time_spent"],
+        "average_score": mean_score(stats),
+        "recent_activity": [
+            {"type": "quiz", "title": "Quiz completed", "score": quiz["score"], "date": quiz["taken_at"]}
+            for quiz in result.get("recent_quizzes", [])
+        ],
+        "progress_by_course": [
+            {"course_id": str(course["_id"]), "course_title": course["title"], "progress": progress[course["_id"]]}
+            for course in courses if course["_id"] in progress
+        ],
+        "weekly_progress": weekly_progress(stats, now)
+    }
+
+
+class UserStatsService:
+    """One ``user_stats`` document per user, kept current with ``$inc``.
+
+    Holds quiz count and score sum (overall and per week), total minutes
+    spent and completed progress records per course, so dashboards read a
+    single document instead of summing the history collections.
+    """
+
+    def __init__(self, collection_name: str = "user_stats"):
+        """Initialize service."""
+        self.collection_name = collection_name
+
+    def get_collection(self):
+        """Get the stats collection on the shared client."""
+        return get_database()[self.collection_name]
+
+    async def _increment(self, user_id: Any, increments: Dict[str, Any]):
+        """Atomically add to a user's counters, creating the document if needed."""
+        if not increments:
+            return
+        await self.get_collection().update_one(
+            {"_id": user_id},
+            {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    async def record_quiz(self, user_id: Any, score: float, taken_at: datetime):
+        """Count a submitted quiz."""
+        await self._increment(user_id, quiz_increments(score, taken_at))
+
+    async def record_progress(self, user_id: Any, course_id: Any, time_spent: int = 0, completed: int = 0):
+        """Add study time and the change in completed records for a course."""
+        await self._increment(user_id, progress_increments(course_id, time_spent, completed))
+
+    async def get(self, user_id: Any) -> Dict[str, Any]:
+        """Get a user's stats; users without activity get empty stats."""
+        stats = await self.get_collection().find_one({"_id": user_id})
+        return stats or build_stats([], [])
+
+    async def get_dashboard(self, user_id: Any, recent_days: int = 7) -> Dict[str, Any]:
+        """Get the dashboard statistics of a user in a single round trip."""
+        now = datetime.utcnow()
+        docs = await get_database()["users"].aggregate(
+            dashboard_pipeline(user_id, now - timedelta(days=recent_days))
+        ).to_list(length=1)
+        return summarize_dashboard(docs[0] if docs else None, now)
+
+    async def rebuild(self) -> int:
+        """Recompute every user's stats from quiz history and progress records.
+
+        Meant for backfills: increments that land while it runs can be
+        overwritten. Returns the number of users written.
+        """
+        db = get_database()
+        quizzes = defaultdict(list)
+        async for doc in db["quiz_history"].find({}, projection={"user_id": 1, "score": 1, "taken_at": 1}):
+            quizzes[doc["user_id"]].append((doc["score"], doc["taken_at"]))
+
+        progress = defaultdict(list)
+        async for doc in db["dashboard_progress"].find(
+            {}, projection={"user_id": 1, "course_id": 1, "status": 1, "time_spent": 1}
+        ):
+            progress[doc["user_id"]].append(
+                (doc["course_id"], doc.get("status") == ProgressStatus.COMPLETED.value, doc.get("time_spent", 0))
+            )
+
+        now = datetime.utcnow()
+        requests = [
+            ReplaceOne(
+                {"_id": user_id},
+                {**build_stats(quizzes.get(user_id, []), progress.get(user_id, [])), "updated_at": now},
+                upsert=True
+            )
+            for user_id in set(quizzes) | set(progress)
+        ]
+        if requests:
+            await self.get_collection().bulk_write(requests, ordered=False)
+        return len(requests)
+
+
+# Global instance
+user_stats_service = UserStatsService()
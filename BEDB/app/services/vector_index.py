@@ -0,0 +1,711 @@
+"""In-process vector indexes for semantic search."""
+
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+
+
+PartitionKey = Tuple[str, str]
+
+
+class _Partition:
+    """Contiguous float32 matrix of vectors with their keys.
+
+    The exact index keeps one partition per (document_type, owner_id) pair;
+    the IVF index keeps one per inverted list and tags every row with the
+    code of its (document_type, owner_id) pair.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 64):
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.codes = np.zeros(capacity, dtype=np.int32)
+        self.keys: List[str] = []
+        self.document_ids: List[str] = []
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def append(self, key: str, document_id: str, vector: np.ndarray, code: int = 0) -> int:
+        """Append a normalised vector and return its row."""
+        row = self.size
+        if row == self.vectors.shape[0]:
+            grown = np.zeros((row * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:row] = self.vectors
+            self.vectors = grown
+            self.codes = np.concatenate([self.codes, np.zeros(row, dtype=np.int32)])
+        self.vectors[row] = vector
+        self.codes[row] = code
+        self.keys.append(key)
+        self.document_ids.append(document_id)
+        return row
+
+    def pop(self, row: int) -> Optional[str]:
+        """Remove a row by moving the last row into its place.
+
+        Returns the key of the moved row, if any, so the caller can fix its location.
+        """
+        last = self.size - 1
+        moved_key = None
+        if row != last:
+            self.vectors[row] = self.vectors[last]
+            self.codes[row] = self.codes[last]
+            self.keys[row] = self.keys[last]
+            self.document_ids[row] = self.document_ids[last]
+            moved_key = self.keys[row]
+        self.keys.pop()
+        self.document_ids.pop()
+        return moved_key
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine scores of every row against a normalised query."""
+        return self.vectors[:self.size] @ query
+
+    def document_mask(self, document_id: str) -> np.ndarray:
+        """Boolean mask of the rows belonging to one document."""
+        return np.fromiter(
+            (doc == document_id for doc in self.document_ids),
+            dtype=bool,
+            count=self.size
+        )
+
+
+def normalize(vector) -> np.ndarray:
+    """Return a float32 unit vector (zero vectors stay zero)."""
+    array = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(array))
+    if norm > 0:
+        array = array / norm
+    return array
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _merge(candidate_keys: List[str], candidate_scores: List[np.ndarray], k: int) -> List[Tuple[str, float]]:
+    """Merge per-partition candidates into the global top-k."""
+    if not candidate_keys:
+        return []
+    merged = np.concatenate(candidate_scores)
+    order = top_k(merged, k)
+    return [(candidate_keys[i], float(merged[i])) for i in order]
+
+
+def write_snapshot(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    """Write snapshot arrays to ``path``, replacing any previous file atomically."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # A unique temp file per writer, so workers saving at the same time
+    # never interleave; the last os.replace wins with a complete file
+    fd, tmp_path = tempfile.mkstemp(dir=directory or None, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class VectorIndex(ABC):
+    """Common interface and snapshot support for vector index backends."""
+
+    dimension: Optional[int] = None
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored vectors."""
+
+    @abstractmethod
+    def __contains__(self, key: str) -> bool:
+        """Whether a vector is stored under ``key``."""
+
+    @abstractmethod
+    def keys(self) -> Set[str]:
+        """Keys of all stored vectors."""
+
+    @abstractmethod
+    def add(
+        self,
+        key: str,
+        embedding,
+        document_id: str,
+        document_type: str,
+        owner_id: Optional[str] = None
+    ) -> None:
+        """Add or replace the vector stored under ``key``."""
+
+    @abstractmethod
+    def remove(self, key: str) -> bool:
+        """Remove a single vector."""
+
+    @abstractmethod
+    def remove_document(self, document_id: str) -> int:
+        """Remove every vector belonging to a document."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop all vectors."""
+
+    @abstractmethod
+    def search(
+        self,
+        query,
+        k: int = 10,
+        document_type: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        document_id: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(key, score)`` pairs ordered by cosine similarity."""
+
+    @abstractmethod
+    def rows(self) -> Iterator[Tuple[str, str, str, str, np.ndarray]]:
+        """Iterate ``(key, document_id, document_type, owner_id, vector)`` rows."""
+
+    @property
+    def needs_training(self) -> bool:
+        """Whether :meth:`train` should run before further searches."""
+        return False
+
+    def fit(self) -> Any:
+        """Compute a new layout without modifying the index.
+
+        Only reads the index, so it can run in a worker thread as long as
+        nothing writes to the index meanwhile. Pass the result to
+        :meth:`apply_training`.
+        """
+        return None
+
+    def apply_training(self, trained: Any) -> None:
+        """Install a layout computed by :meth:`fit`."""
+
+    def train(self) -> None:
+        """Fit and install a new layout in the calling thread."""
+        self.apply_training(self.fit())
+
+    def _snapshot_extra(self) -> Dict[str, np.ndarray]:
+        """Backend specific arrays stored alongside the rows."""
+        return {}
+
+    def _restore_extra(self, arrays) -> None:
+        """Restore backend specific state before rows are re-added."""
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Copy the index contents into plain arrays for :func:`write_snapshot`."""
+        rows = list(self.rows())
+        dimension = self.dimension or 0
+        vectors = np.zeros((len(rows), dimension), dtype=np.float32)
+        for i, row in enumerate(rows):
+            vectors[i] = row[4]
+
+        return {
+            "backend": np.array(type(self).__name__),
+            "dimension": np.array(dimension),
+            "vectors": vectors,
+            "keys": np.array([row[0] for row in rows], dtype=str),
+            "document_ids": np.array([row[1] for row in rows], dtype=str),
+            "document_types": np.array([row[2] for row in rows], dtype=str),
+            "owner_ids": np.array([row[3] for row in rows], dtype=str),
+            **self._snapshot_extra()
+        }
+
+    def save(self, path: str) -> None:
+        """Write the index to ``path`` atomically."""
+        write_snapshot(path, self.snapshot())
+
+    def load(self, path: str) -> None:
+        """Replace the contents of the index with a snapshot written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as arrays:
+            if str(arrays["backend"]) != type(self).__name__:
+                raise ValueError(
+                    f"Snapshot was written by {arrays['backend']}, not {type(self).__name__}"
+                )
+            self.clear()
+            dimension = int(arrays["dimension"])
+            self.dimension = dimension or None
+            self._restore_extra(arrays)
+            for key, document_id, document_type, owner_id, vector in zip(
+                arrays["keys"],
+                arrays["document_ids"],
+                arrays["document_types"],
+                arrays["owner_ids"],
+                arrays["vectors"]
+            ):
+                self.add(str(key), vector, str(document_id), str(document_type), str(owner_id))
+
+
+class ExactVectorIndex(VectorIndex):
+    """Exact top-k cosine search over embeddings held in memory.
+
+    Vectors are grouped by ``(document_type, owner_id)`` so a scoped query only
+    touches the rows it can return, and each partition is answered with a single
+    matrix-vector product followed by ``argpartition``.
+    """
+
+    def __init__(self, dimension: Optional[int] = None):
+        """Initialize an empty index."""
+        self.dimension = dimension
+        self._partitions: Dict[PartitionKey, _Partition] = {}
+        self._locations: Dict[str, Tuple[PartitionKey, int]] = {}
+        self._document_keys: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._locations
+
+    def keys(self) -> Set[str]:
+        """Keys of all stored vectors."""
+        return set(self._locations)
+
+    def rows(self) -> Iterator[Tuple[str, str, str, str, np.ndarray]]:
+        """Iterate ``(key, document_id, document_type, owner_id, vector)`` rows."""
+        for (document_type, owner_id), partition in self._partitions.items():
+            for row in range(partition.size):
+                yield (
+                    partition.keys[row],
+                    partition.document_ids[row],
+                    document_type,
+                    owner_id,
+                    partition.vectors[row]
+                )
+
+    def add(
+        self,
+        key: str,
+        embedding,
+        document_id: str,
+        document_type: str,
+        owner_id: Optional[str] = None
+    ) -> None:
+        """Add or replace the vector stored under ``key``."""
+        vector = normalize(embedding)
+        if self.dimension is None:
+            self.dimension = vector.shape[0]
+        elif vector.shape[0] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {vector.shape[0]} does not match index dimension {self.dimension}"
+            )
+
+        if key in self._locations:
+            self.remove(key)
+
+        partition_key = (document_type, owner_id or "")
+        partition = self._partitions.get(partition_key)
+        if partition is None:
+            partition = _Partition(self.dimension)
+            self._partitions[partition_key] = partition
+
+        row = partition.append(key, document_id, vector)
+        self._locations[key] = (partition_key, row)
+        self._document_keys.setdefault(document_id, set()).add(key)
+
+    def remove(self, key: str) -> bool:
+        """Remove a single vector."""
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+
+        partition_key, row = location
+        partition = self._partitions[partition_key]
+        document_id = partition.document_ids[row]
+        moved_key = partition.pop(row)
+        if moved_key is not None:
+            self._locations[moved_key] = (partition_key, row)
+        if partition.size == 0:
+            del self._partitions[partition_key]
+
+        keys = self._document_keys.get(document_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._document_keys[document_id]
+        return True
+
+    def remove_document(self, document_id: str) -> int:
+        """Remove every vector belonging to a document."""
+        keys = list(self._document_keys.get(document_id, ()))
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all vectors."""
+        self._partitions.clear()
+        self._locations.clear()
+        self._document_keys.clear()
+
+    def _matching_partitions(
+        self,
+        document_type: Optional[str],
+        owner_id: Optional[str]
+    ) -> List[_Partition]:
+        if document_type is not None and owner_id is not None:
+            partition = self._partitions.get((document_type, owner_id))
+            return [partition] if partition else []
+        return [
+            partition
+            for (partition_type, partition_owner), partition in self._partitions.items()
+            if (document_type is None or partition_type == document_type)
+            and (owner_id is None or partition_owner == owner_id)
+        ]
+
+    def search(
+        self,
+        query,
+        k: int = 10,
+        document_type: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        document_id: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(key, score)`` pairs ordered by cosine similarity."""
+        if not self._locations or k <= 0:
+            return []
+
+        query_vector = normalize(query)
+        if query_vector.shape[0] != self.dimension:
+            raise ValueError(
+                f"Query dimension {query_vector.shape[0]} does not match index dimension {self.dimension}"
+            )
+
+        candidate_keys: List[str] = []
+        candidate_scores: List[np.ndarray] = []
+        for partition in self._matching_partitions(document_type, owner_id):
+            scores = partition.scores(query_vector)
+            if document_id is not None:
+                scores = np.where(partition.document_mask(document_id), scores, -np.inf)
+            best = top_k(scores, k)
+            best = best[np.isfinite(scores[best])]
+            candidate_keys.extend(partition.keys[i] for i in best)
+            candidate_scores.append(scores[best])
+
+        return _merge(candidate_keys, candidate_scores, k)
+
+
+class IVFFlatIndex(VectorIndex):
+    """Approximate top-k cosine search with an inverted-file (IVF-flat) layout.
+
+    Vectors are assigned to the nearest of ``nlist`` spherical k-means
+    centroids and a query only scans the ``nprobe`` closest lists. Until
+    enough vectors exist to train the centroids the index keeps a single
+    list, which makes it behave exactly like a brute-force scan.
+
+    Filtered queries whose candidate set is at most ``exact_search_limit``
+    vectors (a single course or user) are answered exactly, since probing a
+    few lists would miss most of such a small partition.
+    """
+
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        nlist: int = 256,
+        nprobe: int = 16,
+        train_iterations: int = 10,
+        exact_search_limit: int = 4096,
+        auto_train: bool = True,
+        seed: int = 0
+    ):
+        """Initialize an empty, untrained index."""
+        self.dimension = dimension
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iterations = train_iterations
+        self.exact_search_limit = exact_search_limit
+        self.auto_train = auto_train
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[_Partition] = []
+        self._locations: Dict[str, Tuple[int, int]] = {}
+        self._document_keys: Dict[str, Set[str]] = {}
+        self._codes: Dict[PartitionKey, int] = {}
+        self._code_keys: List[PartitionKey] = []
+        self._code_members: Dict[int, Set[str]] = {}
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._locations
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def train_threshold(self) -> int:
+        """Number of vectors needed before centroids are trained."""
+        return self.nlist * 39
+
+    def keys(self) -> Set[str]:
+        """Keys of all stored vectors."""
+        return set(self._locations)
+
+    def rows(self) -> Iterator[Tuple[str, str, str, str, np.ndarray]]:
+        """Iterate ``(key, document_id, document_type, owner_id, vector)`` rows."""
+        for inverted_list in self._lists:
+            for row in range(inverted_list.size):
+                document_type, owner_id = self._code_keys[inverted_list.codes[row]]
+                yield (
+                    inverted_list.keys[row],
+                    inverted_list.document_ids[row],
+                    document_type,
+                    owner_id,
+                    inverted_list.vectors[row]
+                )
+
+    def _code(self, document_type: str, owner_id: Optional[str]) -> int:
+        partition_key = (document_type, owner_id or "")
+        code = self._codes.get(partition_key)
+        if code is None:
+            code = len(self._code_keys)
+            self._codes[partition_key] = code
+            self._code_keys.append(partition_key)
+        return code
+
+    def _nearest_list(self, vector: np.ndarray) -> int:
+        if self.centroids is None:
+            return 0
+        return int(np.argmax(self.centroids @ vector))
+
+    def add(
+        self,
+        key: str,
+        embedding,
+        document_id: str,
+        document_type: str,
+        owner_id: Optional[str] = None
+    ) -> None:
+        """Add or replace the vector stored under ``key``."""
+        vector = normalize(embedding)
+        if self.dimension is None:
+            self.dimension = vector.shape[0]
+        elif vector.shape[0] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {vector.shape[0]} does not match index dimension {self.dimension}"
+            )
+
+        if key in self._locations:
+            self.remove(key)
+        if not self._lists:
+            self._lists.append(_Partition(self.dimension))
+
+        list_id = self._nearest_list(vector)
+        code = self._code(document_type, owner_id)
+        row = self._lists[list_id].append(key, document_id, vector, code)
+        self._locations[key] = (list_id, row)
+        self._document_keys.setdefault(document_id, set()).add(key)
+        self._code_members.setdefault(code, set()).add(key)
+
+    def remove(self, key: str) -> bool:
+        """Remove a single vector."""
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+
+        list_id, row = location
+        inverted_list = self._lists[list_id]
+        document_id = inverted_list.document_ids[row]
+        self._code_members[int(inverted_list.codes[row])].discard(key)
+        moved_key = inverted_list.pop(row)
+        if moved_key is not None:
+            self._locations[moved_key] = (list_id, row)
+
+        keys = self._document_keys.get(document_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._document_keys[document_id]
+        return True
+
+    def remove_document(self, document_id: str) -> int:
+        """Remove every vector belonging to a document."""
+        keys = list(self._document_keys.get(document_id, ()))
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all vectors and centroids."""
+        self.centroids = None
+        self._lists = []
+        self._locations.clear()
+        self._document_keys.clear()
+        self._codes.clear()
+        self._code_keys = []
+        self._code_members.clear()
+        self._trained_size = 0
+
+    def _fit_centroids(self, vectors: np.ndarray) -> np.ndarray:
+        """Spherical k-means on a sample of the stored vectors."""
+        rng = np.random.default_rng(self.seed)
+        nlist = min(self.nlist, len(vectors))
+        sample_size = min(len(vectors), self.nlist * 64)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(self.train_iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Re-seed empty clusters with random sample points
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+        return centroids
+
+    @property
+    def needs_training(self) -> bool:
+        """Train once there is enough data, and retrain when the collection
+        has grown well past what the centroids were fitted on."""
+        return self.auto_train and len(self) >= self.train_threshold and len(self) >= 4 * self._trained_size
+
+    def fit(self) -> Optional[Tuple[np.ndarray, List[_Partition], Dict[str, Tuple[int, int]]]]:
+        """Fit the centroids and redistribute every vector into new lists.
+
+        Returns ``(centroids, lists, locations)`` for :meth:`apply_training`.
+        """
+        lists = [inverted_list for inverted_list in self._lists if inverted_list.size]
+        if not lists:
+            return None
+
+        vectors = np.concatenate([inverted_list.vectors[:inverted_list.size] for inverted_list in lists])
+        codes = np.concatenate([inverted_list.codes[:inverted_list.size] for inverted_list in lists])
+        keys = [key for inverted_list in lists for key in inverted_list.keys]
+        document_ids = [document_id for inverted_list in lists for document_id in inverted_list.document_ids]
+
+        centroids = self._fit_centroids(vectors)
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), 65536):
+            block = vectors[start:start + 65536]
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        new_lists = [_Partition(self.dimension) for _ in range(len(centroids))]
+        locations = {}
+        for i, list_id in enumerate(assignments):
+            row = new_lists[list_id].append(keys[i], document_ids[i], vectors[i], int(codes[i]))
+            locations[keys[i]] = (int(list_id), row)
+        return centroids, new_lists, locations
+
+    def apply_training(self, trained) -> None:
+        """Install centroids and lists computed by :meth:`fit`."""
+        if trained is None:
+            return
+        self.centroids, self._lists, self._locations = trained
+        self._trained_size = len(self._locations)
+
+    def _snapshot_extra(self) -> Dict[str, np.ndarray]:
+        if self.centroids is None:
+            return {}
+        return {"centroids": self.centroids.copy()}
+
+    def _restore_extra(self, arrays) -> None:
+        if "centroids" in arrays:
+            self.centroids = arrays["centroids"].astype(np.float32)
+            self._lists = [_Partition(self.dimension) for _ in range(len(self.centroids))]
+            self._trained_size = len(arrays["keys"])
+
+    def search(
+        self,
+        query,
+        k: int = 10,
+        document_type: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        document_id: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``k`` approximate ``(key, score)`` pairs ordered by cosine similarity."""
+        if not self._locations or k <= 0:
+            return []
+
+        query_vector = normalize(query)
+        if query_vector.shape[0] != self.dimension:
+            raise ValueError(
+                f"Query dimension {query_vector.shape[0]} does not match index dimension {self.dimension}"
+            )
+
+        allowed_codes = None
+        if document_type is not None or owner_id is not None:
+            allowed_codes = np.array([
+                code for (partition_type, partition_owner), code in self._codes.items()
+                if (document_type is None or partition_type == document_type)
+                and (owner_id is None or partition_owner == owner_id)
+            ], dtype=np.int32)
+            if allowed_codes.size == 0:
+                return []
+            candidate_count = sum(len(self._code_members[code]) for code in allowed_codes)
+            if candidate_count <= self.exact_search_limit:
+                return self._search_members(query_vector, k, allowed_codes, document_id)
+
+        if self.centroids is None:
+            probe = [0]
+        else:
+            probe = top_k(self.centroids @ query_vector, self.nprobe)
+
+        candidate_keys: List[str] = []
+        candidate_scores: List[np.ndarray] = []
+        for list_id in probe:
+            inverted_list = self._lists[list_id]
+            if inverted_list.size == 0:
+                continue
+            scores = inverted_list.scores(query_vector)
+            if allowed_codes is not None:
+                scores = np.where(np.isin(inverted_list.codes[:inverted_list.size], allowed_codes), scores, -np.inf)
+            if document_id is not None:
+                scores = np.where(inverted_list.document_mask(document_id), scores, -np.inf)
+            best = top_k(scores, k)
+            best = best[np.isfinite(scores[best])]
+            candidate_keys.extend(inverted_list.keys[i] for i in best)
+            candidate_scores.append(scores[best])
+
+        return _merge(candidate_keys, candidate_scores, k)
+
+    def _search_members(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        codes: np.ndarray,
+        document_id: Optional[str]
+    ) -> List[Tuple[str, float]]:
+        """Exact search over the vectors of the given partition codes."""
+        keys = []
+        vectors = []
+        for code in codes:
+            for key in self._code_members[code]:
+                list_id, row = self._locations[key]
+                inverted_list = self._lists[list_id]
+                if document_id is not None and inverted_list.document_ids[row] != document_id:
+                    continue
+                keys.append(key)
+                vectors.append(inverted_list.vectors[row])
+        if not keys:
+            return []
+
+        scores = np.stack(vectors) @ query_vector
+        return [(keys[i], float(scores[i])) for i in top_k(scores, k)]
+
+
+def create_vector_index(backend: str = "exact", **options) -> VectorIndex:
+    """Create a vector index backend by name (``"exact"`` or ``"ivf"``)."""
+    if backend == "exact":
+        return ExactVectorIndex()
+    if backend == "ivf":
+        return IVFFlatIndex(**options)
+    raise ValueError(f"Unknown vector index backend: {backend}")
@@ -1,97 +1,653 @@
 """Vector search service for semantic search."""
 
-from typing import List, Dict, Any, Optional
-from pymongo import ASCENDING
-from app.database import init_db
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from bson import ObjectId
+from pymongo import ASCENDING, DeleteMany, IndexModel, UpdateOne
+from pymongo.errors import OperationFailure
+from app.config import settings
+from app.database import get_database
 from app.models.course import Course, Chapter
 from app.models.upload import Upload
-from app.services.genai_service import genai_service
+from app.services.embedding_service import embedding_service
+from app.services.text_chunker import TextChunker
+from app.services.vector_index import VectorIndex, create_vector_index, write_snapshot
+
+
+def content_hash(text: str) -> str:
+    """Hash chunk text to detect changes between indexing runs."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def diff_chunks(
+    existing: List[Dict[str, Any]],
+    chunks: List[Dict[str, Any]]
+) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]], List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]], List[Dict[str, Any]]]:
+    """Match freshly cut chunks against the stored chunks of a document.
+    
+    Returns ``(unchanged, changed, orphans)``. ``unchanged`` pairs each chunk
+    with the stored document holding the same content at that position,
+    ``changed`` pairs chunks with the stored document to overwrite (or None)
+    and ``orphans`` are stored documents that are no longer needed,
+    including duplicates left by older append-only indexing.
+    """
+    by_index = {}
+    orphans = []
+    for doc in existing:
+        chunk_index = doc.get("chunk_index")
+        if chunk_index is None or chunk_index in by_index or chunk_index >= len(chunks):
+            orphans.append(doc)
+        else:
+            by_index[chunk_index] = doc
+    
+    unchanged = []
+    changed = []
+    for chunk in chunks:
+        doc = by_index.get(chunk["chunk_index"])
+        if doc is not None and doc.get("content_hash") == chunk["content_hash"]:
+            unchanged.append((chunk, doc))
+        else:
+            changed.append((chunk, doc))
+    return unchanged, changed, orphans
 
 
 class VectorService:
-    """Service for vector search and semantic operations."""
+    """Service for vector search and semantic operations.
+    
+    Every process keeps its own in-memory index. Chunks written or deleted
+    by other processes (job workers, other API workers) are picked up
+    before searches: new and changed chunks by ``updated_at``, deletes by
+    the tombstones every delete leaves behind.
+    """
+    
+    # Catch-up queries reach this far behind the last one, so writes that
+    # committed late or carry a skewed clock are not missed
+    refresh_overlap = timedelta(minutes=5)
     
     def __init__(self):
         """Initialize vector service."""
         self.collection_name = "vector_embeddings"
+        self.tombstones_collection_name = "vector_tombstones"
+        self.chunker = TextChunker(
+            chunk_size=settings.vector_chunk_size,
+            overlap=settings.vector_chunk_overlap
+        )
+        self.index = self._create_index()
+        self._index_loaded = False
+        self._collection_indexes_ready = False
+        self._index_lock = asyncio.Lock()
+        # Held by index writers, and while the index is read in a worker
+        # thread (training, snapshots) so it does not change underneath
+        self._write_lock = asyncio.Lock()
+        self._changes_since_snapshot = 0
+        self._refresh_lock = asyncio.Lock()
+        self._refreshed_at = 0.0
+        self._synced_until: Optional[datetime] = None
+        # updated_at of recently applied chunks, so catch-ups skip them
+        self._applied: Dict[str, datetime] = {}
+    
+    @staticmethod
+    def _create_index() -> VectorIndex:
+        """Create the index backend selected in settings."""
+        if settings.vector_index_backend == "ivf":
+            return create_vector_index(
+                "ivf",
+                nlist=settings.vector_ivf_nlist,
+                nprobe=settings.vector_ivf_nprobe
+            )
+        return create_vector_index(settings.vector_index_backend)
+    
+    def _get_collection(self):
+        """Get the embeddings collection on the shared client."""
+        return get_database()[self.collection_name]
+    
+    def _get_tombstones(self):
+        """Get the collection of deleted chunk ids."""
+        return get_database()[self.tombstones_collection_name]
+    
+    async def _ensure_collection_indexes(self):
+        """Create the chunk key and partition indexes once per process.
+        
+        Duplicate ``(document_id, chunk_index)`` rows left by older
+        append-only indexing block the unique index, so they are removed
+        and creation is retried. On failure the next sync tries again.
+        """
+        if self._collection_indexes_ready:
+            return
+        
+        indexes = [
+            IndexModel(
+                [("document_id", ASCENDING), ("chunk_index", ASCENDING)],
+                unique=True,
+                name="document_chunk_unique"
+            ),
+            IndexModel([("owner_id", ASCENDING), ("document_type", ASCENDING)])
+        ]
+        collection = self._get_collection()
+        try:
+            await self._get_tombstones().create_indexes([
+                IndexModel(
+                    [("deleted_at", ASCENDING)],
+                    expireAfterSeconds=int(settings.vector_tombstone_ttl_hours * 3600)
+                )
+            ])
+            try:
+                await collection.create_indexes(indexes)
+            except OperationFailure as e:
+                if e.code != 11000:
+                    raise
+                removed = await self._remove_duplicate_chunks()
+                print(f"Removed {removed} duplicate vector chunks before creating the unique chunk index")
+                await collection.create_indexes(indexes)
+        except Exception as e:
+            print(
+                f"ERROR: could not create vector embedding indexes, "
+                f"chunk upserts are not protected by a unique key: {e}"
+            )
+            return
+        self._collection_indexes_ready = True
+    
+    async def _remove_duplicate_chunks(self) -> int:
+        """Keep only the most recently updated row of each (document_id, chunk_index)."""
+        collection = self._get_collection()
+        duplicates = collection.aggregate([
+            {"$sort": {"updated_at": -1}},
+            {"$group": {
+                "_id": {"document_id": "$document_id", "chunk_index": "$chunk_index"},
+                "ids": {"$push": "$_id"}
+            }},
+            {"$match": {"ids.1": {"$exists": True}}}
+        ], allowDiskUse=True)
+        stale = [key async for group in duplicates for key in group["ids"][1:]]
+        if not stale:
+            return 0
+        
+        removed = 0
+        for start in range(0, len(stale), 1000):
+            batch = stale[start:start + 1000]
+            await self._bury(batch)
+            result = await collection.delete_many({"_id": {"$in": batch}})
+            removed += result.deleted_count
+            if self._index_loaded:
+                async with self._write_lock:
+                    for key in batch:
+                        self.index.remove(str(key))
+        if self._index_loaded:
+            await self._index_changed(len(stale))
+        return removed
+    
+    @staticmethod
+    def _owner_id(document_type: str, document_id: str, metadata: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Resolve the partition owner of a document.
+        
+        Course descriptions and chapters are grouped under their course,
+        uploads under the user who uploaded them.
+        """
+        metadata = metadata or {}
+        if document_type == "course":
+            return document_id
+        if document_type == "chapter":
+            return metadata.get("course_id")
+        if document_type == "upload":
+            return metadata.get("user_id")
+        return None
+    
+    def _add_to_index(self, doc: Dict[str, Any]):
+        """Add a stored embedding document to the in-process index."""
+        owner_id = doc.get("owner_id") or self._owner_id(
+            doc["document_type"], doc["document_id"], doc.get("metadata")
+        )
+        self.index.add(
+            key=str(doc["_id"]),
+            embedding=doc["embedding"],
+            document_id=doc["document_id"],
+            document_type=doc["document_type"],
+            owner_id=owner_id
+        )
+    
+    async def _load_documents(self, search_filter: Dict[str, Any]) -> int:
+        """Stream matching embedding documents into the index."""
+        collection = self._get_collection()
+        cursor = collection.find(
+            {**search_filter, "embedding_model": embedding_service.model_key},
+            projection={
+                "document_id": 1,
+                "document_type": 1,
+                "owner_id": 1,
+                "embedding": 1,
+                "metadata": 1
+            }
+        )
+        count = 0
+        async for doc in cursor:
+            self._add_to_index(doc)
+            count += 1
+        return count
+    
+    async def _ensure_index_loaded(self):
+        """Load the index from its snapshot or from MongoDB once per process."""
+        if self._index_loaded:
+            return
+        
+        async with self._index_lock:
+            if self._index_loaded:
+                return
+            
+            load_started = datetime.utcnow()
+            snapshot_path = settings.vector_index_snapshot_path
+            restored = False
+            if snapshot_path and os.path.exists(snapshot_path):
+                try:
+                    await asyncio.to_thread(self.index.load, snapshot_path)
+                    restored = self.index.dimension in (None, embedding_service.dimension)
+                    if not restored:
+                        # Written for another embedding model
+                        self.index = self._create_index()
+                except Exception as e:
+                    print(f"Ignoring unreadable vector index snapshot: {e}")
+                    self.index = self._create_index()
+            
+            if restored:
+                # Catch up from the point the writing process had synced to;
+                # it may have missed writes of other processes before saving
+                synced_until = await asyncio.to_thread(self._snapshot_synced_until, snapshot_path)
+                if synced_until is None:
+                    changed = await self._reconcile_all(datetime.min)
+                elif load_started - synced_until >= timedelta(hours=settings.vector_tombstone_ttl_hours):
+                    changed = await self._reconcile_all(synced_until - self.refresh_overlap)
+                else:
+                    changed = await self._catch_up(synced_until - self.refresh_overlap)
+            else:
+                changed = await self._load_documents({})
+            
+            self._synced_until = load_started
+            self._refreshed_at = time.monotonic()
+            self._index_loaded = True
+            await self._train_index()
+            if changed:
+                await self.save_snapshot()
+    
+    async def _reconcile_all(self, updated_since: datetime) -> int:
+        """Bring the index in line with MongoDB by comparing every stored key.
+        
+        Used when tombstones of deletes made since the index was last in
+        sync may already have expired.
+        """
+        collection = self._get_collection()
+        stored_keys = set()
+        updated_keys = set()
+        async for doc in collection.find(
+            {"embedding_model": embedding_service.model_key},
+            projection={"_id": 1, "updated_at": 1}
+        ):
+            key = str(doc["_id"])
+            stored_keys.add(key)
+            if doc.get("updated_at") and doc["updated_at"] >= updated_since:
+                updated_keys.add(key)
+        
+        async with self._write_lock:
+            indexed_keys = self.index.keys()
+            for key in indexed_keys - stored_keys:
+                self.index.remove(key)
+        missing = [ObjectId(key) for key in (stored_keys - indexed_keys) | updated_keys]
+        changed = len(indexed_keys - stored_keys)
+        for start in range(0, len(missing), 1000):
+            async with self._write_lock:
+                changed += await self._load_documents({"_id": {"$in": missing[start:start + 1000]}})
+        return changed
+    
+    async def _catch_up(self, since: datetime) -> int:
+        """Apply chunks written and deleted by any process since ``since``."""
+        collection = self._get_collection()
+        updated = {}
+        async for doc in collection.find(
+            {"updated_at": {"$gte": since}, "embedding_model": embedding_service.model_key},
+            projection={"_id": 1, "updated_at": 1}
+        ):
+            key = str(doc["_id"])
+            if self._applied.get(key) != doc["updated_at"]:
+                updated[key] = doc["updated_at"]
+        deleted = [
+            str(doc["_id"])
+            async for doc in self._get_tombstones().find({"deleted_at": {"$gte": since}}, projection={"_id": 1})
+        ]
+        
+        changed = 0
+        keys = [ObjectId(key) for key in updated]
+        for start in range(0, len(keys), 1000):
+            async with self._write_lock:
+                changed += await self._load_documents({"_id": {"$in": keys[start:start + 1000]}})
+        async with self._write_lock:
+            # Deletes win over a chunk read just before it was deleted
+            changed += sum(1 for key in deleted if self.index.remove(key))
+        
+        self._applied.update(updated)
+        self._applied = {key: at for key, at in self._applied.items() if at >= since}
+        return changed
+    
+    async def _refresh_index(self):
+        """Pick up writes of other processes, at most every ``vector_index_refresh_seconds``."""
+        if time.monotonic() - self._refreshed_at < settings.vector_index_refresh_seconds:
+            return
+        
+        async with self._refresh_lock:
+            if time.monotonic() - self._refreshed_at < settings.vector_index_refresh_seconds:
+                return
+            await self._ensure_collection_indexes()
+            started = datetime.utcnow()
+            since = self._synced_until - self.refresh_overlap
+            if started - since >= timedelta(hours=settings.vector_tombstone_ttl_hours):
+                # Tombstones of deletes since the last sync may have expired
+                changed = await self._reconcile_all(since)
+            else:
+                changed = await self._catch_up(since)
+            self._synced_until = started
+            self._refreshed_at = time.monotonic()
+        
+        if changed:
+            await self._index_changed(changed)
+    
+    async def _index_changed(self, count: int = 1):
+        """Track index changes, retrain when needed and snapshot periodically."""
+        self._changes_since_snapshot += count
+        await self._train_index()
+        if self._changes_since_snapshot >= settings.vector_index_snapshot_interval:
+            await self.save_snapshot()
+    
+    async def _train_index(self):
+        """Retrain an approximate index in a worker thread once it has grown.
+        
+        Searches keep using the current layout meanwhile; writers wait.
+        """
+        if not self.index.needs_training:
+            return
+        
+        async with self._write_lock:
+            if not self.index.needs_training:
+                return
+            trained = await asyncio.to_thread(self.index.fit)
+            self.index.apply_training(trained)
+    
+    async def save_snapshot(self):
+        """Persist the index so other workers can start without rebuilding it."""
+        snapshot_path = settings.vector_index_snapshot_path
+        if not snapshot_path or not self._index_loaded:
+            return
+        
+        async with self._write_lock:
+            arrays = await asyncio.to_thread(self.index.snapshot)
+            arrays["synced_until"] = np.array((self._synced_until - datetime(1970, 1, 1)).total_seconds())
+        self._changes_since_snapshot = 0
+        try:
+            await asyncio.to_thread(write_snapshot, snapshot_path, arrays)
+        except Exception as e:
+            print(f"Failed to write vector index snapshot: {e}")
+    
+    @staticmethod
+    def _snapshot_synced_until(path: str) -> Optional[datetime]:
+        """Time up to which the process that wrote a snapshot had caught up."""
+        with np.load(path, allow_pickle=False) as arrays:
+            if "synced_until" not in arrays.files:
+                return None
+            return datetime(1970, 1, 1) + timedelta(seconds=float(arrays["synced_until"]))
     
     async def create_embedding(self, text: str) -> List[float]:
-        """Create embedding for text."""
+        """Create embedding for a query text."""
         try:
-            # For now, we'll use a simple text-based similarity
-            # In production, you'd use a proper embedding model
-            return await genai_service.generate_embeddings(text)
+            return await embedding_service.embed_query(text)
         except Exception as e:
             raise Exception(f"Failed to create embedding: {str(e)}")
     
-    async def store_document_embedding(
+    async def sync_document_chunks(
         self, 
         document_id: str, 
         document_type: str, 
         content: str,
         metadata: Optional[Dict[str, Any]] = None
-    ) -> bool:
-        """Store document embedding in vector database."""
+    ) -> int:
+        """Bring the stored chunks of a document in line with its content.
+        
+        Chunks whose content hash is unchanged are not re-embedded, changed
+        chunks are upserted and leftover chunks are deleted in one bulk
+        write. Returns the number of chunks that had to be embedded.
+        """
         try:
-            embedding = await self.create_embedding(content)
-            
-            # Store in MongoDB (you can replace this with a dedicated vector DB)
-            from app.database import init_db
-            from motor.motor_asyncio import AsyncIOMotorClient
-            from app.config import settings
-            
-            client = AsyncIOMotorClient(settings.mongodb_url)
-            db = client[settings.database_name]
-            collection = db[self.collection_name]
-            
-            document = {
-                "document_id": document_id,
-                "document_type": document_type,
-                "content": content,
-                "embedding": embedding,
-                "metadata": metadata or {}
+            await self._ensure_collection_indexes()
+            owner_id = self._owner_id(document_type, document_id, metadata)
+            metadata = metadata or {}
+            collection = self._get_collection()
+            
+            chunks = self.chunker.chunk_text(content or "")
+            for chunk in chunks:
+                chunk["content_hash"] = content_hash(chunk["text"])
+            
+            existing = await collection.find(
+                {"document_id": document_id},
+                projection={"embedding": 0, "content": 0}
+            ).to_list(None)
+            unchanged, changed, orphans = diff_chunks(existing, chunks)
+            
+            # Chunks embedded by another model or moved to another partition
+            # must be re-embedded or re-added to the index
+            model_key = embedding_service.model_key
+            for chunk, doc in list(unchanged):
+                if (
+                    doc.get("embedding_model") != model_key
+                    or doc.get("owner_id") != owner_id
+                    or doc.get("document_type") != document_type
+                ):
+                    unchanged.remove((chunk, doc))
+                    changed.append((chunk, doc))
+            
+            # Content that only moved to another position keeps its embedding
+            stored_hashes = {
+                doc["content_hash"]: doc["_id"]
+                for doc in existing
+                if doc.get("content_hash") and doc.get("embedding_model") == model_key
             }
+            reusable_ids = [
+                stored_hashes[chunk["content_hash"]]
+                for chunk, _ in changed
+                if chunk["content_hash"] in stored_hashes
+            ]
+            embeddings = {}
+            if reusable_ids:
+                async for doc in collection.find(
+                    {"_id": {"$in": reusable_ids}},
+                    projection={"content_hash": 1, "embedding": 1}
+                ):
+                    embeddings[doc["content_hash"]] = doc["embedding"]
             
-            await collection.insert_one(document)
-            return True
+            now = datetime.utcnow()
+            operations = []
+            if orphans:
+                # Deletes run first so upserts never match a duplicate
+                operations.append(DeleteMany({"_id": {"$in": [doc["_id"] for doc in orphans]}}))
+            
+            for chunk, doc in unchanged:
+                fields = {
+                    "start_pos": chunk["start_pos"],
+                    "end_pos": chunk["end_pos"],
+                    "metadata": metadata
+                }
+                if any(doc.get(name) != value for name, value in fields.items()):
+                    fields["updated_at"] = now
+                    operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+            
+            # Embed all new content in batched provider calls
+            pending = {}
+            for chunk, _ in changed:
+                if chunk["content_hash"] not in embeddings:
+                    pending.setdefault(chunk["content_hash"], chunk["text"])
+            if pending:
+                vectors = await embedding_service.embed_documents(list(pending.values()))
+                embeddings.update(zip(pending.keys(), vectors))
+            embedded = len(pending)
+            
+            upserts = []
+            for chunk, doc in changed:
+                embedding = embeddings[chunk["content_hash"]]
+                fields = {
+                    "document_id": document_id,
+                    "document_type": document_type,
+                    "owner_id": owner_id,
+                    "chunk_index": chunk["chunk_index"],
+                    "start_pos": chunk["start_pos"],
+                    "end_pos": chunk["end_pos"],
+                    "content": chunk["text"],
+                    "content_hash": chunk["content_hash"],
+                    "embedding": embedding,
+                    "embedding_model": model_key,
+                    "metadata": metadata,
+                    "updated_at": now
+                }
+                upserts.append((len(operations), doc, fields))
+                operations.append(UpdateOne(
+                    {"document_id": document_id, "chunk_index": chunk["chunk_index"]},
+                    {"$set": fields},
+                    upsert=True
+                ))
+            
+            if not operations:
+                return 0
+            
+            # Tombstones first: a crash in between leaves rows other processes
+            # no longer search, rather than deleted rows they still return
+            await self._bury([doc["_id"] for doc in orphans])
+            result = await collection.bulk_write(operations, ordered=True)
+            
+            if self._index_loaded:
+                # A concurrent sync of the same document may have inserted a
+                # chunk first; it then counts as matched, not upserted
+                keys = {
+                    position: doc["_id"] if doc is not None else result.upserted_ids.get(position)
+                    for position, doc, _ in upserts
+                }
+                unknown = [fields["chunk_index"] for position, _, fields in upserts if keys[position] is None]
+                if unknown:
+                    found = {
+                        doc["chunk_index"]: doc["_id"]
+                        async for doc in collection.find(
+                            {"document_id": document_id, "chunk_index": {"$in": unknown}},
+                            projection={"chunk_index": 1}
+                        )
+                    }
+                    for position, _, fields in upserts:
+                        if keys[position] is None:
+                            keys[position] = found.get(fields["chunk_index"])
+                
+                async with self._write_lock:
+                    for doc in orphans:
+                        self.index.remove(str(doc["_id"]))
+                    for position, _, fields in upserts:
+                        if keys[position] is not None:
+                            self._add_to_index({"_id": keys[position], **fields})
+                            # MongoDB stores milliseconds
+                            self._applied[str(keys[position])] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+                await self._index_changed(len(orphans) + len(upserts))
+            return embedded
         except Exception as e:
-            raise Exception(f"Failed to store embedding: {str(e)}")
+            raise Exception(f"Failed to sync document chunks: {str(e)}")
+    
+    async def _delete_embeddings(self, search_filter: Dict[str, Any]) -> int:
+        """Delete stored chunks matching a filter and drop them from the index."""
+        collection = self._get_collection()
+        keys = [doc["_id"] async for doc in collection.find(search_filter, projection={"_id": 1})]
+        if not keys:
+            return 0
+        
+        await self._bury(keys)
+        result = await collection.delete_many({"_id": {"$in": keys}})
+        if self._index_loaded:
+            async with self._write_lock:
+                for key in keys:
+                    self.index.remove(str(key))
+            await self._index_changed(len(keys))
+        return result.deleted_count
+    
+    async def _bury(self, keys: List[ObjectId]):
+        """Record deleted chunk ids so other processes drop them from their index."""
+        if not keys:
+            return
+        now = datetime.utcnow()
+        await self._get_tombstones().bulk_write(
+            [UpdateOne({"_id": key}, {"$set": {"deleted_at": now}}, upsert=True) for key in keys],
+            ordered=False
+        )
+    
+    async def delete_document_embeddings(self, document_id: str) -> int:
+        """Delete every stored chunk of a document."""
+        return await self._delete_embeddings({"document_id": document_id})
+    
+    async def delete_course_embeddings(self, course_id: str, keep: Optional[List[str]] = None) -> int:
+        """Delete the chunks of a course and its chapters, except documents in ``keep``."""
+        return await self._delete_embeddings({
+            "owner_id": course_id,
+            "document_type": {"$in": ["course", "chapter"]},
+            "document_id": {"$nin": keep or []}
+        })
+    
+    async def count_document_chunks(self, document_id: str) -> int:
+        """Count the stored chunks of a document."""
+        collection = self._get_collection()
+        return await collection.count_documents({"document_id": document_id})
     
     async def search_similar_documents(
         self, 
         query: str, 
         document_type: Optional[str] = None,
-        limit: int = 10
+        limit: int = 10,
+        owner_id: Optional[str] = None,
+        document_id: Optional[str] = None,
+        scopes: Optional[List[Dict[str, Optional[str]]]] = None
     ) -> List[Dict[str, Any]]:
-        """Search for similar documents using vector similarity."""
+        """Search for similar documents using vector similarity.
+        
+        ``scopes`` searches several ``document_type``/``owner_id``/``document_id``
+        filters at once and merges their hits; it replaces the single filter.
+        """
         try:
             query_embedding = await self.create_embedding(query)
+            await self._ensure_index_loaded()
+            await self._refresh_index()
             
-            # For now, we'll do a simple text search
-            # In production, you'd use proper vector similarity search
-            from app.database import init_db
-            from motor.motor_asyncio import AsyncIOMotorClient
-            from app.config import settings
-            
-            client = AsyncIOMotorClient(settings.mongodb_url)
-            db = client[settings.database_name]
-            collection = db[self.collection_name]
+            if scopes is None:
+                scopes = [{"document_type": document_type, "owner_id": owner_id, "document_id": document_id}]
+            scores = {}
+            for scope in scopes:
+                for key, score in self.index.search(query_embedding, k=limit, **scope):
+                    scores[key] = max(score, scores.get(key, score))
+            hits = sorted(scores.items(), key=lambda hit: hit[1], reverse=True)[:limit]
+            if not hits:
+                return []
             
-            # Simple text search for now
-            search_filter = {}
-            if document_type:
-                search_filter["document_type"] = document_type
+            # Only the top-k documents are fetched, without their embeddings
+            collection = self._get_collection()
+            cursor = collection.find(
+                {"_id": {"$in": [ObjectId(key) for key, _ in hits]}},
+                projection={"embedding": 0}
+            )
+            docs = {str(doc["_id"]): doc async for doc in cursor}
             
-            cursor = collection.find(search_filter).limit(limit)
             results = []
-            
-            async for doc in cursor:
+            for key, score in hits:
+                doc = docs.get(key)
+                if not doc:
+                    continue
                 results.append({
                     "document_id": doc["document_id"],
                     "document_type": doc["document_type"],
                     "content": doc["content"],
+                    "chunk_index": doc.get("chunk_index", 0),
+                    "start_pos": doc.get("start_pos", 0),
+                    "end_pos": doc.get("end_pos", len(doc["content"])),
                     "metadata": doc.get("metadata", {}),
-                    "similarity": 0.8  # Mock similarity score
+                    "similarity": score
                 })
             
             return results
@@ -106,38 +662,51 @@ class VectorService:
             if not course:
                 return False
             
-            chapters = await Chapter.find(Chapter.course_id == course_id).to_list()
+            chapters = await Chapter.find(Chapter.course_id == ObjectId(course_id)).to_list()
             
             # Index course description
-            if course.description:
-                await self.store_document_embedding(
-                    document_id=course_id,
-                    document_type="course",
-                    content=course.description,
-                    metadata={
-                        "title": course.title,
-                        "level": course.level,
-                        "tags": course.tags
-                    }
-                )
+            await self.sync_document_chunks(
+                document_id=course_id,
+                document_type="course",
+                content=course.description,
+                metadata={
+                    "title": course.title,
+                    "level": course.level,
+                    "tags": course.tags
+                }
+            )
             
             # Index chapters
             for chapter in chapters:
-                await self.store_document_embedding(
-                    document_id=str(chapter.id),
-                    document_type="chapter",
-                    content=chapter.content,
-                    metadata={
-                        "course_id": course_id,
-                        "title": chapter.title,
-                        "order": chapter.order
-                    }
-                )
+                await self.index_chapter_content(chapter)
+            
+            # Drop chunks of chapters deleted since the last run
+            await self.delete_course_embeddings(
+                course_id,
+                keep=[course_id] + [str(chapter.id) for chapter in chapters]
+            )
             
             return True
         except Exception as e:
             raise Exception(f"Failed to index course content: {str(e)}")
     
+    async def index_chapter_content(self, chapter: Chapter) -> bool:
+        """Index a single chapter for vector search."""
+        try:
+            await self.sync_document_chunks(
+                document_id=str(chapter.id),
+                document_type="chapter",
+                content=chapter.content,
+                metadata={
+                    "course_id": str(chapter.course_id),
+                    "title": chapter.title,
+                    "order": chapter.order
+                }
+            )
+            return True
+        except Exception as e:
+            raise Exception(f"Failed to index chapter content: {str(e)}")
+    
     async def index_upload_content(self, upload_id: str) -> bool:
         """Index uploaded file content for vector search."""
         try:
@@ -145,7 +714,7 @@ class VectorService:
             if not upload or not upload.extracted_text:
                 return False
             
-            await self.store_document_embedding(
+            await self.sync_document_chunks(
                 document_id=upload_id,
                 document_type="upload",
                 content=upload.extracted_text,
@@ -165,20 +734,28 @@ class VectorService:
         query: str, 
         course_id: Optional[str] = None,
         upload_id: Optional[str] = None,
-        limit: int = 5
+        limit: int = 5,
+        user_id: Optional[str] = None
     ) -> str:
-        """Get relevant context for a query."""
+        """Build prompt context from the top-scoring chunks for a query."""
         try:
             document_type = None
+            owner_id = None
+            document_id = None
             if course_id:
-                document_type = "course"
+                # Course description and chapters share the course partition
+                owner_id = course_id
             elif upload_id:
                 document_type = "upload"
+                owner_id = user_id
+                document_id = upload_id
             
             results = await self.search_similar_documents(
                 query=query,
                 document_type=document_type,
-                limit=limit
+                limit=limit,
+                owner_id=owner_id,
+                document_id=document_id
             )
             
             context_parts = []
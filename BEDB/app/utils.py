@@ -1,8 +1,10 @@
 """Utility functions for the application."""
 
+import asyncio
+import json
 from bson import ObjectId
-from typing import Union, Optional
-from fastapi import HTTPException, status
+from typing import Any, Awaitable, Union, Optional
+from fastapi import HTTPException, Request, status
 
 
 def validate_object_id(id_str: str, field_name: str = "ID") -> ObjectId:
@@ -45,3 +47,29 @@ def object_id_to_str(obj_id: Union[ObjectId, str, None]) -> Optional[str]:
         return obj_id
     
     return None
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[Any], poll_interval: float = 0.5) -> Any:
+    """Await a slow call, cancelling it if the client disconnects first."""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise HTTPException(
+                    status_code=499,
+                    detail="Client closed request"
+                )
+    finally:
+        if not task.done():
+            task.cancel()
+            # Let the provider call unwind before returning
+            await asyncio.gather(task, return_exceptions=True)
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Format a Server-Sent Events message with a JSON payload."""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
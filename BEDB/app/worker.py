@@ -0,0 +1,41 @@
+"""Standalone background job worker.
+
+Run with ``python -m app.worker`` and set ``JOB_WORKER_IN_PROCESS=False``
+on the API servers so only dedicated workers process jobs.
+"""
+
+import asyncio
+import signal
+
+from app.config import settings
+from app.database import init_db, close_db
+from app.services.file_service import file_service
+from app.services.job_queue import JobWorker, job_queue
+from app.services.vector_service import vector_service
+import app.services.upload_pipeline  # noqa: F401  (registers job handlers)
+
+
+async def run_worker():
+    """Process jobs until SIGINT or SIGTERM."""
+    await init_db()
+    worker = JobWorker(
+        job_queue,
+        concurrency=settings.job_worker_concurrency,
+        poll_interval=settings.job_poll_interval_seconds
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    print(f"👷 Worker {worker.worker_id} processing: {', '.join(job_queue.handlers)}")
+    try:
+        await worker.run()
+    finally:
+        file_service.shutdown()
+        await vector_service.save_snapshot()
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
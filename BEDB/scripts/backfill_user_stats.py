@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+User Stats Backfill for AI Learning Platform
+Tính lại document user_stats của mọi người dùng từ quiz_history và
+dashboard_progress (chạy một lần sau khi triển khai, hoặc khi số liệu bị lệch)
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, close_db
+from app.services.user_stats import user_stats_service
+
+
+async def main():
+    """Main function để chạy backfill"""
+    print("🚀 User Stats Backfill")
+    print("=" * 50)
+    print("⚠️  Nên chạy khi không có người dùng nộp quiz hoặc cập nhật tiến độ")
+
+    await init_db()
+    try:
+        started = time.perf_counter()
+        written = await user_stats_service.rebuild()
+        print(f"✅ Rebuilt stats for {written} users in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        print(f"\n❌ Error during backfill: {e}")
+        raise
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
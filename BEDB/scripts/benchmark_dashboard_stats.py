@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Dashboard Stats Benchmark for AI Learning Platform
+Đo số round trip tới MongoDB và độ trễ của /dashboard/stats trước (truy vấn
+theo từng khóa học, từng tuần) và sau (một aggregation) trên database riêng
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+import app.database
+from app.config import settings
+from app.database import get_database, close_db
+from app.services.user_stats import build_stats, user_stats_service
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Đếm số lệnh gửi tới MongoDB (mỗi lệnh là một round trip)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in ("endSessions", "ping", "hello", "isMaster"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def seed(num_courses: int, num_quizzes: int, seed_value: int = 0) -> ObjectId:
+    """Tạo một user với các khóa học, tiến độ và lịch sử quiz; trả về id của user"""
+    rng = random.Random(seed_value)
+    db = get_database()
+    for name in ["users", "courses", "dashboard_progress", "quiz_history", "user_stats"]:
+        await db[name].drop()
+
+    user_id = ObjectId()
+    await db["users"].insert_one({"_id": user_id, "name": "Bench User", "is_active": True})
+
+    courses = [{"_id": ObjectId(), "owner_id": user_id, "title": f"Course {i}", "outline": "x" * 2000} for i in range(num_courses)]
+    await db["courses"].insert_many(courses)
+
+    progress = [
+        {"user_id": user_id, "course_id": course["_id"], "chapter_id": ObjectId(),
+         "status": "completed" if rng.random() < 0.3 else "in_progress",
+         "progress": rng.uniform(0, 100), "time_spent": rng.randint(5, 90)}
+        for course in courses for _ in range(rng.randint(1, 8))
+    ]
+    await db["dashboard_progress"].insert_many(progress)
+
+    now = datetime.utcnow()
+    quizzes = [
+        {"user_id": user_id, "quiz_id": ObjectId(), "score": round(rng.uniform(20, 100), 1),
+         "taken_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 60))}
+        for _ in range(num_quizzes)
+    ]
+    await db["quiz_history"].insert_many(quizzes)
+
+    stats = build_stats(
+        [(quiz["score"], quiz["taken_at"]) for quiz in quizzes],
+        [(record["course_id"], record["status"] == "completed", record["time_spent"]) for record in progress]
+    )
+    await db["user_stats"].insert_one({"_id": user_id, **stats})
+
+    await db["courses"].create_index("owner_id")
+    await db["dashboard_progress"].create_index("user_id")
+    await db["dashboard_progress"].create_index("course_id")
+    await db["quiz_history"].create_index([("user_id", 1), ("taken_at", -1)])
+    return user_id
+
+
+async def legacy_dashboard_stats(user_id: ObjectId):
+    """Cách cũ của get_dashboard_stats: tải toàn bộ danh sách và truy vấn theo khóa học/tuần"""
+    db = get_database()
+    user_courses = await db["courses"].find({"owner_id": user_id}).to_list(length=None)
+    completed_progress = await db["dashboard_progress"].find({"user_id": user_id, "status": "completed"}).to_list(length=None)
+    quiz_history = await db["quiz_history"].find({"user_id": user_id}).to_list(length=None)
+    sum(q["score"] for q in quiz_history)
+    sum(p["time_spent"] for p in completed_progress)
+
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    await db["quiz_history"].find({"user_id": user_id, "taken_at": {"$gte": week_ago}}).sort("taken_at", -1).limit(10).to_list(length=None)
+
+    for course in user_courses:
+        await db["dashboard_progress"].find({"user_id": user_id, "course_id": course["_id"]}).to_list(length=None)
+
+    for i in range(4):
+        week_start = datetime.utcnow() - timedelta(weeks=i + 1)
+        week_end = datetime.utcnow() - timedelta(weeks=i)
+        await db["quiz_history"].find(
+            {"user_id": user_id, "taken_at": {"$gte": week_start, "$lt": week_end}}
+        ).to_list(length=None)
+
+
+async def measure(label: str, call, counter: CommandCounter, runs: int):
+    """Đo độ trễ và số round trip của mỗi lần gọi"""
+    timings: List[float] = []
+    trips = []
+    for _ in range(runs):
+        counter.count = 0
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+        trips.append(counter.count)
+    p50, p95 = np.percentile(timings, [50, 95])
+    print(f"   {label:<10} round trips={max(trips):4d}  p50={p50:8.2f}ms  p95={p95:8.2f}ms")
+
+
+async def main_async(args):
+    settings.database_name = args.database
+    counter = CommandCounter()
+    app.database._client = AsyncIOMotorClient(settings.mongodb_url, event_listeners=[counter])
+    try:
+        print(f"🌱 Seeding {args.courses} courses and {args.quizzes} quizzes into '{args.database}'...")
+        user_id = await seed(args.courses, args.quizzes)
+
+        print(f"\n📊 /dashboard/stats ({args.runs} runs)")
+        await measure("before", lambda: legacy_dashboard_stats(user_id), counter, args.runs)
+        await measure("after", lambda: user_stats_service.get_dashboard(user_id), counter, args.runs)
+
+        if args.drop:
+            await get_database().client.drop_database(args.database)
+            print(f"\n🗑️  Dropped '{args.database}'")
+    finally:
+        await close_db()
+
+
+def main():
+    """Main function để chạy benchmark"""
+    parser = argparse.ArgumentParser(description="Compare round trips and latency of the dashboard stats queries")
+    parser.add_argument("--database", default=f"{settings.database_name}_dashboard_bench")
+    parser.add_argument("--courses", type=int, default=50, help="Courses owned by the user")
+    parser.add_argument("--quizzes", type=int, default=2000, help="Quizzes taken by the user")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--drop", action="store_true", help="Drop the benchmark database afterwards")
+    args = parser.parse_args()
+
+    print("🚀 Dashboard Stats Benchmark")
+    print("=" * 50)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
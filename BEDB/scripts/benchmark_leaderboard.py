@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Benchmark for AI Learning Platform
+Sinh dữ liệu 100k người dùng trong một database riêng và so sánh bảng xếp
+hạng cũ (2 truy vấn mỗi người dùng) với aggregation trên user_stats
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+
+from app.config import settings
+from app.database import get_database, close_db
+from app.services.leaderboard import LeaderboardService
+from app.services.user_stats import build_stats
+
+
+async def seed(num_users: int, num_courses: int, quizzes_per_course: int, seed_value: int = 0):
+    """Tạo users, quizzes, quiz_history, dashboard_progress và user_stats"""
+    rng = random.Random(seed_value)
+    db = get_database()
+    for name in ["users", "quizzes", "quiz_history", "dashboard_progress", "user_stats"]:
+        await db[name].drop()
+
+    courses = [ObjectId() for _ in range(num_courses)]
+    quizzes = [(ObjectId(), course) for course in courses for _ in range(quizzes_per_course)]
+    await db["quizzes"].insert_many([{"_id": quiz, "course_id": course} for quiz, course in quizzes])
+
+    now = datetime.utcnow()
+    batch_size = 5000
+    for start in range(0, num_users, batch_size):
+        users, history, progress, stats = [], [], [], []
+        for i in range(start, min(start + batch_size, num_users)):
+            user_id = ObjectId()
+            users.append({"_id": user_id, "name": f"User {i}", "email": f"user{i}@bench.local", "is_active": rng.random() > 0.01})
+
+            taken = [(round(rng.uniform(20, 100), 1), now - timedelta(days=rng.randint(0, 60)), rng.choice(quizzes)[0])
+                     for _ in range(rng.randint(0, 6))]
+            history.extend({"user_id": user_id, "quiz_id": quiz, "score": score, "taken_at": at} for score, at, quiz in taken)
+
+            records = [(rng.choice(courses), rng.random() < 0.4, rng.randint(5, 120)) for _ in range(rng.randint(0, 4))]
+            progress.extend({"user_id": user_id, "course_id": course, "status": "completed" if done else "in_progress",
+                             "time_spent": minutes} for course, done, minutes in records)
+
+            if taken or records:
+                stats.append({"_id": user_id, **build_stats([(score, at) for score, at, _ in taken], records)})
+
+        await db["users"].insert_many(users)
+        for name, docs in [("quiz_history", history), ("dashboard_progress", progress), ("user_stats", stats)]:
+            if docs:
+                await db[name].insert_many(docs)
+
+    await db["users"].create_index("is_active")
+    await db["quiz_history"].create_index("user_id")
+    await db["quiz_history"].create_index("quiz_id")
+    await db["dashboard_progress"].create_index("user_id")
+    return courses
+
+
+async def legacy_leaderboard(sample: int) -> float:
+    """Cách cũ: tải mọi user rồi 2 truy vấn cho mỗi user; trả về thời gian cho ``sample`` user (ms)"""
+    db = get_database()
+    started = time.perf_counter()
+    users = await db["users"].find({"is_active": True}).limit(sample).to_list(length=None)
+    for user in users:
+        await db["quiz_history"].find({"user_id": user["_id"]}).to_list(length=None)
+        await db["dashboard_progress"].find({"user_id": user["_id"], "status": "completed"}).to_list(length=None)
+    return (time.perf_counter() - started) * 1000
+
+
+async def time_calls(call, runs: int) -> List[float]:
+    """Đo thời gian từng lần gọi (ms)"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(label: str, timings: List[float]):
+    """In kết quả p50/p95"""
+    p50, p95 = np.percentile(timings, [50, 95])
+    print(f"   {label:<32} p50={p50:9.2f}ms  p95={p95:9.2f}ms")
+
+
+async def main_async(args):
+    settings.database_name = args.database
+    try:
+        if not args.skip_seed:
+            print(f"🌱 Seeding {args.users} users into '{args.database}'...")
+            started = time.perf_counter()
+            courses = await seed(args.users, args.courses, args.quizzes_per_course)
+            print(f"✅ Seeded in {time.perf_counter() - started:.1f}s")
+        else:
+            courses = await get_database()["quizzes"].distinct("course_id")
+
+        active = await get_database()["users"].count_documents({"is_active": True})
+        print(f"\n📊 Leaderboard (limit={args.limit}, {active} active users)")
+
+        legacy_ms = await legacy_leaderboard(args.legacy_sample)
+        print(f"   {'legacy, ' + str(args.legacy_sample) + ' users':<32} {legacy_ms:9.2f}ms "
+              f"(≈{legacy_ms * active / args.legacy_sample / 1000:.1f}s for all, {2 * active + 1} round trips)")
+
+        uncached = LeaderboardService(ttl=-1)
+        report("aggregation (uncached)", await time_calls(lambda: uncached.get_leaderboard(args.limit), args.runs))
+        report("course aggregation (uncached)",
+               await time_calls(lambda: uncached.get_course_leaderboard(courses[0], args.limit), args.runs))
+
+        cached = LeaderboardService(ttl=60)
+        report("aggregation (cached)", await time_calls(lambda: cached.get_leaderboard(args.limit), args.runs))
+
+        if args.drop:
+            await get_database().client.drop_database(args.database)
+            print(f"\n🗑️  Dropped '{args.database}'")
+    finally:
+        await close_db()
+
+
+def main():
+    """Main function để chạy benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard queries against a seeded database")
+    parser.add_argument("--database", default=f"{settings.database_name}_leaderboard_bench")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--quizzes-per-course", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--legacy-sample", type=int, default=1000, help="Users timed for the per-user approach")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse an already seeded database")
+    parser.add_argument("--drop", action="store_true", help="Drop the benchmark database afterwards")
+    args = parser.parse_args()
+
+    print("🚀 Leaderboard Benchmark")
+    print("=" * 50)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
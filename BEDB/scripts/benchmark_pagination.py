@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Pagination Benchmark for AI Learning Platform
+So sánh độ trễ phân trang skip/limit với keyset (cursor) ở các độ sâu
+trang khác nhau trên một collection lớn trong database riêng
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+
+from app.config import settings
+from app.database import get_database, close_db
+from app.pagination import encode_cursor, keyset_filter, keyset_sort
+
+
+async def seed(num_messages: int) -> ObjectId:
+    """Tạo một phiên chat với ``num_messages`` tin nhắn; trả về id của phiên"""
+    collection = get_database()["chat_messages"]
+    await collection.drop()
+
+    session_id = ObjectId()
+    start = datetime.utcnow() - timedelta(days=30)
+    batch_size = 10000
+    for offset in range(0, num_messages, batch_size):
+        await collection.insert_many([
+            {
+                "session_id": session_id,
+                "sender": "user" if i % 2 == 0 else "assistant",
+                "message": f"Message {i} " + "lorem ipsum " * 20,
+                # Several messages share a timestamp, so ties are exercised
+                "created_at": start + timedelta(seconds=i // 3)
+            }
+            for i in range(offset, min(offset + batch_size, num_messages))
+        ])
+    await collection.create_index([("session_id", 1), ("created_at", 1), ("_id", 1)])
+    return session_id
+
+
+async def time_query(make_cursor, runs: int) -> List[float]:
+    """Đo thời gian của một truy vấn trang (ms)"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await make_cursor().to_list(length=None)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main_async(args):
+    settings.database_name = args.database
+    try:
+        print(f"🌱 Seeding {args.messages} chat messages into '{args.database}'...")
+        session_id = await seed(args.messages)
+        collection = get_database()["chat_messages"]
+        base = {"session_id": session_id}
+        sort = list(keyset_sort("created_at", descending=False).items())
+
+        print(f"\n📊 Page of {args.page_size} at depth (p50 over {args.runs} runs)")
+        print(f"   {'depth':>8}  {'skip/limit':>12}  {'keyset':>10}")
+        for depth in args.depths:
+            if depth >= args.messages:
+                continue
+
+            # Cursor of the row just before the page (not timed)
+            previous = await collection.find(base).sort(sort).skip(max(depth - 1, 0)).limit(1).to_list(length=1)
+            cursor = encode_cursor([previous[0]["created_at"], previous[0]["_id"]]) if depth else None
+            keyset = {**base, **keyset_filter("created_at", cursor, descending=False)}
+
+            skip_ms = await time_query(
+                lambda: collection.find(base).sort(sort).skip(depth).limit(args.page_size), args.runs
+            )
+            keyset_ms = await time_query(
+                lambda: collection.find(keyset).sort(sort).limit(args.page_size), args.runs
+            )
+            print(f"   {depth:>8}  {np.percentile(skip_ms, 50):>10.2f}ms  {np.percentile(keyset_ms, 50):>8.2f}ms")
+
+        if args.drop:
+            await get_database().client.drop_database(args.database)
+            print(f"\n🗑️  Dropped '{args.database}'")
+    finally:
+        await close_db()
+
+
+def main():
+    """Main function để chạy benchmark"""
+    parser = argparse.ArgumentParser(description="Compare skip/limit and keyset pagination at increasing page depths")
+    parser.add_argument("--database", default=f"{settings.database_name}_pagination_bench")
+    parser.add_argument("--messages", type=int, default=500_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1_000, 10_000, 100_000, 450_000])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--drop", action="store_true", help="Drop the benchmark database afterwards")
+    args = parser.parse_args()
+
+    print("🚀 Pagination Benchmark")
+    print("=" * 50)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
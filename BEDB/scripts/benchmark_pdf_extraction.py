@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+PDF Extraction Benchmark for AI Learning Platform
+Sinh các file PDF tổng hợp với số trang tăng dần và so sánh trích xuất
+tuần tự trên event loop với trích xuất song song theo trang trong process pool
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import tempfile
+import time
+from typing import List
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+
+from app.services.file_service import FileService
+
+WORDS = (
+    "algorithm data structure recursion complexity graph tree network learning "
+    "model function variable loop array memory process thread cache index query"
+).split()
+
+
+def build_pdf(num_pages: int, lines_per_page: int = 45) -> bytes:
+    """Tạo một file PDF có chữ thật trên mỗi trang (không cần thư viện ngoài)"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(num_pages):
+        lines = []
+        for line in range(lines_per_page):
+            words = [WORDS[(page * 7 + line * 3 + i) % len(WORDS)] for i in range(12)]
+            lines.append(f"Page {page + 1} line {line + 1}: {' '.join(words)}")
+        stream = "BT /F1 10 Tf 50 800 Td 14 TL " + " ".join(f"({text}) '" for text in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode("latin-1"))
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>".encode("latin-1")
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {num_pages} >>".encode("latin-1")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    output += b"".join(f"{offset:010d} 00000 n \n".encode("latin-1") for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(output)
+
+
+async def extract_inline(file_path: str) -> str:
+    """Cách cũ: trích xuất tuần tự trên event loop và nối chuỗi bằng +="""
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        text = ""
+        for page in reader.pages:
+            text += page.extract_text() + "\n"
+    return text.strip()
+
+
+async def heartbeat_lag(stop: asyncio.Event) -> float:
+    """Đo độ trễ lớn nhất của event loop (ms) trong khi trích xuất"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, (time.perf_counter() - started - 0.01) * 1000)
+    return worst
+
+
+async def measure(label: str, extraction) -> float:
+    """Chạy một lần trích xuất, in thời gian và độ trễ event loop"""
+    stop = asyncio.Event()
+    lag = asyncio.create_task(heartbeat_lag(stop))
+    await asyncio.sleep(0.02)
+    started = time.perf_counter()
+    text = await extraction()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    print(f"   {label:<10} {elapsed * 1000:9.1f}ms  loop lag max={await lag:8.1f}ms  chars={len(text)}")
+    return elapsed
+
+
+async def main_async(args):
+    """Chạy benchmark trên các PDF có kích thước tăng dần"""
+    service = FileService()
+    service.extraction_workers = args.workers
+    service.pdf_pages_per_task = args.pages_per_task
+    page_counts: List[int] = [int(n) for n in args.pages.split(",")]
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Warm up the pool so process start-up is not counted
+        warmup = os.path.join(directory, "warmup.pdf")
+        with open(warmup, "wb") as f:
+            f.write(build_pdf(1))
+        await service._extract_pdf_text(warmup)
+
+        for num_pages in page_counts:
+            path = os.path.join(directory, f"synthetic-{num_pages}.pdf")
+            with open(path, "wb") as f:
+                f.write(build_pdf(num_pages))
+            print(f"\n📄 {num_pages} pages ({os.path.getsize(path) / 1024:.0f} KB)")
+
+            inline = await measure("inline", lambda: extract_inline(path))
+            pooled = await measure("pool", lambda: service._extract_pdf_text(path))
+            print(f"   speedup    {inline / pooled:9.2f}x")
+
+    service.shutdown()
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction")
+    parser.add_argument("--pages", default="10,50,200,500", help="Comma separated page counts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--pages-per-task", type=int, default=25)
+    args = parser.parse_args()
+
+    print("🔮 AI Learning Platform PDF Extraction Benchmark")
+    print("=" * 50)
+    print(f"Workers: {args.workers}, pages per task: {args.pages_per_task}")
+    asyncio.run(main_async(args))
+    print("\n✅ Benchmark completed")
+
+
+if __name__ == "__main__":
+    main()
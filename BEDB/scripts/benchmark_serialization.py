@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark for AI Learning Platform
+So sánh thời gian tạo response JSON cho danh sách course/chat/quiz: đường cũ
+(model_validate + response_model + jsonable_encoder + json) với đường mới
+(trusted_response + orjson). Không cần kết nối MongoDB
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.models.chat import ChatMessage
+from app.models.course import Course, CourseLevel
+from app.models.quiz import QuizHistory
+from app.responses import ORJSONResponse, dump, trusted_response
+from app.schemas.chat import ChatMessageResponse
+from app.schemas.course import CourseResponse
+from app.schemas.quiz import QuizHistoryResponse
+
+
+def make_courses(n: int) -> List[Course]:
+    """Khóa học với outline dài như khi sinh từ prompt"""
+    now = datetime.utcnow()
+    return [
+        Course.model_construct(
+            id=ObjectId(), owner_id=ObjectId(), title=f"Course {i}",
+            description="An introduction to the topic " * 5,
+            outline="# Chapter\n" + "Lorem ipsum dolor sit amet. " * 150,
+            level=random.choice(list(CourseLevel)),
+            tags=["python", "ai", "data"], enrollment_count=random.randint(0, 500),
+            created_at=now - timedelta(hours=i), updated_at=now
+        )
+        for i in range(n)
+    ]
+
+
+def make_messages(n: int) -> List[ChatMessage]:
+    """Tin nhắn chat kèm câu trả lời và metadata nguồn"""
+    now, session_id = datetime.utcnow(), ObjectId()
+    return [
+        ChatMessage.model_construct(
+            id=ObjectId(), session_id=session_id, sender="user",
+            message=f"Question {i}: how does this work?",
+            answer="Here is a detailed explanation. " * 30,
+            metadata={"sources": [{"chunk_id": str(ObjectId()), "score": random.random()} for _ in range(3)]},
+            created_at=now + timedelta(seconds=i), updated_at=now
+        )
+        for i in range(n)
+    ]
+
+
+def make_history(n: int) -> List[QuizHistory]:
+    """Lịch sử làm quiz"""
+    now = datetime.utcnow()
+    return [
+        QuizHistory.model_construct(
+            id=ObjectId(), quiz_id=ObjectId(), user_id=ObjectId(),
+            score=random.uniform(0, 100), total_questions=10, correct_answers=random.randint(0, 10),
+            answers=[{"question_id": str(ObjectId()), "answer": random.randint(0, 3)} for _ in range(10)],
+            taken_at=now - timedelta(minutes=i), created_at=now, updated_at=now
+        )
+        for i in range(n)
+    ]
+
+
+async def validated_path(rows, schema, response_class) -> bytes:
+    """Đường cũ: validate từng dòng, rồi response_model validate lại và encode"""
+    field = create_model_field(name="Response", type_=List[schema], mode="serialization")
+    # model_validate needs str ids, so the rows go through a dump first
+    content = [schema.model_validate(dump(row, schema)) for row in rows]
+    return response_class(await serialize_response(field=field, response_content=content)).body
+
+
+async def trusted_path(rows, schema) -> bytes:
+    """Đường mới: dump document theo schema và render bằng orjson"""
+    return trusted_response(rows, schema).body
+
+
+async def measure(fn: Callable[[], Awaitable[bytes]], runs: int) -> List[float]:
+    """Đo thời gian (ms) của mỗi lần tạo body"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main_async(args):
+    payloads = [
+        ("courses", make_courses(args.rows), CourseResponse),
+        ("chat", make_messages(args.rows), ChatMessageResponse),
+        ("quiz history", make_history(args.rows), QuizHistoryResponse),
+    ]
+    paths = [
+        ("validate + json", lambda rows, schema: validated_path(rows, schema, JSONResponse)),
+        ("validate + orjson", lambda rows, schema: validated_path(rows, schema, ORJSONResponse)),
+        ("trusted + orjson", trusted_path),
+    ]
+
+    print(f"\n📊 {args.rows} rows per response (p50 / p99 over {args.runs} runs)")
+    for name, rows, schema in payloads:
+        size = len(trusted_response(rows, schema).body)
+        print(f"\n   {name} ({size / 1024:.0f} KB)")
+        baseline = None
+        for label, path in paths:
+            timings = await measure(lambda: path(rows, schema), args.runs)
+            p50 = np.percentile(timings, 50)
+            baseline = baseline or p50
+            print(f"   {label:>20}: {p50:>7.2f}ms / {np.percentile(timings, 99):>7.2f}ms  ({baseline / p50:.1f}x)")
+
+
+def main():
+    """Main function để chạy benchmark"""
+    parser = argparse.ArgumentParser(description="Compare validated and trusted JSON response paths")
+    parser.add_argument("--rows", type=int, default=100, help="Rows per list response")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    print("🚀 Serialization Benchmark")
+    print("=" * 50)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
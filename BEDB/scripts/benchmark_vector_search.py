@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Vector Search Benchmark for AI Learning Platform
+Đo độ trễ tìm kiếm vector trong bộ nhớ với 10k, 100k và 1M chunks,
+và recall@k của IVF index so với exact index
+"""
+
+import argparse
+import sys
+import os
+import time
+from typing import List
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.vector_index import ExactVectorIndex, IVFFlatIndex, VectorIndex
+
+
+def build_index(
+    index: VectorIndex,
+    num_chunks: int,
+    dimension: int,
+    num_owners: int,
+    seed: int = 0,
+    clusters: int = 0
+) -> VectorIndex:
+    """Thêm embeddings ngẫu nhiên vào index
+
+    Với ``clusters`` > 0 các vector được sinh quanh các tâm cụm, giống
+    embeddings thật hơn so với nhiễu Gaussian thuần.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension), dtype=np.float32) if clusters else None
+    batch_size = 10000
+
+    for start in range(0, num_chunks, batch_size):
+        vectors = rng.standard_normal((min(batch_size, num_chunks - start), dimension), dtype=np.float32)
+        if centers is not None:
+            vectors = centers[rng.integers(0, clusters, len(vectors))] + 0.5 * vectors
+        for offset, vector in enumerate(vectors):
+            i = start + offset
+            document_type = "upload" if i % 4 == 0 else "chapter"
+            index.add(
+                key=f"chunk-{i}",
+                embedding=vector,
+                document_id=f"doc-{i // 8}",
+                document_type=document_type,
+                owner_id=f"owner-{i % num_owners}"
+            )
+    return index
+
+
+def time_queries(index: VectorIndex, queries: np.ndarray, k: int, **filters) -> List[float]:
+    """Đo thời gian từng truy vấn (ms)"""
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, k=k, **filters)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def measure_recall(exact: VectorIndex, approximate: VectorIndex, queries: np.ndarray, k: int, **filters) -> float:
+    """Tỉ lệ kết quả exact top-k mà index xấp xỉ tìm lại được"""
+    found = 0
+    total = 0
+    for query in queries:
+        expected = {key for key, _ in exact.search(query, k=k, **filters)}
+        actual = {key for key, _ in approximate.search(query, k=k, **filters)}
+        found += len(expected & actual)
+        total += len(expected)
+    return found / total if total else 1.0
+
+
+def report(label: str, timings: List[float], recall: float = None):
+    """In kết quả p50/p95/p99"""
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    line = f"   {label:<28} p50={p50:8.3f}ms  p95={p95:8.3f}ms  p99={p99:8.3f}ms"
+    if recall is not None:
+        line += f"  recall@k={recall:.3f}"
+    print(line)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark the in-process vector indexes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--owners", type=int, default=200, help="Number of course/user partitions")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--backend", choices=["exact", "ivf", "both"], default="exact")
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--clusters", type=int, default=0, help="Generate clustered embeddings")
+    args = parser.parse_args()
+
+    print("🔮 AI Learning Platform Vector Search Benchmark")
+    print("=" * 50)
+
+    rng = np.random.default_rng(42)
+    filters = [
+        ("all documents", {}),
+        ("document_type=chapter", {"document_type": "chapter"}),
+        ("one owner partition", {"document_type": "chapter", "owner_id": "owner-1"}),
+    ]
+
+    for size in args.sizes:
+        matrix_mb = size * args.dimension * 4 / (1024 * 1024)
+        print(f"\n📦 {size:,} chunks x {args.dimension} dims (~{matrix_mb:,.0f} MB float32)")
+        queries = rng.standard_normal((args.queries, args.dimension), dtype=np.float32)
+
+        started = time.perf_counter()
+        exact = build_index(ExactVectorIndex(args.dimension), size, args.dimension, args.owners, clusters=args.clusters)
+        print(f"   exact build: {time.perf_counter() - started:.2f}s")
+
+        if args.backend in ("exact", "both"):
+            for label, search_filter in filters:
+                report(label, time_queries(exact, queries, args.top_k, **search_filter))
+
+        if args.backend in ("ivf", "both"):
+            started = time.perf_counter()
+            # Bulk load first and train once, as a snapshot restore would
+            ivf = IVFFlatIndex(args.dimension, nlist=args.nlist, nprobe=args.nprobe, auto_train=False)
+            build_index(ivf, size, args.dimension, args.owners, clusters=args.clusters)
+            ivf.train()
+            print(f"   ivf build (nlist={args.nlist}, nprobe={args.nprobe}): {time.perf_counter() - started:.2f}s")
+
+            for label, search_filter in filters:
+                report(
+                    f"ivf {label}",
+                    time_queries(ivf, queries, args.top_k, **search_filter),
+                    measure_recall(exact, ivf, queries, args.top_k, **search_filter)
+                )
+            del ivf
+
+        del exact
+
+    print("\n✅ Benchmark completed")
+
+
+if __name__ == "__main__":
+    main()
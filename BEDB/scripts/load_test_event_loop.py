@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Event Loop Load Test for AI Learning Platform
+Đo p99 latency của /health và /courses khi chat đang bị bão hòa,
+để kiểm tra các lời gọi Gemini không chặn event loop
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> Dict[str, str]:
+    """Đăng nhập và trả về header Authorization"""
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def probe(client: httpx.AsyncClient, path: str, headers: Dict[str, str], rate: float, stop: asyncio.Event) -> List[float]:
+    """Gọi một endpoint đều đặn và ghi lại latency (ms)"""
+    timings = []
+    interval = 1 / rate
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get(path, headers=headers)
+            timings.append((time.perf_counter() - started) * 1000)
+        except httpx.HTTPError:
+            timings.append(float("inf"))
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+    return timings
+
+
+async def chat_worker(client: httpx.AsyncClient, headers: Dict[str, str], stop: asyncio.Event, counters: Dict[str, int]):
+    """Gửi liên tục các câu hỏi chat để bão hòa Gemini"""
+    i = 0
+    while not stop.is_set():
+        i += 1
+        try:
+            response = await client.post(
+                "/api/v1/chat/",
+                params={"message": f"Explain recursion with example number {i}"},
+                headers=headers
+            )
+            counters["ok" if response.status_code == 200 else "failed"] += 1
+        except httpx.HTTPError:
+            counters["failed"] += 1
+
+
+async def run_phase(
+    client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    duration: float,
+    rate: float,
+    chat_concurrency: int
+) -> Dict[str, List[float]]:
+    """Chạy probes (và chat workers nếu có) trong ``duration`` giây"""
+    stop = asyncio.Event()
+    counters = {"ok": 0, "failed": 0}
+    probes = {
+        "/health": asyncio.create_task(probe(client, "/health", {}, rate, stop)),
+        "/api/v1/courses/": asyncio.create_task(probe(client, "/api/v1/courses/", headers, rate, stop)),
+    }
+    workers = [
+        asyncio.create_task(chat_worker(client, headers, stop, counters))
+        for _ in range(chat_concurrency)
+    ]
+
+    await asyncio.sleep(duration)
+    stop.set()
+    results = {path: await task for path, task in probes.items()}
+    # Do not wait for slow chat calls to finish
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+    if chat_concurrency:
+        print(f"   chat requests: {counters['ok']} ok, {counters['failed']} failed")
+    return results
+
+
+def report(label: str, results: Dict[str, List[float]]):
+    """In kết quả p50/p95/p99"""
+    print(f"\n📊 {label}")
+    for path, timings in results.items():
+        finite = [t for t in timings if t != float("inf")]
+        if not finite:
+            print(f"   {path:<20} no successful requests")
+            continue
+        p50, p95, p99 = np.percentile(finite, [50, 95, 99])
+        errors = len(timings) - len(finite)
+        print(f"   {path:<20} n={len(timings):5d}  p50={p50:8.2f}ms  p95={p95:8.2f}ms  p99={p99:8.2f}ms  errors={errors}")
+
+
+async def main_async(args):
+    """Chạy baseline rồi chạy lại khi chat bão hòa"""
+    limits = httpx.Limits(max_connections=args.chat_concurrency + 20)
+    timeout = httpx.Timeout(args.request_timeout)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        headers = await login(client, args.email, args.password)
+
+        print(f"⏱️  Baseline: {args.duration}s without chat load")
+        baseline = await run_phase(client, headers, args.duration, args.rate, 0)
+
+        print(f"🔥 Saturated: {args.duration}s with {args.chat_concurrency} concurrent chat clients")
+        saturated = await run_phase(client, headers, args.duration, args.rate, args.chat_concurrency)
+
+    report("Baseline", baseline)
+    report("Chat saturated", saturated)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Check that LLM calls do not block unrelated endpoints")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True, help="Account used for authenticated endpoints")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per phase")
+    parser.add_argument("--rate", type=float, default=20, help="Probe requests per second per endpoint")
+    parser.add_argument("--chat-concurrency", type=int, default=64)
+    parser.add_argument("--request-timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    print("🔮 AI Learning Platform Event Loop Load Test")
+    print("=" * 50)
+    asyncio.run(main_async(args))
+    print("\n✅ Load test completed")
+
+
+if __name__ == "__main__":
+    main()
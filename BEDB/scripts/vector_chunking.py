@@ -8,7 +8,6 @@ import asyncio
 import sys
 import os
 from typing import List, Dict, Any, Optional
-import re
 from datetime import datetime
 import hashlib
 
@@ -16,134 +15,24 @@ import hashlib
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from motor.motor_asyncio import AsyncIOMotorClient
-import google.generativeai as genai
 from app.config import settings
+from app.services.embedding_service import EmbeddingService, embedding_service
+from app.services.text_chunker import TextChunker
 
-class TextChunker:
-    """Class để chia văn bản thành chunks tối ưu"""
-    
-    def __init__(self, chunk_size: int = 1000, overlap: int = 200):
-        self.chunk_size = chunk_size
-        self.overlap = overlap
-        
-    def clean_text(self, text: str) -> str:
-        """Làm sạch văn bản"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s\.,!?;:()\-\'""]', ' ', text)
-        return text.strip()
-        
-    def split_by_sentences(self, text: str) -> List[str]:
-        """Chia văn bản theo câu"""
-        # Simple sentence splitting
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if s.strip()]
-        
-    def chunk_text(self, text: str, metadata: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Chia văn bản thành chunks với metadata"""
-        if not text or len(text.strip()) == 0:
-            return []
-            
-        text = self.clean_text(text)
-        chunks = []
-        
-        # Nếu text ngắn hơn chunk_size, trả về toàn bộ
-        if len(text) <= self.chunk_size:
-            chunks.append({
-                'text': text,
-                'chunk_index': 0,
-                'start_pos': 0,
-                'end_pos': len(text),
-                'word_count': len(text.split()),
-                'metadata': metadata or {}
-            })
-            return chunks
-            
-        # Chia theo câu để tránh cắt giữa câu
-        sentences = self.split_by_sentences(text)
-        
-        current_chunk = ""
-        current_start = 0
-        chunk_index = 0
-        
-        for sentence in sentences:
-            # Nếu thêm câu này vào chunk hiện tại vẫn < chunk_size
-            if len(current_chunk + sentence) <= self.chunk_size:
-                current_chunk += sentence + ". "
-            else:
-                # Lưu chunk hiện tại
-                if current_chunk:
-                    chunks.append({
-                        'text': current_chunk.strip(),
-                        'chunk_index': chunk_index,
-                        'start_pos': current_start,
-                        'end_pos': current_start + len(current_chunk),
-                        'word_count': len(current_chunk.split()),
-                        'metadata': metadata or {}
-                    })
-                    
-                    # Tạo overlap với chunk trước
-                    if self.overlap > 0 and chunk_index > 0:
-                        overlap_text = current_chunk[-self.overlap:] if len(current_chunk) > self.overlap else current_chunk
-                        current_chunk = overlap_text + sentence + ". "
-                    else:
-                        current_chunk = sentence + ". "
-                        
-                    current_start += len(current_chunk) - self.overlap if chunk_index > 0 else 0
-                    chunk_index += 1
-                else:
-                    current_chunk = sentence + ". "
-                    
-        # Thêm chunk cuối cùng
-        if current_chunk:
-            chunks.append({
-                'text': current_chunk.strip(),
-                'chunk_index': chunk_index,
-                'start_pos': current_start,
-                'end_pos': current_start + len(current_chunk),
-                'word_count': len(current_chunk.split()),
-                'metadata': metadata or {}
-            })
-            
-        return chunks
 
 class EmbeddingGenerator:
     """Class để tạo embeddings từ text chunks"""
     
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or settings.google_api_key
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
+    def __init__(self, service: EmbeddingService = None):
+        self.service = service or embedding_service
             
     async def generate_embedding(self, text: str) -> List[float]:
         """Tạo embedding vector từ text"""
-        try:
-            if not self.api_key:
-                # Return dummy embedding for testing
-                return [0.1] * 768
-                
-            # Use Google's embedding model
-            model = 'models/embedding-001'
-            result = genai.embed_content(
-                model=model,
-                content=text,
-                task_type="retrieval_document"
-            )
-            return result['embedding']
-            
-        except Exception as e:
-            print(f"⚠️  Error generating embedding: {e}")
-            # Return dummy embedding as fallback
-            return [0.1] * 768
+        return await self.service.embed_query(text)
             
     async def batch_generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Tạo embeddings cho nhiều texts cùng lúc"""
-        embeddings = []
-        for text in texts:
-            embedding = await self.generate_embedding(text)
-            embeddings.append(embedding)
-        return embeddings
+        """Tạo embeddings cho nhiều texts cùng lúc (mỗi lần gọi API gửi nhiều texts)"""
+        return await self.service.embed_documents(texts)
 
 class VectorProcessor:
     """Main class để xử lý vector cho toàn hệ thống"""
@@ -199,8 +88,8 @@ class VectorProcessor:
         
         # Generate embeddings
         processed_count = 0
-        for chunk in chunks:
-            embedding = await self.embedding_generator.generate_embedding(chunk['text'])
+        embeddings = await self.embedding_generator.batch_generate_embeddings([chunk['text'] for chunk in chunks])
+        for chunk, embedding in zip(chunks, embeddings):
             
             # Create embedding document
             embedding_doc = {
@@ -260,8 +149,8 @@ class VectorProcessor:
         
         # Generate embeddings
         processed_count = 0
-        for chunk in chunks:
-            embedding = await self.embedding_generator.generate_embedding(chunk['text'])
+        embeddings = await self.embedding_generator.batch_generate_embeddings([chunk['text'] for chunk in chunks])
+        for chunk, embedding in zip(chunks, embeddings):
             
             embedding_doc = {
                 'source_id': str(upload_id),
@@ -0,0 +1,292 @@
+"""
+Tests for content-hash diffing of document chunks
+"""
+import pytest
+from types import SimpleNamespace
+from bson import ObjectId
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import OperationFailure
+from app.config import settings
+from app.services import vector_service as vector_service_module
+from app.services.embedding_service import EmbeddingCache, EmbeddingService, HashingEmbedder
+from app.services.vector_service import VectorService, content_hash, diff_chunks
+
+
+def _chunks(*texts):
+    return [
+        {"text": text, "chunk_index": i, "content_hash": content_hash(text)}
+        for i, text in enumerate(texts)
+    ]
+
+
+def _stored(*texts):
+    return [
+        {"_id": f"id{i}", "chunk_index": i, "content_hash": content_hash(text)}
+        for i, text in enumerate(texts)
+    ]
+
+
+class TestDiffChunks:
+    """Test diff_chunks"""
+
+    def test_unchanged_document(self):
+        """Test that identical content needs no new embeddings"""
+        unchanged, changed, orphans = diff_chunks(_stored("a", "b"), _chunks("a", "b"))
+
+        assert [doc["_id"] for _, doc in unchanged] == ["id0", "id1"]
+        assert changed == []
+        assert orphans == []
+
+    def test_edited_chunk(self):
+        """Test that only the edited chunk is re-embedded"""
+        unchanged, changed, orphans = diff_chunks(_stored("a", "b", "c"), _chunks("a", "B", "c"))
+
+        assert len(unchanged) == 2
+        assert [(chunk["text"], doc["_id"]) for chunk, doc in changed] == [("B", "id1")]
+        assert orphans == []
+
+    def test_shorter_and_longer_documents(self):
+        """Test that removed chunks become orphans and new ones are inserted"""
+        _, changed, orphans = diff_chunks(_stored("a", "b", "c"), _chunks("a"))
+        assert changed == []
+        assert [doc["_id"] for doc in orphans] == ["id1", "id2"]
+
+        _, changed, orphans = diff_chunks(_stored("a"), _chunks("a", "b"))
+        assert [(chunk["text"], doc) for chunk, doc in changed] == [("b", None)]
+        assert orphans == []
+
+    def test_legacy_duplicates_are_orphans(self):
+        """Test that append-only duplicates and unchunked documents are removed"""
+        stored = _stored("a") + [
+            {"_id": "dup", "chunk_index": 0, "content_hash": content_hash("a")},
+            {"_id": "legacy"}
+        ]
+
+        unchanged, changed, orphans = diff_chunks(stored, _chunks("a"))
+
+        assert [doc["_id"] for _, doc in unchanged] == ["id0"]
+        assert {doc["_id"] for doc in orphans} == {"dup", "legacy"}
+
+
+class IndexCollection:
+    """Embeddings collection whose unique index fails until duplicates are gone"""
+
+    def __init__(self, groups, error_code=11000):
+        self.groups = groups
+        self.error_code = error_code
+        self.deleted = []
+        self.attempts = 0
+
+    async def create_indexes(self, indexes):
+        self.attempts += 1
+        if any(len(group["ids"]) > 1 for group in self.groups):
+            raise OperationFailure("E11000 duplicate key error", code=self.error_code)
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        async def groups():
+            for group in self.groups:
+                if len(group["ids"]) > 1:
+                    yield group
+        return groups()
+
+    async def delete_many(self, query):
+        ids = query["_id"]["$in"]
+        self.deleted += ids
+        for group in self.groups:
+            group["ids"] = [key for key in group["ids"] if key not in ids]
+        return SimpleNamespace(deleted_count=len(ids))
+
+
+class TestCollectionIndexes:
+    """Test creating the unique chunk index"""
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_removed_and_creation_retried(self, monkeypatch):
+        """Test that legacy duplicates keep only the newest row"""
+        collection = IndexCollection([{"ids": ["new", "old", "older"]}, {"ids": ["single"]}])
+        service = VectorService()
+        monkeypatch.setattr(service, "_get_collection", lambda: collection)
+        monkeypatch.setattr(service, "_get_tombstones", lambda: MemoryCollection())
+
+        await service._ensure_collection_indexes()
+
+        assert collection.deleted == ["old", "older"]
+        assert collection.attempts == 2
+        assert service._collection_indexes_ready
+
+    @pytest.mark.asyncio
+    async def test_failure_is_retried_later(self, monkeypatch):
+        """Test that a failed creation does not mark the indexes as ready"""
+        collection = IndexCollection([{"ids": ["a", "b"]}], error_code=8000)
+        service = VectorService()
+        monkeypatch.setattr(service, "_get_collection", lambda: collection)
+        monkeypatch.setattr(service, "_get_tombstones", lambda: MemoryCollection())
+
+        await service._ensure_collection_indexes()
+        await service._ensure_collection_indexes()
+
+        assert not service._collection_indexes_ready
+        assert collection.attempts == 2
+        assert collection.deleted == []
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$nin" in condition and value in condition["$nin"]:
+                return False
+            if "$gte" in condition and (value is None or value < condition["$gte"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class MemoryCollection:
+    """Embeddings collection kept in a dict, shared by several services"""
+
+    def __init__(self):
+        self.docs = {}
+        self.before_write = None
+
+    async def create_indexes(self, indexes):
+        pass
+
+    def find(self, query, projection=None):
+        docs = [dict(doc) for doc in self.docs.values() if _matches(doc, query)]
+
+        class Cursor:
+            def __aiter__(self):
+                async def iterate():
+                    for doc in docs:
+                        yield doc
+                return iterate()
+
+            async def to_list(self, length=None):
+                return docs
+
+        return Cursor()
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.before_write:
+            self.before_write()
+        upserted_ids = {}
+        for position, operation in enumerate(operations):
+            if isinstance(operation, DeleteMany):
+                await self.delete_many(operation._filter)
+                continue
+            matched = [doc for doc in self.docs.values() if _matches(doc, operation._filter)]
+            if matched:
+                matched[0].update(operation._doc["$set"])
+            elif operation._upsert:
+                key = ObjectId()
+                self.docs[key] = {"_id": key, **operation._filter, **operation._doc["$set"]}
+                upserted_ids[position] = key
+        return SimpleNamespace(upserted_ids=upserted_ids)
+
+    async def delete_many(self, query):
+        keys = [key for key, doc in self.docs.items() if _matches(doc, query)]
+        for key in keys:
+            del self.docs[key]
+        return SimpleNamespace(deleted_count=len(keys))
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    """A collection shared by services and an offline embedder"""
+    collection = MemoryCollection()
+    tombstones = MemoryCollection()
+    monkeypatch.setattr(settings, "vector_index_snapshot_path", None)
+    monkeypatch.setattr(
+        vector_service_module, "embedding_service",
+        EmbeddingService(HashingEmbedder(dimension=32), cache=EmbeddingCache(collection_name=None))
+    )
+
+    def service():
+        instance = VectorService()
+        monkeypatch.setattr(instance, "_get_collection", lambda: collection)
+        monkeypatch.setattr(instance, "_get_tombstones", lambda: tombstones)
+        return instance
+
+    return SimpleNamespace(collection=collection, tombstones=tombstones, service=service)
+
+
+class TestSyncDocumentChunks:
+    """Test writing chunks and keeping the index in step"""
+
+    @pytest.mark.asyncio
+    async def test_chunk_inserted_by_concurrent_sync(self, shared):
+        """Test that a chunk upserted first by another sync is still indexed"""
+        service = shared.service()
+        await service._ensure_index_loaded()
+
+        def concurrent_insert():
+            key = ObjectId()
+            shared.collection.docs[key] = {"_id": key, "document_id": "doc", "chunk_index": 0}
+        shared.collection.before_write = concurrent_insert
+
+        await service.sync_document_chunks("doc", "upload", "Loops repeat code.", {"user_id": "u1"})
+
+        (key,) = shared.collection.docs
+        assert service.index.keys() == {str(key)}
+
+
+class TestCrossProcessIndex:
+    """Test that each process's index sees writes made by the others"""
+
+    @pytest.mark.asyncio
+    async def test_chunks_written_elsewhere_are_found(self, shared, monkeypatch):
+        """Test that a search picks up chunks another service wrote and deleted"""
+        monkeypatch.setattr(settings, "vector_index_refresh_seconds", 0)
+        api, worker = shared.service(), shared.service()
+        await api._ensure_index_loaded()
+        await worker._ensure_index_loaded()
+
+        await worker.sync_document_chunks("doc", "upload", "Loops repeat code.", {"user_id": "u1"})
+        results = await api.search_similar_documents("loops", owner_id="u1")
+        assert [result["document_id"] for result in results] == ["doc"]
+
+        await worker.delete_document_embeddings("doc")
+        assert await api.search_similar_documents("loops", owner_id="u1") == []
+        assert len(api.index) == 0
+
+    @pytest.mark.asyncio
+    async def test_refresh_is_rate_limited(self, shared, monkeypatch):
+        """Test that searches within the refresh interval do not query MongoDB again"""
+        monkeypatch.setattr(settings, "vector_index_refresh_seconds", 60)
+        api, worker = shared.service(), shared.service()
+        await api._ensure_index_loaded()
+
+        await worker.sync_document_chunks("doc", "upload", "Loops repeat code.", {"user_id": "u1"})
+
+        assert await api.search_similar_documents("loops", owner_id="u1") == []
+
+    @pytest.mark.asyncio
+    async def test_ivf_snapshot_catches_up_with_later_writes(self, shared, monkeypatch, tmp_path):
+        """Test that a restored IVF snapshot picks up chunks written after it was saved"""
+        monkeypatch.setattr(settings, "vector_index_backend", "ivf")
+        monkeypatch.setattr(settings, "vector_ivf_nlist", 2)
+        monkeypatch.setattr(settings, "vector_ivf_nprobe", 1)
+        monkeypatch.setattr(settings, "vector_index_snapshot_path", str(tmp_path / "index.npz"))
+        monkeypatch.setattr(settings, "vector_index_refresh_seconds", 0)
+
+        worker = shared.service()
+        await worker._ensure_index_loaded()
+        await worker.sync_document_chunks("old", "upload", "Variables hold values.", {"user_id": "u1"})
+        await worker.save_snapshot()
+
+        # Written after the snapshot, while the API process starts from it
+        await worker.sync_document_chunks("new", "upload", "Loops repeat code.", {"user_id": "u1"})
+        await worker.delete_document_embeddings("old")
+        api = shared.service()
+        await api._ensure_index_loaded()
+        assert {key for key in api.index.keys()} == {str(key) for key in shared.collection.docs}
+
+        # Written after the API process loaded
+        await worker.sync_document_chunks("later", "upload", "Functions group code.", {"user_id": "u1"})
+        results = await api.search_similar_documents("functions", owner_id="u1", limit=5)
+
+        assert {result["document_id"] for result in results} == {"new", "later"}
@@ -0,0 +1,56 @@
+"""
+Tests for projected course and chapter list items
+"""
+from datetime import datetime
+from bson import ObjectId
+from beanie.odm.utils.projection import get_projection
+from fastapi.encoders import jsonable_encoder
+from app.pagination import decode_cursor, next_cursor
+from app.schemas.course import CourseSummary, ChapterSummary
+
+
+class TestCourseSummary:
+    """Test the course list item projection"""
+
+    def test_projection_skips_large_fields(self):
+        """Test that outline, description and content are not fetched"""
+        course_fields = set(get_projection(CourseSummary))
+        chapter_fields = set(get_projection(ChapterSummary))
+
+        assert course_fields.isdisjoint({"outline", "description", "source"})
+        assert chapter_fields == {"_id", "title", "order"}
+
+    def test_serialized_fields(self):
+        """Test that a projected document serializes to the list fields only"""
+        course_id = ObjectId()
+        summary = CourseSummary.model_validate({
+            "_id": course_id,
+            "title": "Python",
+            "level": "beginner",
+            "tags": ["python"],
+            "enrollment_count": 3,
+            "created_at": datetime(2026, 10, 18)
+        })
+
+        assert jsonable_encoder(summary) == {
+            "id": str(course_id),
+            "title": "Python",
+            "level": "beginner",
+            "tags": ["python"],
+            "enrollment_count": 3
+        }
+
+    def test_cursor_from_summary(self):
+        """Test that the next-page cursor is built from the projected sort key"""
+        rows = [
+            CourseSummary.model_validate({"_id": ObjectId(), "title": "C", "level": "advanced", "created_at": datetime(2026, 10, i + 1)})
+            for i in range(2)
+        ]
+
+        assert decode_cursor(next_cursor(rows, "created_at", 2)) == [rows[-1].created_at, rows[-1].id]
+
+    def test_chapter_summary_from_raw_document(self):
+        """Test that a projected chapter validates without content"""
+        chapter = ChapterSummary.model_validate({"_id": ObjectId(), "title": "Intro", "order": 1})
+
+        assert set(jsonable_encoder(chapter)) == {"id", "title", "order"}
@@ -0,0 +1,201 @@
+"""
+Tests for embedding batching and the offline embedder
+"""
+import asyncio
+import numpy as np
+import pytest
+from app.services.embedding_service import Embedder, EmbeddingBatcher, EmbeddingCache, EmbeddingService, HashingEmbedder
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing embedder that records every provider call"""
+
+    def __init__(self, dimension=64):
+        super().__init__(dimension)
+        self.calls = []
+
+    async def embed_batch(self, texts, task_type="retrieval_document"):
+        self.calls.append(list(texts))
+        return await super().embed_batch(texts, task_type)
+
+
+class FailingEmbedder(HashingEmbedder):
+    """Embedder whose provider call always fails"""
+
+    async def embed_batch(self, texts, task_type="retrieval_document"):
+        raise RuntimeError("provider unavailable")
+
+
+class TestHashingEmbedder:
+    """Test HashingEmbedder"""
+
+    def test_deterministic_and_normalized(self):
+        """Test that the same text always gives the same unit vector"""
+        embedder = HashingEmbedder(128)
+
+        first = embedder.embed_text("What is a variable?")
+        second = HashingEmbedder(128).embed_text("What is a variable?")
+
+        assert first == second
+        assert len(first) == 128
+        assert np.linalg.norm(first) == pytest.approx(1.0)
+
+    def test_shared_words_are_similar(self):
+        """Test that related texts score higher than unrelated ones"""
+        embedder = HashingEmbedder(256)
+        query = np.array(embedder.embed_text("python variables store values"))
+        related = np.array(embedder.embed_text("variables in python store values in memory"))
+        unrelated = np.array(embedder.embed_text("the recipe needs two eggs and flour"))
+
+        assert query @ related > query @ unrelated
+
+    def test_incomplete_provider_fails_at_construction(self):
+        """Test that a provider without embed_batch cannot be instantiated"""
+        class Incomplete(Embedder):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete(8)
+
+
+class TestEmbeddingBatcher:
+    """Test EmbeddingBatcher"""
+
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_requests(self):
+        """Test that concurrent queries share one provider call"""
+        embedder = CountingEmbedder()
+        batcher = EmbeddingBatcher(embedder, window=0.01, max_batch_size=100)
+
+        texts = [f"question {i}" for i in range(10)] + ["question 0"]
+        results = await asyncio.gather(*(batcher.embed(text) for text in texts))
+
+        assert len(embedder.calls) == 1
+        assert len(embedder.calls[0]) == 10
+        assert results[0] == results[-1] == embedder.embed_text("question 0")
+
+    @pytest.mark.asyncio
+    async def test_max_batch_size(self):
+        """Test that a full batch is sent without waiting for the window"""
+        embedder = CountingEmbedder()
+        batcher = EmbeddingBatcher(embedder, window=10, max_batch_size=4)
+
+        await asyncio.wait_for(
+            asyncio.gather(*(batcher.embed(f"text {i}") for i in range(8))),
+            timeout=1
+        )
+
+        assert [len(call) for call in embedder.calls] == [4, 4]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test that a failed provider call fails all waiting callers"""
+        batcher = EmbeddingBatcher(FailingEmbedder(16), window=0.001)
+
+        results = await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+
+class TestEmbeddingService:
+    """Test EmbeddingService"""
+
+    @pytest.mark.asyncio
+    async def test_embed_documents_in_batches(self):
+        """Test that documents are split by the maximum batch size"""
+        embedder = CountingEmbedder()
+        service = EmbeddingService(embedder, cache=EmbeddingCache(collection_name=None))
+        service.max_batch_size = 3
+
+        embeddings = await service.embed_documents([f"chunk {i}" for i in range(7)])
+
+        assert len(embeddings) == 7
+        assert [len(call) for call in embedder.calls] == [3, 3, 1]
+        assert service.model_name == "local-hashing-v1"
+
+
+class TestEmbeddingCache:
+    """Test EmbeddingCache"""
+
+    def _service(self, embedder, max_bytes=1024 * 1024):
+        return EmbeddingService(embedder, cache=EmbeddingCache(max_bytes=max_bytes, collection_name=None))
+
+    @pytest.mark.asyncio
+    async def test_repeated_queries_hit_memory(self):
+        """Test that an identical query is embedded only once"""
+        embedder = CountingEmbedder()
+        service = self._service(embedder)
+
+        first = await service.embed_query("what is a variable")
+        second = await service.embed_query("what is a variable")
+
+        assert first == pytest.approx(second)
+        assert len(embedder.calls) == 1
+        assert service.cache.memory_hits == 1
+        assert service.cache.memory_misses == 1
+
+    @pytest.mark.asyncio
+    async def test_documents_only_embed_misses(self):
+        """Test that cached chunks are not sent to the provider again"""
+        embedder = CountingEmbedder()
+        service = self._service(embedder)
+
+        await service.embed_documents(["chapter one", "chapter two"])
+        embeddings = await service.embed_documents(["chapter two", "chapter three", "chapter three"])
+
+        assert embedder.calls == [["chapter one", "chapter two"], ["chapter three"]]
+        assert len(embeddings) == 3
+        assert embeddings[1] == pytest.approx(embeddings[2])
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        """Test that the LRU stays within its byte budget"""
+        cache = EmbeddingCache(max_bytes=3 * (64 * 4 + 10), collection_name=None)
+        for key in ["key-00001", "key-00002", "key-00003"]:
+            cache._remember(key, [0.0] * 64)
+        cache._entries.move_to_end("key-00001")
+        cache._remember("key-00004", [0.0] * 64)
+
+        assert list(cache._entries) == ["key-00003", "key-00001", "key-00004"]
+        assert cache.stats()["memory_bytes"] <= cache.max_bytes
+
+    @pytest.mark.asyncio
+    async def test_model_change_invalidates_entries(self):
+        """Test that entries of another model are not reused and can be purged"""
+        cache = EmbeddingCache(collection_name=None)
+        old = self._service(CountingEmbedder(dimension=64))
+        old.cache = cache
+        await old.embed_query("loops")
+
+        embedder = CountingEmbedder(dimension=32)
+        new = self._service(embedder)
+        new.cache = cache
+        assert old.model_key != new.model_key
+
+        embedding = await new.embed_query("loops")
+        assert len(embedding) == 32
+        assert len(embedder.calls) == 1
+
+        assert await cache.purge_stale(new.model_key) == 1
+        assert all(key.startswith(new.model_key) for key in cache._entries)
+
+    @pytest.mark.asyncio
+    async def test_index_creation_is_retried_after_failure(self):
+        """Test that a failed create_index does not mark the index as ready"""
+        class Collection:
+            attempts = 0
+
+            async def create_index(self, keys):
+                self.attempts += 1
+                if self.attempts == 1:
+                    raise RuntimeError("not primary")
+
+        cache = EmbeddingCache(collection_name=None)
+        collection = Collection()
+
+        with pytest.raises(RuntimeError):
+            await cache._ensure_collection_indexes(collection)
+        await cache._ensure_collection_indexes(collection)
+        await cache._ensure_collection_indexes(collection)
+
+        assert collection.attempts == 2
+        assert cache._collection_indexes_ready
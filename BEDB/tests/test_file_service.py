@@ -0,0 +1,259 @@
+"""
+Tests for file saving and process-pool text extraction
+"""
+import hashlib
+import io
+import os
+import docx
+import pytest
+from fastapi import HTTPException, UploadFile
+from app.models.upload import FileType
+from app.services.blob_store import BlobStore
+from app.services.file_service import FileService
+from scripts.benchmark_pdf_extraction import build_pdf
+
+
+class MemoryBlobStore(BlobStore):
+    """Blob store that keeps reference counts in a dict instead of MongoDB"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.refs = {}
+
+    async def _acquire(self, content_hash, size):
+        self.refs[content_hash] = self.refs.get(content_hash, 0) + 1
+
+    async def _release(self, content_hash):
+        self.refs[content_hash] -= 1
+        return self.refs[content_hash] == 0
+
+    async def _forget(self, content_hash):
+        del self.refs[content_hash]
+
+
+class TextCollection:
+    """Blob collection that supports the lookups of get_text and set_text"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query, projection=None):
+        doc = self.docs.get(query["_id"], {})
+        if all(doc.get(field) == value for field, value in query.items() if field != "_id"):
+            return doc or None
+        return None
+
+    async def update_one(self, query, update):
+        self.docs.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+
+@pytest.fixture
+def service(tmp_path):
+    """File service with a small pool, small PDF batches and a local blob store"""
+    service = FileService()
+    service.upload_dir = str(tmp_path)
+    service.blobs = MemoryBlobStore(str(tmp_path / "blobs"))
+    service.extraction_workers = 2
+    service.pdf_pages_per_task = 2
+    yield service
+    service.shutdown()
+
+
+class CountingFile(io.BytesIO):
+    """Upload body that records the largest read"""
+
+    largest_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.largest_read = max(self.largest_read, len(data))
+        return data
+
+
+class TestStreamingSave:
+    """Test chunked upload writes"""
+
+    @pytest.mark.asyncio
+    async def test_writes_in_chunks_and_hashes(self, service, tmp_path):
+        """Test that the file is copied chunk by chunk with its sha256"""
+        service.chunk_size = 1024
+        data = os.urandom(10_000)
+        body = CountingFile(data)
+
+        info = await service.save_upload_file(UploadFile(body, filename="notes.txt"), "user")
+
+        assert body.largest_read == 1024
+        assert info["file_size"] == len(data)
+        assert info["content_hash"] == hashlib.sha256(data).hexdigest()
+        with open(info["file_path"], "rb") as f:
+            assert f.read() == data
+
+    @pytest.mark.asyncio
+    async def test_aborts_over_limit_without_declared_size(self, service, tmp_path):
+        """Test that an oversized upload is rejected and nothing is left on disk"""
+        service.chunk_size = 1024
+        service.max_file_size = 4096
+        body = CountingFile(b"x" * 10_000)
+
+        with pytest.raises(HTTPException) as error:
+            await service.save_upload_file(UploadFile(body, filename="big.txt"), "user")
+
+        assert error.value.status_code == 413
+        assert body.tell() <= 5120
+        assert os.listdir(tmp_path) == []
+
+
+class TestBlobDeduplication:
+    """Test content-addressed storage of uploads"""
+
+    @pytest.mark.asyncio
+    async def test_identical_files_share_a_blob(self, service, tmp_path):
+        """Test that the blob is shared and removed with its last reference"""
+        data = b"syllabus" * 1000
+        first = await service.save_upload_file(UploadFile(io.BytesIO(data), filename="a.pdf"), "u1")
+        second = await service.save_upload_file(UploadFile(io.BytesIO(data), filename="b.pdf"), "u2")
+        other = await service.save_upload_file(UploadFile(io.BytesIO(b"other"), filename="c.pdf"), "u3")
+
+        assert first["file_path"] == second["file_path"] != other["file_path"]
+        assert service.blobs.refs[first["content_hash"]] == 2
+        assert not [name for name in os.listdir(tmp_path) if name != "blobs"]
+
+        assert await service.remove_upload_file(first["file_path"], first["content_hash"]) is False
+        assert os.path.exists(second["file_path"])
+        assert await service.remove_upload_file(second["file_path"], second["content_hash"]) is True
+        assert not os.path.exists(second["file_path"])
+        assert os.path.exists(other["file_path"])
+
+    @pytest.mark.asyncio
+    async def test_legacy_files_are_deleted_directly(self, service, tmp_path):
+        """Test that files saved before the blob store are still removed"""
+        path = tmp_path / "legacy.pdf"
+        path.write_bytes(b"old")
+
+        assert await service.remove_upload_file(str(path), None) is True
+        assert not path.exists()
+
+    @pytest.mark.asyncio
+    async def test_cleaned_text_is_keyed_by_version(self, tmp_path, monkeypatch):
+        """Test that text cleaned by another prompt or model is not reused"""
+        blobs = BlobStore(str(tmp_path))
+        collection = TextCollection()
+        monkeypatch.setattr(blobs, "_get_collection", lambda: collection)
+
+        await blobs.set_text("abc", "v1", "cleaned by v1")
+
+        assert await blobs.get_text("abc", "v1") == "cleaned by v1"
+        assert await blobs.get_text("abc", "v2") is None
+
+
+async def stream(data, size=1000):
+    """Request body as an async stream of chunks"""
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class TestResumableParts:
+    """Test storing and assembling resumable upload parts"""
+
+    def test_plan(self, service):
+        """Test part layout and validation"""
+        service.part_size = 4096
+        plan = service.plan_resumable_upload("lecture.mp4", 10_000)
+
+        assert plan["file_type"] == FileType.VIDEO
+        assert plan["part_count"] == 3
+        assert service.expected_part_size(10_000, 4096, 3) == 10_000 - 8192
+        with pytest.raises(HTTPException):
+            service.plan_resumable_upload("lecture.exe", 10_000)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("zero_copy", [True, False])
+    async def test_parts_out_of_order(self, service, tmp_path, monkeypatch, zero_copy):
+        """Test that parts sent in any order assemble into the original file"""
+        if not zero_copy:
+            def unsupported(*args):
+                raise OSError("not supported")
+            monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+            monkeypatch.setattr(os, "sendfile", unsupported, raising=False)
+        data = os.urandom(10_000)
+        sizes = {1: 4096, 2: 4096, 3: 1808}
+
+        for number in [3, 1, 2, 1]:
+            start = (number - 1) * 4096
+            size, sha256 = await service.save_upload_part("u1", number, stream(data[start:start + sizes[number]]), sizes[number])
+            assert sha256 == hashlib.sha256(data[start:start + size]).hexdigest()
+
+        info = await service.assemble_upload_parts("u1", 3, "lecture.mp4")
+
+        assert info["file_size"] == len(data)
+        assert info["content_hash"] == hashlib.sha256(data).hexdigest()
+        with open(info["file_path"], "rb") as f:
+            assert f.read() == data
+        assert not os.path.exists(os.path.join(tmp_path, "parts", "u1"))
+
+    @pytest.mark.asyncio
+    async def test_wrong_part_size(self, service, tmp_path):
+        """Test that short and oversized parts are rejected"""
+
+        with pytest.raises(HTTPException) as short:
+            await service.save_upload_part("u1", 1, stream(b"x" * 100), 4096)
+        with pytest.raises(HTTPException) as large:
+            await service.save_upload_part("u1", 1, stream(b"x" * 5000), 4096)
+
+        assert short.value.status_code == 400
+        assert large.value.status_code == 413
+        assert os.listdir(os.path.join(tmp_path, "parts", "u1")) == []
+
+
+class TestPdfExtraction:
+    """Test page-parallel PDF extraction"""
+
+    @pytest.mark.asyncio
+    async def test_pages_joined_in_order(self, service, tmp_path):
+        """Test that batches from different workers are joined in page order"""
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(build_pdf(5, lines_per_page=2))
+
+        text = await service.extract_text_from_file(str(path), FileType.PDF)
+
+        positions = [text.index(f"Page {page} line 1:") for page in range(1, 6)]
+        assert positions == sorted(positions)
+        assert text == text.strip()
+
+    @pytest.mark.asyncio
+    async def test_timeout_restarts_pool(self, service, tmp_path):
+        """Test that a timed out extraction fails and replaces the pool"""
+        path = tmp_path / "big.pdf"
+        path.write_bytes(build_pdf(200))
+        service.extraction_timeout = 0.01
+        await service._run_in_pool(len, "warm up")
+        executor = service._executor
+
+        with pytest.raises(Exception, match="timed out"):
+            await service.extract_text_from_file(str(path), FileType.PDF)
+        assert service._executor is not executor
+
+    @pytest.mark.asyncio
+    async def test_invalid_pdf(self, service, tmp_path):
+        """Test that parse errors from the worker are reported"""
+        path = tmp_path / "broken.pdf"
+        path.write_bytes(b"not a pdf")
+
+        with pytest.raises(Exception, match="Failed to extract PDF text"):
+            await service.extract_text_from_file(str(path), FileType.PDF)
+
+
+class TestDocxExtraction:
+    """Test DOCX extraction"""
+
+    @pytest.mark.asyncio
+    async def test_paragraphs(self, service, tmp_path):
+        """Test that paragraphs are extracted one per line"""
+        path = tmp_path / "notes.docx"
+        document = docx.Document()
+        document.add_paragraph("First paragraph")
+        document.add_paragraph("Second paragraph")
+        document.save(str(path))
+
+        text = await service.extract_text_from_file(str(path), FileType.DOCX)
+        assert text == "First paragraph\nSecond paragraph"
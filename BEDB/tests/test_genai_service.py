@@ -0,0 +1,334 @@
+"""
+Tests for non-blocking Gemini calls
+"""
+import asyncio
+import json
+import pytest
+from fastapi import HTTPException
+from app.models.chat import ChatMode
+from app.services.genai_service import GenAIService
+from app.utils import cancel_on_disconnect
+
+
+class SlowModel:
+    """Stand-in for the Gemini model that records concurrency"""
+
+    model_name = "models/fake"
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+
+    async def generate_content_async(self, prompt, request_options=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return type("Response", (), {"text": f"answer to {prompt.strip()[:20]}"})()
+
+
+def _chunk(token):
+    """Streamed chunk shaped like the SDK's; ``None`` is a chunk without parts"""
+    parts = [] if token is None else [type("Part", (), {"text": token})()]
+    candidate = type("Candidate", (), {"content": type("Content", (), {"parts": parts})()})()
+
+    class Chunk:
+        candidates = [candidate]
+
+        @property
+        def text(self):
+            if not parts:
+                raise ValueError("The response has no parts")
+            return token
+
+    return Chunk()
+
+
+class StreamingModel:
+    """Stand-in for a streaming Gemini response"""
+
+    model_name = "models/fake"
+
+    def __init__(self, tokens, delay=0.0):
+        self.tokens = tokens
+        self.delay = delay
+        self.closed = False
+
+    async def generate_content_async(self, prompt, stream=False, request_options=None):
+        model = self
+
+        class Response:
+            async def __aiter__(self):
+                try:
+                    for token in model.tokens:
+                        await asyncio.sleep(model.delay)
+                        yield _chunk(token)
+                finally:
+                    model.closed = True
+
+        return Response()
+
+
+class FakeRequest:
+    """Request whose client disconnects after a number of polls"""
+
+    def __init__(self, disconnect_after):
+        self.polls = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.polls += 1
+        return self.polls >= self.disconnect_after
+
+
+def _service(delay, timeout=5.0, limits=None):
+    service = GenAIService()
+    service.model = SlowModel(delay)
+    service.timeout = timeout
+    service._limits = {method: asyncio.Semaphore(limit) for method, limit in (limits or {}).items()}
+    return service
+
+
+class TestGenAIService:
+    """Test GenAIService provider calls"""
+
+    @pytest.mark.asyncio
+    async def test_calls_do_not_block_event_loop(self):
+        """Test that other coroutines run while a call is in flight"""
+        service = _service(delay=0.2)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await service.generate_summary("Variables store values")
+        task.cancel()
+
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_per_method_concurrency_limit(self):
+        """Test that a method never exceeds its concurrency limit"""
+        service = _service(delay=0.05, limits={"summary": 2})
+
+        await asyncio.gather(*(service.generate_summary(f"text {i}") for i in range(6)))
+
+        assert service.model.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        """Test that slow calls fail after the timeout"""
+        service = _service(delay=1, timeout=0.05)
+
+        with pytest.raises(Exception, match="timed out"):
+            await service.generate_summary("slow")
+        assert service.model.running == 0
+
+
+class TestResponseCaching:
+    """Test exact-match caching of generated responses"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_summary_calls_model_once(self):
+        """Test that an identical summary request is served from the cache"""
+        service = _service(delay=0)
+        calls = 0
+        generate = service.model.generate_content_async
+
+        async def counting(prompt, request_options=None):
+            nonlocal calls
+            calls += 1
+            return await generate(prompt, request_options)
+
+        service.model.generate_content_async = counting
+
+        first = await service.generate_summary("Loops repeat work")
+        second = await service.generate_summary("Loops repeat work")
+        await service.generate_summary("Functions group statements")
+
+        assert first == second
+        assert calls == 2
+        assert service.cache.stats()["exact_hits"] == 1
+
+
+class TestStreamChat:
+    """Test GenAIService.stream_chat_with_context"""
+
+    @pytest.mark.asyncio
+    async def test_streams_tokens(self):
+        """Test that tokens are yielded as they arrive"""
+        service = _service(delay=0)
+        service.model = StreamingModel(["Hello", ", ", "world"])
+
+        tokens = [token async for token in service.stream_chat_with_context("hi", context="notes")]
+
+        assert tokens == ["Hello", ", ", "world"]
+
+    @pytest.mark.asyncio
+    async def test_chunks_without_text_are_skipped(self):
+        """Test that blocked or empty chunks do not end the stream"""
+        service = _service(delay=0)
+        service.model = StreamingModel(["Hello", None, "world", None])
+
+        tokens = [token async for token in service.stream_chat_with_context("hi", context="notes")]
+
+        assert tokens == ["Hello", "world"]
+
+    @pytest.mark.asyncio
+    async def test_strict_mode_without_context(self):
+        """Test that strict mode refuses without calling the model"""
+        service = _service(delay=0)
+        service.model = StreamingModel(["unused"])
+
+        tokens = [token async for token in service.stream_chat_with_context("hi", mode=ChatMode.STRICT)]
+
+        assert tokens == [GenAIService.STRICT_MODE_REFUSAL]
+
+    @pytest.mark.asyncio
+    async def test_abort_releases_upstream_and_slot(self):
+        """Test that closing the stream early closes the upstream call"""
+        service = _service(delay=0, limits={"chat": 1})
+        service.model = StreamingModel(["a", "b", "c", "d"], delay=0.01)
+
+        stream = service.stream_chat_with_context("hi", context="notes")
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+
+        assert service.model.closed
+        assert not service._limits["chat"].locked()
+
+
+class TestCancelOnDisconnect:
+    """Test cancel_on_disconnect"""
+
+    @pytest.mark.asyncio
+    async def test_returns_result(self):
+        """Test that the result is returned while the client is connected"""
+        service = _service(delay=0.01)
+
+        answer = await cancel_on_disconnect(FakeRequest(disconnect_after=100), service.generate_summary("hi"), poll_interval=0.005)
+
+        assert answer.startswith("answer to")
+
+    @pytest.mark.asyncio
+    async def test_cancels_provider_call(self):
+        """Test that the provider call is cancelled when the client leaves"""
+        service = _service(delay=5)
+
+        with pytest.raises(HTTPException) as error:
+            await cancel_on_disconnect(FakeRequest(disconnect_after=2), service.generate_summary("hi"), poll_interval=0.01)
+
+        await asyncio.sleep(0)
+        assert error.value.status_code == 499
+        assert service.model.running == 0
+
+
+class RecordingModel(SlowModel):
+    """Model that records prompts and can fail on prompts containing a marker"""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        super().__init__(delay)
+        self.prompts = []
+        self.fail_on = fail_on
+
+    async def generate_content_async(self, prompt, request_options=None):
+        self.prompts.append(prompt)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("upstream error")
+        if "JSON format" in prompt:
+            count = int(prompt.split("Generate ")[1].split(" ")[0])
+            await asyncio.sleep(self.delay)
+            return type("Response", (), {"text": json.dumps([{"question": f"q{i}"} for i in range(count)])})()
+        return await super().generate_content_async(prompt, request_options)
+
+
+def _long_document(sections=6, sentences=30):
+    return " ".join(
+        f"Section {s} sentence {i} explains topic {s} in detail."
+        for s in range(sections) for i in range(sentences)
+    )
+
+
+class TestMapReduce:
+    """Test segment-wise processing of long documents"""
+
+    def test_split_respects_segment_budget(self):
+        """Test that segments fit the token budget and cover the text in order"""
+        service = _service(delay=0)
+        service.segment_tokens = 100
+        text = _long_document()
+
+        segments = service.split_segments(text)
+
+        assert len(segments) > 1
+        assert all(service.estimate_tokens(segment) <= 100 for segment in segments)
+        assert " ".join(segments) == text
+
+    @pytest.mark.asyncio
+    async def test_summary_maps_concurrently_then_reduces(self):
+        """Test that segment summaries run under the limit and are combined"""
+        service = _service(delay=0.02, limits={"summary": 2})
+        service.model = RecordingModel(delay=0.02)
+        service.segment_tokens = 300
+
+        await service.generate_summary(_long_document())
+
+        segments = len(service.split_segments(_long_document()))
+        assert service.model.peak == 2
+        assert len(service.model.prompts) == segments + 1
+        assert "summaries of consecutive sections" in service.model.prompts[-1]
+
+    @pytest.mark.asyncio
+    async def test_failed_segment_retries_alone(self):
+        """Test that only the failed segment is called again on retry"""
+        service = _service(delay=0)
+        service.model = RecordingModel(fail_on="Section 3 sentence 0 ")
+        service.segment_tokens = 300
+        text = _long_document()
+
+        with pytest.raises(Exception, match="upstream error"):
+            await service.extract_text_from_content(text)
+        first_calls = len(service.model.prompts)
+
+        service.model.fail_on = None
+        await service.extract_text_from_content(text)
+
+        assert len(service.model.prompts) == first_calls + 1
+
+    @pytest.mark.asyncio
+    async def test_quiz_questions_spread_over_segments(self):
+        """Test that the requested number of questions is split across segments"""
+        service = _service(delay=0)
+        service.model = RecordingModel()
+        service.segment_tokens = 300
+
+        questions = await service.generate_quiz_questions(_long_document(), num_questions=5)
+
+        assert len(questions) == 5
+        assert len(service.model.prompts) == 5
+
+    @pytest.mark.asyncio
+    async def test_summaries_that_do_not_shrink_stop_recursing(self):
+        """Test that the reduce step is bounded when summaries stay long"""
+        class EchoModel(RecordingModel):
+            async def generate_content_async(self, prompt, request_options=None):
+                self.prompts.append(prompt)
+                return type("Response", (), {"text": prompt})()
+
+        service = _service(delay=0)
+        service.model = EchoModel()
+        service.segment_tokens = 300
+
+        await asyncio.wait_for(service.generate_summary(_long_document()), timeout=5)
+
+        combine = service.model.prompts[-1]
+        assert "summaries of consecutive sections" in combine
+        sections = combine.split("Summaries:")[1]
+        assert service.estimate_tokens(sections.strip()) <= service.segment_tokens
@@ -0,0 +1,185 @@
+"""
+Tests for the background job worker
+"""
+import asyncio
+import pytest
+from app.config import settings
+from app.services.job_queue import JobQueue, JobStatus, JobWorker, retry_delay
+
+
+class MemoryJobQueue(JobQueue):
+    """Job queue that keeps jobs in a list instead of MongoDB"""
+
+    def __init__(self, jobs):
+        super().__init__()
+        self.jobs = jobs
+        self.outcomes = {}
+
+    async def claim(self, worker_id, job_types=None):
+        for job in self.jobs:
+            if job["status"] == JobStatus.QUEUED and job["type"] in job_types:
+                job.update(status=JobStatus.RUNNING, worker_id=worker_id, attempts=job["attempts"] + 1)
+                return job
+        return None
+
+    async def extend_lease(self, job):
+        return True
+
+    async def reap_expired(self):
+        return []
+
+    async def complete(self, job):
+        job["status"] = JobStatus.SUCCEEDED
+        self.outcomes[job["_id"]] = JobStatus.SUCCEEDED
+
+    async def fail(self, job, error):
+        job["last_error"] = error
+        job["status"] = JobStatus.DEAD if job["attempts"] >= job["max_attempts"] else JobStatus.QUEUED
+        self.outcomes[job["_id"]] = job["status"]
+        return job["status"]
+
+
+class FindAndUpdateCollection:
+    """Collection that records find_one_and_update calls and returns queued results"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        self.calls.append((query, update))
+        return self.results.pop(0) if self.results else None
+
+
+def make_job(job_id, max_attempts=3):
+    return {"_id": job_id, "type": "demo", "payload": {}, "status": JobStatus.QUEUED,
+            "attempts": 0, "max_attempts": max_attempts, "last_error": None}
+
+
+class TestRetryDelay:
+    """Test retry backoff"""
+
+    def test_grows_exponentially_and_is_capped(self):
+        """Test that the delay doubles per attempt up to the maximum"""
+        for attempts, ceiling in [(1, 10), (2, 20), (3, 40), (10, 300)]:
+            for _ in range(20):
+                delay = retry_delay(attempts, base=10, maximum=300)
+                assert ceiling / 2 <= delay <= ceiling
+
+
+class TestJobWorker:
+    """Test running jobs"""
+
+    @pytest.mark.asyncio
+    async def test_success_and_dead_letter(self):
+        """Test that failing jobs are retried, then dead-lettered with the hook called"""
+        calls = []
+        dead = []
+
+        async def handler(job):
+            calls.append(job["_id"])
+            if job["_id"] == "bad":
+                raise ValueError("cannot parse file")
+
+        async def on_dead(job):
+            dead.append(job["_id"])
+
+        queue = MemoryJobQueue([make_job("good"), make_job("bad", max_attempts=2)])
+        queue.register("demo", handler, on_dead=on_dead)
+        worker = JobWorker(queue, concurrency=2, poll_interval=0.01)
+
+        task = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.1)
+        worker.stop()
+        await asyncio.wait_for(task, timeout=1)
+
+        assert queue.outcomes == {"good": JobStatus.SUCCEEDED, "bad": JobStatus.DEAD}
+        assert calls.count("bad") == 2
+        assert dead == ["bad"]
+        assert "cannot parse file" in queue.jobs[1]["last_error"]
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_cancels_without_outcome(self, monkeypatch):
+        """Test that a job whose lease was taken over is cancelled and not recorded"""
+        monkeypatch.setattr(settings, "job_lease_seconds", 0.03)
+        cancelled = []
+
+        async def handler(job):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(job["_id"])
+                raise
+
+        queue = MemoryJobQueue([])
+        queue.extend_lease = lambda job: asyncio.sleep(0, result=False)
+        queue.register("demo", handler)
+        job = make_job("slow")
+        job.update(status=JobStatus.RUNNING, attempts=1)
+
+        await asyncio.wait_for(JobWorker(queue).run_job(job), timeout=1)
+
+        assert cancelled == ["slow"]
+        assert queue.outcomes == {}
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_hook_gets_final_error(self):
+        """Test that the hook sees the error of the attempt that dead-lettered the job"""
+        seen = []
+
+        async def handler(job):
+            raise ValueError(f"attempt {job['attempts']}")
+
+        async def on_dead(job):
+            seen.append(job["last_error"])
+
+        queue = MemoryJobQueue([])
+        queue.fail = lambda job, error: asyncio.sleep(0, result=JobStatus.DEAD)
+        queue.register("demo", handler, on_dead=on_dead)
+        job = make_job("bad", max_attempts=1)
+        job.update(status=JobStatus.RUNNING, attempts=1, last_error="attempt 0")
+
+        await JobWorker(queue).run_job(job)
+
+        assert seen == ["ValueError: attempt 1"]
+
+
+class TestExpiredLeases:
+    """Test jobs whose worker died or hung"""
+
+    @pytest.mark.asyncio
+    async def test_claim_skips_exhausted_jobs(self, monkeypatch):
+        """Test that an expired lease is only re-claimed while attempts remain"""
+        collection = FindAndUpdateCollection([])
+        queue = JobQueue()
+        monkeypatch.setattr(queue, "_get_collection", lambda: collection)
+
+        await queue.claim("worker", ["demo"])
+
+        expired = collection.calls[0][0]["$or"][1]
+        assert expired["status"] == JobStatus.RUNNING
+        assert expired["$expr"] == {"$lt": ["$attempts", "$max_attempts"]}
+
+    @pytest.mark.asyncio
+    async def test_exhausted_jobs_are_dead_lettered(self, monkeypatch):
+        """Test that the sweep marks exhausted jobs dead and runs the hook"""
+        dead = []
+
+        async def on_dead(job):
+            dead.append((job["_id"], job["last_error"]))
+
+        poison = make_job("poison", max_attempts=2)
+        poison.update(status=JobStatus.DEAD, attempts=2, last_error="lease expired")
+        collection = FindAndUpdateCollection([poison])
+        queue = JobQueue()
+        monkeypatch.setattr(queue, "_get_collection", lambda: collection)
+        queue.register("demo", lambda job: asyncio.sleep(0), on_dead=on_dead)
+
+        await JobWorker(queue).reap_expired()
+
+        query, update = collection.calls[0]
+        assert query["$expr"] == {"$gte": ["$attempts", "$max_attempts"]}
+        assert update["$set"]["status"] == JobStatus.DEAD
+        assert update["$set"]["last_error"] == "lease expired"
+        assert len(collection.calls) == 2
+        assert dead == [("poison", "lease expired")]
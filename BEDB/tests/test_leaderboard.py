@@ -0,0 +1,73 @@
+"""
+Tests for the aggregation leaderboard
+"""
+import pytest
+from app.services.leaderboard import LeaderboardService, course_leaderboard_pipeline, leaderboard_pipeline
+
+
+class RecordingLeaderboard(LeaderboardService):
+    """Leaderboard that records pipelines instead of running them"""
+
+    def __init__(self, ttl=30):
+        super().__init__(ttl=ttl)
+        self.runs = []
+
+    async def _inactive_user_count(self):
+        return 3
+
+    async def _aggregate(self, collection, pipeline):
+        self.runs.append((collection, pipeline))
+        return [{"user_id": "u1", "user_name": "An", "score": 90.0, "quizzes_taken": 2, "courses_completed": 1}]
+
+
+def stage(pipeline, name):
+    """First stage of a pipeline with the given operator"""
+    return next(s[name] for s in pipeline if name in s)
+
+
+class TestPipelines:
+    """Test the shape of the ranking pipelines"""
+
+    def test_sort_feeds_padded_limit(self):
+        """Test that the top-k sort over-fetches by the inactive user count"""
+        pipeline = leaderboard_pipeline(10, inactive_users=3)
+        operators = [next(iter(s)) for s in pipeline]
+
+        assert operators.index("$sort") + 1 == operators.index("$limit")
+        assert pipeline[operators.index("$limit")]["$limit"] == 13
+        assert pipeline[-2] == {"$limit": 10}
+        assert stage(pipeline, "$sort") == {"score": -1, "_id": 1}
+
+    def test_course_pipeline_groups_course_quizzes(self):
+        """Test that the course ranking groups the course's quiz results per user"""
+        pipeline = course_leaderboard_pipeline("c1", ["q1", "q2"], 5)
+
+        assert pipeline[0] == {"$match": {"quiz_id": {"$in": ["q1", "q2"]}}}
+        assert stage(pipeline, "$group")["score"] == {"$avg": "$score"}
+        assert {"$limit": 5} in pipeline
+
+
+class TestCaching:
+    """Test caching of rankings per limit"""
+
+    @pytest.mark.asyncio
+    async def test_cached_per_limit(self):
+        """Test that each limit is computed once within the TTL"""
+        service = RecordingLeaderboard()
+
+        first = await service.get_leaderboard(10)
+        assert await service.get_leaderboard(10) == first
+        await service.get_leaderboard(20)
+
+        assert len(service.runs) == 2
+        assert all(collection == "user_stats" for collection, _ in service.runs)
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_recomputed(self):
+        """Test that rankings are recomputed after the TTL"""
+        service = RecordingLeaderboard(ttl=-1)
+
+        await service.get_leaderboard(10)
+        await service.get_leaderboard(10)
+
+        assert len(service.runs) == 2
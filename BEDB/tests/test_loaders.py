@@ -0,0 +1,80 @@
+"""
+Tests for request-scoped document loaders
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app.loaders import DocumentLoader, Loaders
+
+
+class FakeModel:
+    """Model whose find() records each $in query"""
+
+    documents = {i: SimpleNamespace(id=i, title=f"Course {i}") for i in range(10)}
+    queries = []
+    fail = False
+
+    @classmethod
+    def find(cls, query):
+        ids = query["_id"]["$in"]
+        cls.queries.append(list(ids))
+
+        async def to_list():
+            if cls.fail:
+                raise RuntimeError("connection reset")
+            return [cls.documents[i] for i in ids if i in cls.documents]
+
+        return SimpleNamespace(to_list=to_list)
+
+
+@pytest.fixture(autouse=True)
+def reset_model():
+    FakeModel.queries = []
+    FakeModel.fail = False
+
+
+class TestDocumentLoader:
+    """Test batching and memoisation of document loads"""
+
+    @pytest.mark.asyncio
+    async def test_same_tick_loads_share_one_query(self):
+        """Test that concurrent loads are resolved with one $in query"""
+        loader = DocumentLoader(FakeModel)
+
+        async def row(i):
+            return await loader.load(i)
+
+        documents = await asyncio.gather(*(row(i) for i in [3, 1, 3, 42]))
+
+        assert FakeModel.queries == [[3, 1, 42]]
+        assert [d.title if d else None for d in documents] == ["Course 3", "Course 1", "Course 3", None]
+
+    @pytest.mark.asyncio
+    async def test_memoised_for_the_request(self):
+        """Test that ids already loaded are not fetched again"""
+        loader = DocumentLoader(FakeModel)
+
+        await loader.load_many([1, 2])
+        documents = await loader.load_many([2, 3])
+
+        assert FakeModel.queries == [[1, 2], [3]]
+        assert [d.id for d in documents] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_retried(self):
+        """Test that a failed batch raises and is not memoised"""
+        loader = DocumentLoader(FakeModel)
+        FakeModel.fail = True
+        with pytest.raises(RuntimeError):
+            await loader.load_many([1, 2])
+
+        FakeModel.fail = False
+        assert (await loader.load(1)).id == 1
+        assert FakeModel.queries == [[1, 2], [1]]
+
+    def test_one_loader_per_model(self):
+        """Test that a request's loaders are reused per model"""
+        loaders = Loaders()
+
+        assert loaders[FakeModel] is loaders[FakeModel]
+        assert Loaders()[FakeModel] is not loaders[FakeModel]
@@ -0,0 +1,143 @@
+"""
+Tests for keyset pagination
+"""
+import pytest
+from datetime import datetime, timedelta
+from bson import ObjectId
+from types import SimpleNamespace
+from fastapi import HTTPException, Response
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_filter, next_cursor, paginate
+from app.routers.student import _enrolled_courses_pipeline
+
+
+def matches(row, query):
+    """Evaluate the subset of MongoDB queries keyset_filter produces"""
+    def compare(value, condition):
+        if isinstance(condition, dict):
+            (op, operand), = condition.items()
+            return value < operand if op == "$lt" else value > operand
+        return value == condition
+
+    if "$or" in query:
+        return any(matches(row, branch) for branch in query["$or"])
+    return all(compare(row[field], condition) for field, condition in query.items())
+
+
+def walk_pages(rows, limit, descending=True):
+    """Walk all pages the way a client following X-Next-Cursor would"""
+    ordered = sorted(rows, key=lambda r: (r["enrolled_at"], r["_id"]), reverse=descending)
+    pages, cursor = [], None
+    while True:
+        query = keyset_filter("enrolled_at", cursor, descending)
+        page = [row for row in ordered if matches(row, query)][:limit]
+        pages.append(page)
+        cursor = next_cursor(page, "enrolled_at", limit)
+        if cursor is None:
+            return pages
+
+
+class TestCursor:
+    """Test opaque cursor tokens"""
+
+    def test_round_trip_keeps_types(self):
+        """Test that datetimes and ObjectIds survive encoding"""
+        values = [datetime(2026, 10, 18, 12, 30, 15, 123000), ObjectId()]
+
+        assert decode_cursor(encode_cursor(values)) == values
+
+    @pytest.mark.parametrize("token", ["not-base64!", encode_cursor([1, 2, 3]), ""])
+    def test_malformed_cursor_is_bad_request(self, token):
+        """Test that tampered cursors are rejected with 400"""
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(token)
+        assert error.value.status_code == 400
+
+
+class TestKeyset:
+    """Test paging with (sort field, _id) keysets"""
+
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_pages_cover_every_row_once_with_ties(self, descending):
+        """Test that rows sharing a sort value are neither skipped nor repeated"""
+        start = datetime(2026, 10, 1)
+        rows = [{"_id": ObjectId(), "enrolled_at": start + timedelta(days=i // 3)} for i in range(23)]
+
+        pages = walk_pages(rows, limit=5, descending=descending)
+
+        seen = [row["_id"] for page in pages for row in page]
+        assert len(seen) == len(set(seen)) == 23
+        assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+
+    def test_exact_multiple_ends_with_empty_page(self):
+        """Test that a full last page is followed by an empty one"""
+        rows = [{"_id": ObjectId(), "enrolled_at": datetime(2026, 10, 1)} for _ in range(4)]
+
+        assert [len(page) for page in walk_pages(rows, limit=2)] == [2, 2, 0]
+
+    def test_enrollment_pipeline_prefers_cursor_over_skip(self):
+        """Test that skip is only applied without a cursor"""
+        student = ObjectId()
+        cursor = encode_cursor([datetime(2026, 10, 1), ObjectId()])
+
+        with_skip = _enrolled_courses_pipeline(student, "active", None, 40, 20)
+        with_cursor = _enrolled_courses_pipeline(student, None, cursor, 40, 20)
+
+        assert {"$skip": 40} in with_skip
+        assert with_skip[0]["$match"] == {"student_id": student, "status": "active"}
+        assert not any("$skip" in stage for stage in with_cursor)
+        assert "$or" in with_cursor[0]["$match"]
+
+
+class FakeQuery:
+    """Chainable stand-in for a Beanie FindMany that records calls"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def find(self, query):
+        self.calls.append(("find", query))
+        return self
+
+    def skip(self, n):
+        self.calls.append(("skip", n))
+        return self
+
+    def sort(self, keys):
+        self.calls.append(("sort", keys))
+        return self
+
+    def limit(self, n):
+        self.calls.append(("limit", n))
+        return self
+
+    async def to_list(self):
+        return self.rows
+
+
+class TestPaginate:
+    """Test the shared Beanie pagination helper"""
+
+    @pytest.mark.asyncio
+    async def test_skip_fallback_and_next_cursor_header(self):
+        """Test that skip is used without a cursor and the next cursor is returned"""
+        rows = [SimpleNamespace(id=ObjectId(), created_at=datetime(2026, 10, i + 1)) for i in range(3)]
+        query, response = FakeQuery(rows), Response()
+
+        await paginate(query, response, "created_at", skip=30, limit=3)
+
+        assert ("skip", 30) in query.calls
+        assert ("sort", [("created_at", -1), ("_id", -1)]) in query.calls
+        assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == [rows[-1].created_at, rows[-1].id]
+
+    @pytest.mark.asyncio
+    async def test_cursor_replaces_skip(self):
+        """Test that a cursor adds the keyset filter and ignores skip"""
+        cursor = encode_cursor([datetime(2026, 10, 1), ObjectId()])
+        query, response = FakeQuery([]), Response()
+
+        await paginate(query, response, "created_at", cursor=cursor, skip=30, limit=3, descending=False)
+
+        assert [name for name, _ in query.calls] == ["find", "sort", "limit"]
+        assert "$gt" in query.calls[0][1]["$or"][0]["created_at"]
+        assert NEXT_CURSOR_HEADER not in response.headers
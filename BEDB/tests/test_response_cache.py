@@ -0,0 +1,74 @@
+"""
+Tests for the LLM response cache
+"""
+import time
+import pytest
+from app.services.response_cache import ResponseCache
+
+
+class TestExactTier:
+    """Test exact-match caching"""
+
+    def test_key_depends_on_params_and_model(self):
+        """Test that params, model and prompt all change the key"""
+        base = ResponseCache.key("quiz", "models/a", "prompt", {"num_questions": 5})
+
+        assert base == ResponseCache.key("quiz", "models/a", "prompt", {"num_questions": 5})
+        assert base != ResponseCache.key("quiz", "models/a", "prompt", {"num_questions": 6})
+        assert base != ResponseCache.key("quiz", "models/b", "prompt", {"num_questions": 5})
+        assert base != ResponseCache.key("quiz", "models/a", "other", {"num_questions": 5})
+
+    def test_hit_miss_and_ttl(self, monkeypatch):
+        """Test hits, misses and expiry"""
+        cache = ResponseCache(ttl=10)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+
+        assert cache.get("k") is None
+        cache.set("k", "summary")
+        assert cache.get("k") == "summary"
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        assert cache.get("k") is None
+        assert cache.stats()["exact_hits"] == 1
+        assert cache.stats()["exact_misses"] == 2
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+
+
+class TestSemanticTier:
+    """Test similarity-based caching of chat answers"""
+
+    def test_similar_question_in_same_scope(self):
+        """Test that a near-identical question reuses the answer"""
+        cache = ResponseCache(semantic_threshold=0.9)
+        cache.set_similar("course:1:hybrid", [1.0, 0.0, 0.1], "A variable stores a value.")
+
+        assert cache.get_similar("course:1:hybrid", [1.0, 0.0, 0.12]) == "A variable stores a value."
+        assert cache.get_similar("course:1:hybrid", [0.0, 1.0, 0.0]) is None
+        assert cache.get_similar("course:2:hybrid", [1.0, 0.0, 0.1]) is None
+        assert cache.stats()["semantic_hit_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+    def test_bounded_and_expiring(self, monkeypatch):
+        """Test per-scope size bound and TTL"""
+        cache = ResponseCache(semantic_ttl=5, semantic_max_entries=2)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        for i, vector in enumerate([[1, 0, 0], [0, 1, 0], [0, 0, 1]]):
+            cache.set_similar("upload:1:strict", vector, f"answer {i}")
+
+        assert cache.get_similar("upload:1:strict", [1, 0, 0]) is None
+        assert cache.get_similar("upload:1:strict", [0, 0, 1]) == "answer 2"
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+        assert cache.get_similar("upload:1:strict", [0, 0, 1]) is None
@@ -0,0 +1,66 @@
+"""
+Tests for orjson responses and the trusted-output fast path
+"""
+import orjson
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from fastapi import Response
+from app.models.chat import ChatMessage
+from app.pagination import NEXT_CURSOR_HEADER
+from app.responses import ORJSONResponse, trusted_response
+from app.schemas.chat import ChatMessageResponse
+
+
+def make_message(**fields):
+    """Build a chat message the way Beanie returns it from a query"""
+    return ChatMessage.model_construct(
+        id=ObjectId(), session_id=ObjectId(), sender="user", message="Hello",
+        metadata={"sources": [ObjectId()]}, created_at=datetime(2026, 10, 18, 9, 30), **fields
+    )
+
+
+class TestTrustedResponse:
+    """Test rendering ODM output without re-validation"""
+
+    def test_matches_response_schema(self):
+        """Test that the body has exactly the schema's fields with JSON types"""
+        message = make_message()
+
+        body = orjson.loads(trusted_response([message], ChatMessageResponse).body)
+
+        assert set(body[0]) == set(ChatMessageResponse.model_fields)
+        assert body[0]["id"] == str(message.id)
+        assert body[0]["session_id"] == str(message.session_id)
+        assert body[0]["created_at"] == "2026-10-18T09:30:00"
+        assert ChatMessageResponse.model_validate(body[0]).message == "Hello"
+
+    def test_copies_injected_response_headers(self):
+        """Test that headers such as X-Next-Cursor survive the fast path"""
+        response = Response()
+        response.headers[NEXT_CURSOR_HEADER] = "abc"
+
+        rendered = trusted_response([make_message()], ChatMessageResponse, response)
+
+        assert rendered.headers[NEXT_CURSOR_HEADER] == "abc"
+        assert rendered.headers["content-length"] == str(len(rendered.body))
+
+
+class TestORJSONResponse:
+    """Test the default response class"""
+
+    def test_serializes_object_ids_and_models(self):
+        """Test that ObjectIds and nested models are rendered"""
+        object_id = ObjectId()
+
+        body = orjson.loads(ORJSONResponse({"id": object_id, "items": [ChatMessageResponse(
+            id="1", session_id="2", sender="ai", message="Hi", created_at=datetime(2026, 10, 18)
+        )]}).body)
+
+        assert body["id"] == str(object_id)
+        assert body["items"][0]["sender"] == "ai"
+
+    def test_unknown_types_still_fail(self):
+        """Test that unsupported values raise instead of being dropped"""
+        with pytest.raises(TypeError):
+            ORJSONResponse({"value": object()})
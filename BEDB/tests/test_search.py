@@ -0,0 +1,80 @@
+"""
+Tests for scoping semantic search to what the user may see
+"""
+import time
+import pytest
+from types import SimpleNamespace
+from bson import ObjectId
+from app.routers import search
+from app.routers.search import SearchRequest, search_documents
+from app.services.vector_index import ExactVectorIndex
+
+
+class ChunkCollection:
+    """Embeddings collection that answers lookups by id"""
+
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: doc for doc in docs}
+
+    def find(self, query, projection=None):
+        async def docs():
+            for key in query["_id"]["$in"]:
+                if key in self.docs:
+                    yield self.docs[key]
+        return docs()
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    """Chunks of two users' uploads and two courses, all matching the query equally"""
+    me, other = ObjectId(), ObjectId()
+    course, other_course = str(ObjectId()), str(ObjectId())
+    rows = [
+        ("upload", "mine", str(me)),
+        ("upload", "theirs", str(other)),
+        ("course", course, course),
+        ("chapter", "chapter-1", course),
+        ("chapter", "chapter-2", other_course)
+    ]
+    index = ExactVectorIndex()
+    docs = []
+    for document_type, document_id, owner_id in rows:
+        key = ObjectId()
+        index.add(str(key), [1.0, 0.0], document_id, document_type, owner_id)
+        docs.append({
+            "_id": key, "document_id": document_id, "document_type": document_type,
+            "content": f"text of {document_id}", "metadata": {}
+        })
+
+    async def create_embedding(text):
+        return [1.0, 0.0]
+
+    service = search.vector_service
+    monkeypatch.setattr(service, "index", index)
+    monkeypatch.setattr(service, "_index_loaded", True)
+    monkeypatch.setattr(service, "_refreshed_at", time.monotonic())
+    monkeypatch.setattr(service, "create_embedding", create_embedding)
+    monkeypatch.setattr(service, "_get_collection", lambda: ChunkCollection(docs))
+    return SimpleNamespace(user=SimpleNamespace(id=me), course=course)
+
+
+class TestSearchDocuments:
+    """Test the search endpoint's scopes"""
+
+    @pytest.mark.asyncio
+    async def test_other_users_uploads_are_not_returned(self, indexed):
+        """Test that only the caller's uploads and course material are searched"""
+        results = await search_documents(SearchRequest(query="loops", top_k=10), current_user=indexed.user)
+
+        assert sorted(result.doc_id for result in results) == sorted(
+            ["mine", indexed.course, "chapter-1", "chapter-2"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_course_id_narrows_course_material(self, indexed):
+        """Test that course_id limits course material to that course"""
+        request = SearchRequest(query="loops", course_id=indexed.course, top_k=10)
+
+        results = await search_documents(request, current_user=indexed.user)
+
+        assert sorted(result.doc_id for result in results) == sorted(["mine", indexed.course, "chapter-1"])
@@ -0,0 +1,59 @@
+"""
+Tests for the sentence-aware text chunker
+"""
+import pytest
+from app.services.text_chunker import TextChunker
+
+
+SAMPLE = (
+    "Python is a programming language.  It is easy to read!\n\n"
+    "Variables hold values. Functions group statements? Loops repeat work. "
+    "Classes bundle data and behaviour. Modules organise code into files."
+)
+
+
+class TestTextChunker:
+    """Test TextChunker"""
+
+    def test_short_text_is_one_chunk(self):
+        """Test that text shorter than a chunk is kept whole"""
+        chunks = TextChunker(chunk_size=1000, overlap=100).chunk_text(SAMPLE, {"title": "Intro"})
+
+        assert len(chunks) == 1
+        assert chunks[0]["text"] == SAMPLE.strip()
+        assert chunks[0]["metadata"] == {"title": "Intro"}
+
+    def test_offsets_point_into_original_text(self):
+        """Test that start_pos/end_pos slice the original document"""
+        chunks = TextChunker(chunk_size=60, overlap=25).chunk_text(SAMPLE)
+
+        assert len(chunks) > 1
+        for i, chunk in enumerate(chunks):
+            assert chunk["chunk_index"] == i
+            assert SAMPLE[chunk["start_pos"]:chunk["end_pos"]] == chunk["text"]
+            assert len(chunk["text"]) <= 60
+
+    def test_chunks_overlap_and_cover_text(self):
+        """Test that consecutive chunks overlap and no sentence is lost"""
+        chunker = TextChunker(chunk_size=60, overlap=25)
+        chunks = chunker.chunk_text(SAMPLE)
+
+        pairs = list(zip(chunks, chunks[1:]))
+        assert all(previous["start_pos"] < current["start_pos"] for previous, current in pairs)
+        assert any(current["start_pos"] < previous["end_pos"] for previous, current in pairs)
+        covered = "".join(chunk["text"] for chunk in chunks)
+        for sentence in chunker.split_by_sentences(SAMPLE):
+            assert sentence in covered
+
+    def test_long_sentence_is_split(self):
+        """Test that a sentence longer than a chunk is cut on whitespace"""
+        text = " ".join(["word"] * 100)
+        chunks = TextChunker(chunk_size=50, overlap=10).chunk_text(text)
+
+        assert all(len(chunk["text"]) <= 50 for chunk in chunks)
+        assert chunks[-1]["end_pos"] == len(text)
+
+    def test_invalid_overlap(self):
+        """Test that overlap must be smaller than the chunk size"""
+        with pytest.raises(ValueError):
+            TextChunker(chunk_size=100, overlap=100)
@@ -0,0 +1,238 @@
+"""
+Tests for incremental upload extraction and cleanup
+"""
+import pytest
+from types import SimpleNamespace
+from bson import ObjectId
+from app.models.upload import FileType, Upload, UploadStatus
+from app.services import extraction_cache, upload_pipeline
+from app.services.extraction_cache import ExtractionCache
+
+
+class MemoryExtractionCache(ExtractionCache):
+    """Extraction cache kept in dicts instead of MongoDB"""
+
+    def __init__(self):
+        super().__init__()
+        self.pages = {}
+        self.cleaned = {}
+
+    async def get_pages(self, content_hash, extractor):
+        return self.pages.get((content_hash, extractor))
+
+    async def put_pages(self, content_hash, extractor, pages):
+        self.pages[(content_hash, extractor)] = list(pages)
+
+    async def get_cleaned(self, version, raw_hashes):
+        return {h: self.cleaned[(version, h)] for h in raw_hashes if (version, h) in self.cleaned}
+
+    async def put_cleaned(self, version, cleaned):
+        self.cleaned.update({(version, h): text for h, text in cleaned.items()})
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Pipeline with in-memory cache, fake extractor and fake LLM"""
+    state = SimpleNamespace(
+        cache=MemoryExtractionCache(),
+        file_pages=["Intro page", "", "Recursion page", "Intro page"],
+        extractions=0,
+        llm_calls=[],
+        version="v1"
+    )
+
+    async def extract_pages_from_file(file_path, file_type):
+        state.extractions += 1
+        return list(state.file_pages)
+
+    async def extract_text_from_content(content):
+        state.llm_calls.append(content)
+        return f"clean({content})"
+
+    monkeypatch.setattr(upload_pipeline, "extraction_cache", state.cache)
+    monkeypatch.setattr(upload_pipeline.file_service, "extract_pages_from_file", extract_pages_from_file)
+    monkeypatch.setattr(upload_pipeline.genai_service, "extract_text_from_content", extract_text_from_content)
+    monkeypatch.setattr(type(upload_pipeline.genai_service), "extract_version", property(lambda self: state.version))
+    # One page per LLM call unless a test raises the budget
+    monkeypatch.setattr(upload_pipeline.genai_service, "segment_tokens", 4)
+    monkeypatch.setattr(upload_pipeline.genai_service, "chars_per_token", 4.0)
+    return state
+
+
+async def run(upload):
+    return await upload_pipeline.clean_pages(await upload_pipeline.extract_pages(upload))
+
+
+class TestIncrementalExtraction:
+    """Test page-level caching of raw and cleaned text"""
+
+    @pytest.mark.asyncio
+    async def test_first_run_cleans_each_distinct_page(self, pipeline):
+        """Test that blank and repeated pages are not sent to the LLM"""
+        upload = SimpleNamespace(content_hash="abc", file_path="x.pdf", file_type=FileType.PDF)
+
+        text = await run(upload)
+
+        assert pipeline.extractions == 1
+        assert sorted(pipeline.llm_calls) == ["Intro page", "Recursion page"]
+        assert text == "clean(Intro page)\n\nclean(Recursion page)\n\nclean(Intro page)"
+
+    @pytest.mark.asyncio
+    async def test_reprocess_skips_extraction_and_unchanged_pages(self, pipeline):
+        """Test that reprocessing reuses raw pages and cleans only changed ones"""
+        upload = SimpleNamespace(content_hash="abc", file_path="x.pdf", file_type=FileType.PDF)
+        first = await run(upload)
+        pipeline.llm_calls.clear()
+
+        assert await run(upload) == first
+        assert pipeline.extractions == 1
+        assert pipeline.llm_calls == []
+
+        # Re-extraction changed one page's raw text
+        pipeline.cache.pages[("abc", upload_pipeline.EXTRACTOR_VERSION)][2] = "Recursion page, fixed"
+        await run(upload)
+        assert pipeline.llm_calls == ["Recursion page, fixed"]
+
+    @pytest.mark.asyncio
+    async def test_prompt_change_recleans_without_extraction(self, pipeline):
+        """Test that a new cleanup prompt version re-cleans pages from the cached raw text"""
+        upload = SimpleNamespace(content_hash="abc", file_path="x.pdf", file_type=FileType.PDF)
+        await run(upload)
+        pipeline.llm_calls.clear()
+        pipeline.version = "v2"
+
+        await run(upload)
+
+        assert pipeline.extractions == 1
+        assert sorted(pipeline.llm_calls) == ["Intro page", "Recursion page"]
+
+    @pytest.mark.asyncio
+    async def test_pages_are_packed_into_calls(self, pipeline, monkeypatch):
+        """Test that consecutive pages share a call up to the token budget"""
+        monkeypatch.setattr(upload_pipeline.genai_service, "segment_tokens", 7)
+        upload = SimpleNamespace(content_hash="abc", file_path="x.pdf", file_type=FileType.PDF)
+
+        text = await run(upload)
+
+        assert sorted(pipeline.llm_calls) == ["Intro page", "Intro page\n\nRecursion page"]
+        assert text == "clean(Intro page\n\nRecursion page)\n\nclean(Intro page)"
+
+
+class VersionedCollection:
+    """Collection of cleaned texts that supports version purges"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def create_index(self, keys):
+        pass
+
+    async def delete_many(self, query):
+        kept = [doc for doc in self.docs if doc.get("version") == query["version"]["$ne"]]
+        deleted, self.docs[:] = len(self.docs) - len(kept), kept
+        return SimpleNamespace(deleted_count=deleted)
+
+
+class TestCleanedPurge:
+    """Test pruning cleaned text of old cleanup versions"""
+
+    @pytest.mark.asyncio
+    async def test_other_versions_are_deleted(self, monkeypatch):
+        """Test that entries of other and unknown versions are removed"""
+        collection = VersionedCollection([{"version": "v1"}, {"version": "v2"}, {}])
+        monkeypatch.setattr(extraction_cache, "get_database", lambda: {"extracted_pages": collection, "cleaned_pages": collection})
+
+        assert await ExtractionCache().purge_stale_cleaned("v2") == 2
+        assert collection.docs == [{"version": "v2"}]
+
+
+class UploadCollection:
+    """Uploads collection that applies conditional status updates"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def update_one(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc is None or doc["status"] not in query["status"]["$in"]:
+            return SimpleNamespace(matched_count=0)
+        doc.update(update["$set"])
+        return SimpleNamespace(matched_count=1)
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    """One pending upload, a fake indexer and recorded embedding deletes"""
+    upload_id = ObjectId()
+    state = SimpleNamespace(
+        upload_id=upload_id,
+        collection=UploadCollection({upload_id: {"status": UploadStatus.PENDING.value}}),
+        statuses_at_index=[],
+        deleted_embeddings=[],
+        on_index=None
+    )
+
+    async def get(document_id):
+        if document_id in state.collection.docs:
+            return SimpleNamespace(id=document_id, content_hash=None, file_path="x.txt", file_type=FileType.TXT)
+        return None
+
+    async def clean_pages(pages):
+        return "clean text"
+
+    async def extract_pages(upload):
+        return ["raw"]
+
+    async def index_upload_content(document_id):
+        state.statuses_at_index.append(state.collection.docs[upload_id]["status"])
+        if state.on_index:
+            state.on_index()
+        return True
+
+    async def delete_document_embeddings(document_id):
+        state.deleted_embeddings.append(document_id)
+        return 1
+
+    monkeypatch.setattr(Upload, "get", get)
+    monkeypatch.setattr(Upload, "get_pymongo_collection", lambda: state.collection)
+    monkeypatch.setattr(upload_pipeline, "extract_pages", extract_pages)
+    monkeypatch.setattr(upload_pipeline, "clean_pages", clean_pages)
+    monkeypatch.setattr(upload_pipeline.vector_service, "index_upload_content", index_upload_content)
+    monkeypatch.setattr(upload_pipeline.vector_service, "delete_document_embeddings", delete_document_embeddings)
+    return state
+
+
+class TestProcessUpload:
+    """Test upload status changes made by the processing job"""
+
+    def _job(self, uploads):
+        return {"payload": {"upload_id": str(uploads.upload_id), "reuse_text": False}}
+
+    @pytest.mark.asyncio
+    async def test_completed_only_after_indexing(self, uploads):
+        """Test that the upload is still processing while it is indexed"""
+        await upload_pipeline.process_upload(self._job(uploads))
+
+        assert uploads.statuses_at_index == [UploadStatus.PROCESSING.value]
+        doc = uploads.collection.docs[uploads.upload_id]
+        assert doc["status"] == UploadStatus.COMPLETED.value
+        assert doc["extracted_text"] == "clean text"
+
+    @pytest.mark.asyncio
+    async def test_upload_deleted_while_indexing_is_not_written_back(self, uploads):
+        """Test that a deleted upload stays deleted and loses its chunks"""
+        uploads.on_index = lambda: uploads.collection.docs.clear()
+
+        await upload_pipeline.process_upload(self._job(uploads))
+
+        assert uploads.collection.docs == {}
+        assert uploads.deleted_embeddings == [str(uploads.upload_id)]
+
+    @pytest.mark.asyncio
+    async def test_failure_does_not_recreate_deleted_upload(self, uploads):
+        """Test that the dead-letter hook is a no-op for a deleted upload"""
+        uploads.collection.docs.clear()
+
+        await upload_pipeline.mark_upload_failed({**self._job(uploads), "last_error": "boom"})
+
+        assert uploads.collection.docs == {}
@@ -0,0 +1,121 @@
+"""
+Tests for materialised user statistics
+"""
+import pytest
+from datetime import datetime
+from app.services.user_stats import (
+    UserStatsService, build_stats, completed_course_count, completion_delta,
+    mean_score, progress_increments, summarize_dashboard, week_start, weekly_progress
+)
+
+
+class MemoryUserStats(UserStatsService):
+    """User stats kept in a dict, applying ``$inc`` like MongoDB"""
+
+    def __init__(self):
+        super().__init__()
+        self.docs = {}
+
+    async def _increment(self, user_id, increments):
+        doc = self.docs.setdefault(user_id, build_stats([], []))
+        for path, amount in increments.items():
+            *parents, leaf = path.split(".")
+            target = doc
+            for key in parents:
+                target = target.setdefault(key, {})
+            target[leaf] = target.get(leaf, 0) + amount
+
+    async def get(self, user_id):
+        return self.docs.get(user_id) or build_stats([], [])
+
+
+class TestIncrementalStats:
+    """Test that $inc updates match a full recomputation"""
+
+    @pytest.mark.asyncio
+    async def test_increments_match_rebuild(self):
+        """Test quiz and progress increments against build_stats"""
+        service = MemoryUserStats()
+        quizzes = [(80.0, datetime(2026, 10, 12, 9)), (60.0, datetime(2026, 10, 18, 23)), (100.0, datetime(2026, 10, 5))]
+        for score, taken_at in quizzes:
+            await service.record_quiz("u1", score, taken_at)
+
+        # Chapter a completed then reopened, chapter b completed; course y completed
+        await service.record_progress("u1", "x", time_spent=30, completed=completion_delta(False, True))
+        await service.record_progress("u1", "x", time_spent=10, completed=completion_delta(True, False))
+        await service.record_progress("u1", "x", time_spent=5, completed=completion_delta(False, True))
+        await service.record_progress("u1", "y", time_spent=20, completed=completion_delta(False, True))
+        await service.record_progress("u1", "z", time_spent=15, completed=completion_delta(False, False))
+
+        expected = build_stats(quizzes, [("x", False, 40), ("x", True, 5), ("y", True, 20), ("z", False, 15)])
+        stats = await service.get("u1")
+        assert stats["quiz_count"] == expected["quiz_count"] == 3
+        assert stats["score_sum"] == expected["score_sum"]
+        assert stats["time_spent"] == expected["time_spent"] == 80
+        assert stats["weekly"] == expected["weekly"]
+        assert completed_course_count(stats) == completed_course_count(expected) == 2
+        assert mean_score(stats) == 80.0
+
+    @pytest.mark.asyncio
+    async def test_no_activity_gives_empty_stats(self):
+        """Test that a user without activity reads as zeros"""
+        stats = await MemoryUserStats().get("u1")
+
+        assert progress_increments("x") == {}
+        assert mean_score(stats) == 0.0
+        assert completed_course_count(stats) == 0
+
+
+class TestWeeklyBuckets:
+    """Test weekly bucketing of quiz results"""
+
+    def test_week_starts_on_monday(self):
+        """Test that the whole week maps to its Monday"""
+        assert week_start(datetime(2026, 10, 12, 0, 0)) == "2026-10-12"
+        assert week_start(datetime(2026, 10, 18, 23, 59)) == "2026-10-12"
+        assert week_start(datetime(2026, 10, 19)) == "2026-10-19"
+
+    def test_weekly_progress_newest_first(self):
+        """Test that the last four weeks are reported with gaps as zero"""
+        stats = build_stats([(90.0, datetime(2026, 10, 14)), (70.0, datetime(2026, 10, 13)), (50.0, datetime(2026, 9, 30))], [])
+
+        weeks = weekly_progress(stats, datetime(2026, 10, 18))
+
+        assert [week["week"] for week in weeks] == ["Week 4", "Week 3", "Week 2", "Week 1"]
+        assert [week["quizzes_taken"] for week in weeks] == [2, 0, 1, 0]
+        assert weeks[0]["average_score"] == 80.0
+        assert weeks[1]["average_score"] == 0
+
+
+class TestDashboardSummary:
+    """Test assembling the dashboard from the aggregation result"""
+
+    def test_summary_from_aggregation(self):
+        """Test totals, per-course progress and recent activity"""
+        now = datetime(2026, 10, 18)
+        stats = build_stats([(90.0, datetime(2026, 10, 16)), (70.0, datetime(2026, 10, 1))], [("c1", True, 30), ("c2", False, 15)])
+        result = {
+            "stats": [stats],
+            "courses": [{"_id": "c1", "title": "Algorithms"}, {"_id": "c2", "title": "Networks"}, {"_id": "c3", "title": "Unstarted"}],
+            "progress": [{"_id": "c2", "progress": 40.0}, {"_id": "c1", "progress": 100.0}, {"_id": "other", "progress": 10.0}],
+            "recent_quizzes": [{"_id": "q1", "score": 90.0, "taken_at": datetime(2026, 10, 16)}]
+        }
+
+        summary = summarize_dashboard(result, now)
+
+        assert summary["total_courses"] == 3
+        assert summary["completed_courses"] == 1
+        assert summary["total_quizzes"] == 2
+        assert summary["total_time_spent"] == 45
+        assert summary["average_score"] == 80.0
+        assert [row["course_title"] for row in summary["progress_by_course"]] == ["Algorithms", "Networks"]
+        assert summary["recent_activity"] == [{"type": "quiz", "title": "Quiz completed", "score": 90.0, "date": datetime(2026, 10, 16)}]
+        assert summary["weekly_progress"][0]["quizzes_taken"] == 1
+
+    def test_summary_without_activity(self):
+        """Test a user without stats, courses or quizzes"""
+        summary = summarize_dashboard({"stats": [], "courses": [], "progress": [], "recent_quizzes": []}, datetime(2026, 10, 18))
+
+        assert summary["total_quizzes"] == 0
+        assert summary["progress_by_course"] == []
+        assert len(summary["weekly_progress"]) == 4
@@ -0,0 +1,234 @@
+"""
+Tests for the in-process vector indexes
+"""
+import numpy as np
+import pytest
+from app.services.vector_index import ExactVectorIndex, IVFFlatIndex, VectorIndex, create_vector_index
+
+
+def _assert_same_results(actual, expected):
+    assert [key for key, _ in actual] == [key for key, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected], abs=1e-5)
+
+
+def _index_with(vectors, document_type="chapter", owner_id="course-1"):
+    index = ExactVectorIndex()
+    for i, vector in enumerate(vectors):
+        index.add(
+            key=f"k{i}",
+            embedding=vector,
+            document_id=f"doc{i}",
+            document_type=document_type,
+            owner_id=owner_id
+        )
+    return index
+
+
+class TestExactVectorIndex:
+    """Test ExactVectorIndex"""
+
+    def test_search_orders_by_cosine_similarity(self):
+        """Test that results are ranked by cosine similarity"""
+        index = _index_with([[1, 0, 0], [0.9, 0.1, 0], [0, 1, 0]])
+
+        results = index.search([1, 0, 0], k=2)
+
+        assert [key for key, _ in results] == ["k0", "k1"]
+        assert results[0][1] == pytest.approx(1.0)
+
+    def test_matches_brute_force(self):
+        """Test top-k against a plain numpy ranking"""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((500, 16))
+        index = _index_with(vectors)
+        query = rng.standard_normal(16)
+
+        results = index.search(query, k=10)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:10]
+        assert [key for key, _ in results] == [f"k{i}" for i in expected]
+
+    def test_partition_filters(self):
+        """Test filtering by document type and owner"""
+        index = ExactVectorIndex()
+        index.add("a", [1, 0], "doc-a", "chapter", "course-1")
+        index.add("b", [1, 0], "doc-b", "chapter", "course-2")
+        index.add("c", [1, 0], "doc-c", "upload", "user-1")
+
+        assert [k for k, _ in index.search([1, 0], k=5, owner_id="course-2")] == ["b"]
+        assert [k for k, _ in index.search([1, 0], k=5, document_type="upload")] == ["c"]
+        assert {k for k, _ in index.search([1, 0], k=5)} == {"a", "b", "c"}
+
+    def test_document_filter(self):
+        """Test restricting results to one document inside a partition"""
+        index = ExactVectorIndex()
+        index.add("a", [1, 0], "doc-a", "upload", "user-1")
+        index.add("b", [0.5, 0.5], "doc-b", "upload", "user-1")
+
+        results = index.search([1, 0], k=5, owner_id="user-1", document_id="doc-b")
+
+        assert [key for key, _ in results] == ["b"]
+
+    def test_remove_and_replace(self):
+        """Test removing vectors keeps the remaining rows searchable"""
+        index = _index_with([[1, 0], [0, 1], [1, 1]])
+
+        assert index.remove("k0")
+        assert not index.remove("k0")
+        index.add("k1", [1, 0], "doc1", "chapter", "course-1")
+
+        assert len(index) == 2
+        assert index.search([1, 0], k=1)[0][0] == "k1"
+
+    def test_remove_document(self):
+        """Test removing every vector of a document"""
+        index = ExactVectorIndex()
+        index.add("a", [1, 0], "doc", "chapter", "course-1")
+        index.add("b", [0, 1], "doc", "chapter", "course-1")
+        index.add("c", [1, 1], "other", "chapter", "course-1")
+
+        assert index.remove_document("doc") == 2
+        assert [k for k, _ in index.search([1, 0], k=5)] == ["c"]
+
+    def test_dimension_mismatch(self):
+        """Test that vectors of another dimension are rejected"""
+        index = _index_with([[1, 0, 0]])
+
+        with pytest.raises(ValueError):
+            index.add("x", [1, 0], "doc", "chapter", "course-1")
+
+
+class TestVectorIndex:
+    """Test the VectorIndex interface"""
+
+    def test_incomplete_backend_fails_at_construction(self):
+        """Test that a backend missing part of the interface cannot be instantiated"""
+        class SearchOnly(VectorIndex):
+            def search(self, query, k=10, document_type=None, owner_id=None, document_id=None):
+                return []
+
+        with pytest.raises(TypeError):
+            SearchOnly()
+
+
+class TestIVFFlatIndex:
+    """Test IVFFlatIndex"""
+
+    def _clustered(self, n=3000, dimension=32, seed=1):
+        rng = np.random.default_rng(seed)
+        centers = rng.standard_normal((40, dimension))
+        return centers[rng.integers(0, 40, n)] + 0.3 * rng.standard_normal((n, dimension))
+
+    def test_untrained_index_is_exact(self):
+        """Test that a small index answers exactly before training"""
+        vectors = self._clustered(n=200)
+        ivf = IVFFlatIndex(nlist=16, nprobe=2)
+        exact = ExactVectorIndex()
+        for i, vector in enumerate(vectors):
+            ivf.add(f"k{i}", vector, f"doc{i}", "chapter", "course-1")
+            exact.add(f"k{i}", vector, f"doc{i}", "chapter", "course-1")
+
+        assert not ivf.is_trained
+        _assert_same_results(ivf.search(vectors[0], k=5), exact.search(vectors[0], k=5))
+
+    def test_trains_and_keeps_recall(self):
+        """Test recall@10 of the trained index against exact search"""
+        vectors = self._clustered()
+        ivf = IVFFlatIndex(nlist=32, nprobe=8)
+        exact = ExactVectorIndex()
+        for i, vector in enumerate(vectors):
+            ivf.add(f"k{i}", vector, f"doc{i}", "chapter", f"course-{i % 3}")
+            exact.add(f"k{i}", vector, f"doc{i}", "chapter", f"course-{i % 3}")
+
+        assert ivf.needs_training and not ivf.is_trained
+        ivf.train()
+        assert ivf.is_trained and not ivf.needs_training
+        found = 0
+        for query in vectors[:20]:
+            expected = {key for key, _ in exact.search(query, k=10)}
+            found += len(expected & {key for key, _ in ivf.search(query, k=10)})
+        assert found / 200 >= 0.8
+
+    def test_fit_does_not_modify_the_index(self):
+        """Test that fitting (done off the event loop) only changes the index once applied"""
+        vectors = self._clustered(n=1500)
+        ivf = IVFFlatIndex(nlist=16, nprobe=4)
+        for i, vector in enumerate(vectors):
+            ivf.add(f"k{i}", vector, f"doc{i}", "chapter", "course-1")
+        before = ivf.search(vectors[0], k=5)
+
+        trained = ivf.fit()
+
+        assert not ivf.is_trained
+        _assert_same_results(ivf.search(vectors[0], k=5), before)
+        ivf.apply_training(trained)
+        assert ivf.is_trained and len(ivf) == 1500
+
+    def test_small_filtered_partition_is_exact(self):
+        """Test that owner-scoped queries are exact on a trained index"""
+        vectors = self._clustered()
+        ivf = IVFFlatIndex(nlist=32, nprobe=1)
+        exact = ExactVectorIndex()
+        for i, vector in enumerate(vectors):
+            owner = "course-small" if i % 100 == 0 else "course-big"
+            ivf.add(f"k{i}", vector, f"doc{i}", "chapter", owner)
+            exact.add(f"k{i}", vector, f"doc{i}", "chapter", owner)
+        ivf.train()
+
+        query = vectors[7]
+        _assert_same_results(
+            ivf.search(query, k=5, owner_id="course-small"),
+            exact.search(query, k=5, owner_id="course-small")
+        )
+
+    def test_incremental_delete_by_document(self):
+        """Test removing a document from a trained index"""
+        vectors = self._clustered()
+        ivf = IVFFlatIndex(nlist=32, nprobe=32)
+        for i, vector in enumerate(vectors):
+            ivf.add(f"k{i}", vector, f"doc{i // 10}", "chapter", "course-1")
+        ivf.train()
+
+        assert ivf.remove_document("doc0") == 10
+        keys = {key for key, _ in ivf.search(vectors[0], k=20)}
+        assert not keys & {f"k{i}" for i in range(10)}
+
+
+class TestSnapshots:
+    """Test saving and loading index snapshots"""
+
+    @pytest.mark.parametrize("backend", ["exact", "ivf"])
+    def test_round_trip(self, tmp_path, backend):
+        """Test that a restored index returns the same results"""
+        rng = np.random.default_rng(3)
+        vectors = rng.standard_normal((2000, 16))
+        options = {"nlist": 16, "nprobe": 4} if backend == "ivf" else {}
+        index = create_vector_index(backend, **options)
+        for i, vector in enumerate(vectors):
+            index.add(f"k{i}", vector, f"doc{i}", "upload", f"user-{i % 5}")
+        if index.needs_training:
+            index.train()
+
+        path = str(tmp_path / "index.npz")
+        index.save(path)
+        restored = create_vector_index(backend, **options)
+        restored.load(path)
+
+        assert len(restored) == len(index)
+        for query in vectors[:5]:
+            _assert_same_results(restored.search(query, k=5), index.search(query, k=5))
+            _assert_same_results(
+                restored.search(query, k=5, owner_id="user-2"),
+                index.search(query, k=5, owner_id="user-2")
+            )
+
+    def test_backend_mismatch(self, tmp_path):
+        """Test that a snapshot of another backend is rejected"""
+        index = ExactVectorIndex()
+        index.add("a", [1, 0], "doc", "chapter", "course-1")
+        path = str(tmp_path / "index.npz")
+        index.save(path)
+
+        with pytest.raises(ValueError):
+            IVFFlatIndex().load(path)